@@ -0,0 +1,267 @@
+# Benchmark de punta a punta del crawler contra el sitio sintético de fake_site.py.
+#
+# Levanta el sitio en un proceso aparte, corre MiniCrawlerMejorado `--repeat` veces
+# (cada corrida en un proceso nuevo, para que CPU y RSS sean solo del crawler) y
+# guarda los resultados en JSON para comparar versiones:
+#
+#   python bench/bench_crawl.py --pages 2000 --max-pages 500 --output antes.json
+#   python bench/bench_crawl.py --pages 2000 --max-pages 500 --output despues.json --compare antes.json
+#
+# Reporta páginas/s, CPU (usuario + sistema), RSS pico, percentiles de elapsed_s,
+# las conexiones abiertas (según el crawler y según el sitio) y los segundos promedio
+# por página de cada fase (dns_s ... enqueue_s).
+#
+# Con --fetchers corre las mismas semillas con cada backend de descarga (fetchers.py) y
+# los muestra lado a lado, p. ej. para medir lo que aportan Keep-Alive y HTTP/2:
+#
+#   python bench/bench_crawl.py --latency const:0.02 --fetchers nopool,pooled,async,http2
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from fake_site import add_site_arguments
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+
+# Métricas del resumen: (clave, mayor es mejor)
+SUMMARY_METRICS = [("pages_per_s", True), ("cpu_s", False), ("cpu_ms_per_page", False),
+                   ("peak_rss_mb", False), ("elapsed_p50_s", False), ("elapsed_p95_s", False),
+                   ("connections_new", False), ("server_connections", False)]
+
+# Filas de la tabla de --fetchers: (clave del resumen, etiqueta, formato)
+FETCHER_ROWS = [("pages_per_s", "páginas/s", ".1f"), ("elapsed_p50_s", "elapsed p50 (s)", ".3f"),
+                ("elapsed_p95_s", "elapsed p95 (s)", ".3f"), ("cpu_ms_per_page", "CPU ms/página", ".2f"),
+                ("connections_new", "conexiones (crawler)", ".0f"), ("server_connections", "conexiones (sitio)", ".0f"),
+                ("requests_per_connection", "solicitudes/conexión", ".1f")]
+
+
+# Una corrida del crawler (en el proceso hijo); devuelve el dict de resultados
+def run_once(config):
+    sys.path.insert(0, SRC)
+    import MiniCrawlerMejorado as crawler
+    import fetchers
+
+    crawler.console.quiet = True
+    crawler.FETCHER_BACKEND = config["fetcher"]
+    fetchers.HTTP2_PRIOR_KNOWLEDGE = True  # El sitio sintético habla HTTP/2 sin TLS (h2c)
+    hosts = config["hosts"]
+    crawler.SEED_URLS[:] = [f"http://{host}/p/0" for host in hosts]
+    crawler.DOMAINS_TARGET[:] = hosts
+    crawler.MAX_PAGES = config["max_pages"]
+    crawler.CONCURRENCY = config["concurrency"]
+    if config["delay"]:
+        crawler.DELAY_BETWEEN_REQUESTS = config["delay"]  # Ritmo inicial; luego adaptativo
+    else:
+        # 0 = sin límite por host: ritmo fijo altísimo y toda la concurrencia disponible
+        crawler.DELAY_BETWEEN_REQUESTS = 1e-6
+        crawler.ADAPTIVE_RATE = False
+        crawler.MAX_HOST_CONCURRENCY = config["concurrency"]
+    crawler.LINK_EXTRACTION = config["extraction"]
+    crawler.LINK_PARSER_BACKEND = config["parser"]
+    crawler.RESPONSE_CACHE_DIR = None  # Cada corrida descarga todo: sin caché HTTP
+    crawler.FRONTIER = crawler.new_frontier(crawler.SEED_URLS)
+
+    log_path = tempfile.mktemp(suffix=".csv")
+    sink = crawler.CsvSink(log_path, crawler.LOG_COLUMNS + crawler.LOG_EXTRA_COLUMNS)
+    reporter = crawler.LogReporter(sink, crawler.LiveView(crawler.console, "bench", quiet=True))
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    if config["processes"] > 1:
+        pages = crawler.crawl_sharded(config["processes"], reporter)
+    else:
+        session = crawler.create_session(pool_connections=max(10, len(hosts)), pool_maxsize=config["concurrency"])
+        pages = crawler.crawl_single(session, reporter)
+        session.close()
+    wall = time.perf_counter() - start
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)  # Shards (ya terminados)
+    sink.close()
+    crawler.FRONTIER.close()
+
+    with open(log_path, newline="", encoding="utf-8") as f:
+        elapsed = [float(row["elapsed_s"]) for row in csv.DictReader(f) if row["status"] != "BLOCKED"]
+    os.remove(log_path)
+    quantiles = statistics.quantiles(elapsed, n=100) if len(elapsed) > 1 else elapsed * 99
+
+    snapshot = reporter.metrics.snapshot()
+    cpu = (usage_self.ru_utime - usage_before.ru_utime + usage_self.ru_stime - usage_before.ru_stime
+           + usage_children.ru_utime + usage_children.ru_stime)
+    return {
+        "pages": pages,
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(pages / wall, 2),
+        "cpu_s": round(cpu, 3),
+        "cpu_ms_per_page": round(cpu / max(pages, 1) * 1000, 3),
+        "peak_rss_mb": round(max(usage_self.ru_maxrss, usage_children.ru_maxrss) / 1024, 1),  # ru_maxrss en KiB (Linux)
+        "elapsed_p50_s": round(quantiles[49], 4) if quantiles else None,
+        "elapsed_p95_s": round(quantiles[94], 4) if quantiles else None,
+        "status": snapshot["pages"],
+        "connections": snapshot["connections"],
+        "connections_new": snapshot["connections"]["new"],
+        "bytes": snapshot["bytes_total"],
+        "phase_s_per_page": {phase: round(seconds / max(pages, 1), 6)
+                             for phase, seconds in snapshot["phase_seconds"].items()},
+    }
+
+
+def start_site(args):
+    command = [sys.executable, os.path.join(HERE, "fake_site.py"),
+               "--pages", str(args.pages), "--fanout", str(args.fanout), "--page-bytes", str(args.page_bytes),
+               "--latency", args.latency, "--robots-rules", str(args.robots_rules),
+               "--error-rate", str(args.error_rate), "--hosts", str(args.hosts), "--seed", str(args.seed)]
+    site = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    hosts = json.loads(site.stdout.readline())["hosts"]
+    return site, hosts
+
+
+# Conexiones y solicitudes atendidas hasta ahora, sumadas entre los hosts del sitio
+def site_stats(hosts):
+    totals = {}
+    for host in hosts:
+        with urllib.request.urlopen(f"http://{host}/_stats", timeout=5) as r:
+            for key, value in json.load(r).items():
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+# Corre el crawler `repeat` veces con `config` (cada vez en un proceso nuevo) y anota en cada
+# corrida lo que vio el sitio: conexiones, conexiones HTTP/2 y solicitudes (robots.txt incluido)
+def run_repeated(config, hosts, repeat, label=""):
+    runs = []
+    for i in range(repeat):
+        before = site_stats(hosts)
+        child = subprocess.run([sys.executable, __file__, "--run-once", json.dumps({**config, "hosts": hosts})],
+                               capture_output=True, text=True, check=True)
+        after = site_stats(hosts)
+        run = json.loads(child.stdout.strip().splitlines()[-1])
+        run["server"] = {key: after[key] - before.get(key, 0) for key in after}
+        run["server_connections"] = run["server"]["connections"]
+        runs.append(run)
+        print(f"{label}corrida {i + 1}/{repeat}: {run['pages']} páginas en {run['wall_s']:.2f} s "
+              f"({run['pages_per_s']:.1f} pág/s, CPU {run['cpu_s']:.2f} s, RSS {run['peak_rss_mb']:.0f} MB, "
+              f"{run['server_connections']} conexiones)")
+    return runs
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(runs):
+    summary = {key: statistics.median(run[key] for run in runs) for key, _ in SUMMARY_METRICS}
+    summary["requests_per_connection"] = statistics.median(
+        run["server"]["requests"] / max(run["server"]["connections"], 1) for run in runs)
+    phases = runs[0]["phase_s_per_page"].keys()
+    summary["phase_s_per_page"] = {phase: statistics.median(run["phase_s_per_page"][phase] for run in runs)
+                                   for phase in phases}
+    return summary
+
+
+def print_summary(result, baseline=None):
+    base = baseline["summary"] if baseline else {}
+    print(f"\n{'métrica (mediana)':<24} {'actual':>12}" + (f" {'base':>12} {'cambio':>9}" if baseline else ""))
+    rows = [(key, better, result["summary"][key], base.get(key)) for key, better in SUMMARY_METRICS]
+    rows += [(f"{phase} /pág", False, value, base.get("phase_s_per_page", {}).get(phase))
+             for phase, value in result["summary"]["phase_s_per_page"].items()]
+    for key, higher_is_better, value, old in rows:
+        line = f"{key:<24} {value:>12.4f}"
+        if baseline and old is not None:
+            change = (value - old) / old * 100 if old else 0.0
+            improved = change > 0 if higher_is_better else change < 0
+            line += f" {old:>12.4f} {change:>+8.1f}%" + (" ✓" if improved and abs(change) >= 5 else "")
+        print(line)
+
+
+# Tabla de --fetchers: una columna por backend y, para páginas/s, la mejora sobre el primero
+def print_fetcher_table(results):
+    names = list(results)
+    print(f"\n{'métrica (mediana)':<24}" + "".join(f" {name:>10}" for name in names))
+    for key, label, spec in FETCHER_ROWS:
+        print(f"{label:<24}" + "".join(f" {results[name]['summary'][key]:>10{spec}}" for name in names))
+    base = results[names[0]]["summary"]["pages_per_s"]
+    print(f"{'vs ' + names[0]:<24}" + "".join(f" {results[name]['summary']['pages_per_s'] / base:>9.2f}x"
+                                              for name in names))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del crawler contra un sitio sintético local")
+    add_site_arguments(parser)
+    parser.add_argument("--max-pages", type=int, default=500, help="MAX_PAGES del crawler")
+    parser.add_argument("--concurrency", type=int, default=10, help="CONCURRENCY del crawler")
+    parser.add_argument("--processes", type=int, default=1, help="PROCESSES del crawler")
+    parser.add_argument("--delay", type=float, default=0, help="DELAY_BETWEEN_REQUESTS inicial por host (0 = sin límite ni control adaptativo)")
+    parser.add_argument("--extraction", choices=["stream", "soup"], default="stream", help="LINK_EXTRACTION")
+    parser.add_argument("--parser", default="html.parser", help="LINK_PARSER_BACKEND (html.parser o lxml)")
+    parser.add_argument("--fetcher", default="pooled", help="FETCHER_BACKEND: nopool, pooled, async o http2")
+    parser.add_argument("--fetchers", metavar="LISTA", help="A/B: corre cada backend (separados por comas) y los compara")
+    parser.add_argument("--repeat", type=int, default=3, help="corridas (se informa la mediana)")
+    parser.add_argument("--label", default="", help="etiqueta libre guardada en el resultado")
+    parser.add_argument("--output", metavar="RUTA", help="guarda los resultados en JSON")
+    parser.add_argument("--compare", metavar="RUTA", help="compara con un resultado JSON anterior")
+    parser.add_argument("--run-once", metavar="CONFIG", help=argparse.SUPPRESS)  # Uso interno (proceso hijo)
+    args = parser.parse_args()
+
+    if args.run_once:
+        print(json.dumps(run_once(json.loads(args.run_once))))
+        sys.exit(0)
+
+    crawler_config = {"max_pages": args.max_pages, "concurrency": args.concurrency, "processes": args.processes,
+                      "delay": args.delay, "extraction": args.extraction, "parser": args.parser,
+                      "fetcher": args.fetcher}
+    site_config = {key: getattr(args, key) for key in
+                   ("pages", "fanout", "page_bytes", "latency", "robots_rules", "error_rate", "hosts", "seed")}
+
+    fetcher_names = args.fetchers.split(",") if args.fetchers else [args.fetcher]
+    site, hosts = start_site(args)
+    fetcher_runs = {}
+    try:
+        for name in fetcher_names:
+            label = f"[{name}] " if args.fetchers else ""
+            fetcher_runs[name] = run_repeated({**crawler_config, "fetcher": name}, hosts, args.repeat, label)
+    finally:
+        site.terminate()
+        site.wait()
+
+    results = {name: {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "site": site_config,
+        "crawler": {**crawler_config, "fetcher": name},
+        "runs": runs,
+        "summary": summarize(runs),
+    } for name, runs in fetcher_runs.items()}
+
+    if args.fetchers:
+        print_fetcher_table(results)
+        result = {"fetchers": results}
+    else:
+        result = results[args.fetcher]
+        baseline = None
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline.get("site") != site_config or baseline.get("crawler") != crawler_config:
+                print("Aviso: la configuración difiere de la del resultado base")
+        print_summary(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
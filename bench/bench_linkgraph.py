@@ -0,0 +1,108 @@
+# Benchmark del grafo de enlaces (linkgraph.py) sobre un grafo sintético con enlaces
+# concentrados en pocas páginas, como un sitio universitario real:
+#
+#   python bench/bench_linkgraph.py --pages 200000 --fanout 30
+#
+# Mide el costo de anotar cada página durante el rastreo, los bytes por enlace en disco,
+# y el tiempo de armar el CSR, de PageRank y de la profundidad en clics (vectorizados con
+# numpy), comparando PageRank con la misma iteración en Python puro sobre una muestra.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from linkgraph import LinkGraph, click_depth, pagerank, read_graph  # noqa: E402
+
+
+def synthetic_pages(n_pages, fanout, seed=0):
+    rng = random.Random(seed)
+    for page in range(n_pages):
+        links = [f"https://unae.edu.py/p/{int(n_pages * 2 * rng.random() ** 3)}" for _ in range(fanout)]
+        yield f"https://unae.edu.py/p/{page}", min(page, 1), links
+
+
+# La misma iteración de PageRank que linkgraph.pagerank, en Python puro
+def pagerank_python(graph, damping=0.85, tol=1e-6, max_iter=100):
+    n = len(graph.indptr) - 1
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    rank = [1.0 / n] * n
+    for _ in range(max_iter):
+        spread = [0.0] * n
+        dangling = 0.0
+        for node in range(n):
+            start, end = indptr[node], indptr[node + 1]
+            if start == end:
+                dangling += rank[node]
+                continue
+            share = rank[node] / (end - start)
+            for target in indices[start:end]:
+                spread[target] += share
+        new_rank = [damping * (s + dangling / n) + (1 - damping) / n for s in spread]
+        delta = sum(abs(a - b) for a, b in zip(new_rank, rank))
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grafo de enlaces: escritura, CSR, PageRank y profundidad")
+    parser.add_argument("--pages", type=int, default=100_000, help="páginas rastreadas")
+    parser.add_argument("--fanout", type=int, default=30, help="enlaces por página")
+    parser.add_argument("--python-sample", type=int, default=20_000, help="páginas para la comparación en Python puro")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="RUTA", help="guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph_path = os.path.join(tmp, "graph")
+        link_graph = LinkGraph(graph_path)
+        t_write, _ = timed(lambda: [link_graph.add_page(*page) for page in synthetic_pages(args.pages, args.fanout, args.seed)])
+        link_graph.close()
+        disk_bytes = sum(os.path.getsize(os.path.join(graph_path, name)) for name in os.listdir(graph_path))
+        edge_bytes = sum(os.path.getsize(os.path.join(graph_path, name)) for name in ("pages.u32", "edges.u32"))
+        t_csr, graph = timed(lambda: read_graph(graph_path, link_graph.n_nodes))
+        t_rank, _ = timed(lambda: pagerank(graph))
+        t_depth, depth = timed(lambda: click_depth(graph, [0]))
+
+        sample_path = os.path.join(tmp, "sample")
+        sample = LinkGraph(sample_path)
+        for page in synthetic_pages(args.python_sample, args.fanout, args.seed):
+            sample.add_page(*page)
+        sample_graph = sample.graph()
+        sample.close()
+        t_numpy, _ = timed(lambda: pagerank(sample_graph))
+        t_python, _ = timed(lambda: pagerank_python(sample_graph))
+
+    n_edges = link_graph.n_edges
+    results = {
+        "pages": args.pages, "nodes": link_graph.n_nodes, "edges": n_edges,
+        "write_us_per_page": round(t_write / args.pages * 1e6, 2),
+        "disk_bytes_per_edge": round(edge_bytes / n_edges, 2), "disk_bytes_total": disk_bytes,
+        "csr_s": round(t_csr, 3), "pagerank_s": round(t_rank, 3), "click_depth_s": round(t_depth, 3),
+        "max_click_depth": int(depth.max()),
+        "pagerank_sample": {"pages": args.python_sample, "numpy_s": round(t_numpy, 3), "python_s": round(t_python, 3)},
+    }
+    print(f"{args.pages} páginas, {link_graph.n_nodes} nodos, {n_edges} enlaces")
+    print(f"Anotar durante el rastreo: {t_write / args.pages * 1e6:.1f} µs por página")
+    print(f"En disco: {edge_bytes / n_edges:.2f} bytes por enlace ({disk_bytes / 1e6:.1f} MB con las URLs)")
+    print(f"CSR: {t_csr:.3f} s | PageRank: {t_rank:.3f} s | profundidad en clics: {t_depth:.3f} s (máx. {depth.max()})")
+    print(f"PageRank con {args.python_sample} páginas: numpy {t_numpy:.3f} s, Python puro {t_python:.3f} s "
+          f"({t_python / t_numpy:.0f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
@@ -0,0 +1,65 @@
+# Microbenchmark y chequeo de equivalencia de la extracción de enlaces.
+#
+# Compara extract_links_soup (BeautifulSoup, referencia) con extract_links_streaming
+# (html.parser y lxml si está instalado) sobre una página sintética grande.
+#
+#   python bench/bench_links.py [n_enlaces] [relleno_por_enlace]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from links import HAVE_LXML, extract_links_soup, extract_links_streaming
+
+
+# Respuesta mínima compatible con lo que usa extract_links_streaming
+class FakeResponse:
+    def __init__(self, body, encoding="utf-8"):
+        self.body = body
+        self.encoding = encoding
+        self.headers = {"Content-Type": f"text/html; charset={encoding}"}
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def build_page(n_links, filler):
+    parts = ['<html><head><base href="/portal/"><title>Portal</title></head><body>']
+    for i in range(n_links):
+        parts.append(f'<div class="item"><p>{"texto " * filler}</p>')
+        parts.append(f'<a href="noticia-{i}.html?a=1&amp;b=2">Noticia {i}</a>')
+        if i % 7 == 0:
+            parts.append(f'<a href="https://externo.com/{i}">externo</a><a>sin href</a>')
+        parts.append("</div>")
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    n_links = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    filler = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    page_url = "https://unae.edu.py/tv/"
+    body = build_page(n_links, filler)
+    keep = lambda url: url.startswith("https://unae.edu.py")
+    print(f"Página de {len(body) / 1024:.0f} KiB con {n_links} enlaces internos")
+
+    t_ref, reference = timed(lambda: extract_links_soup(body.decode("utf-8"), page_url, keep=keep))
+    print(f"{'BeautifulSoup (referencia)':<30} {t_ref * 1000:8.1f} ms")
+
+    backends = ["html.parser"] + (["lxml"] if HAVE_LXML else [])
+    for backend in backends:
+        t_full, links = timed(lambda: extract_links_streaming(FakeResponse(body), page_url, keep=keep, backend=backend)[0])
+        assert links == reference, f"{backend}: enlaces distintos a la referencia"
+        t_cap, capped = timed(lambda: extract_links_streaming(FakeResponse(body), page_url, keep=keep, limit=100, backend=backend)[0])
+        assert capped == reference[:100], f"{backend}: corte anticipado distinto a la referencia"
+        print(f"{'stream ' + backend:<30} {t_full * 1000:8.1f} ms  (tope 100: {t_cap * 1000:.1f} ms)  equivalente ✓")
@@ -0,0 +1,70 @@
+# Microbenchmark: costo por URL de la decisión de robots.txt.
+#
+# Compara la implementación anterior (recompila y reordena las regex en cada
+# llamada) con RobotsMatcher (reglas compiladas una vez + caché LRU).
+#
+#   python bench/bench_robots.py [n_reglas] [n_urls]
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from robots import RobotsMatcher
+
+
+# Implementación anterior de is_allowed_by_robots, como referencia
+def legacy_is_allowed(path, rules):
+    allow_patterns = [re.compile(re.escape(p).replace("\\*", ".*")) for p in rules.get("allow", [])]
+    disallow_patterns = [re.compile(re.escape(p).replace("\\*", ".*")) for p in rules.get("disallow", [])]
+    for pattern in sorted(allow_patterns, key=lambda p: len(p.pattern), reverse=True):
+        if pattern.match(path):
+            return True
+    for pattern in sorted(disallow_patterns, key=lambda p: len(p.pattern), reverse=True):
+        if pattern.match(path):
+            return False
+    return True
+
+
+def build_robots(n_rules, rng):
+    lines = ["User-agent: *"]
+    allow, disallow = [], []
+    for i in range(n_rules):
+        path = f"/seccion{i}/" + ("*.pdf" if i % 5 == 0 else f"sub{rng.randint(0, 99)}")
+        if i % 3 == 0:
+            lines.append(f"Allow: {path}")
+            allow.append(path)
+        else:
+            lines.append(f"Disallow: {path}")
+            disallow.append(path)
+    return "\n".join(lines), {"allow": allow, "disallow": disallow}
+
+
+def bench(label, fn, paths):
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / len(paths) * 1e6:10.2f} µs/URL")
+    return elapsed
+
+
+if __name__ == "__main__":
+    n_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_urls = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = random.Random(42)
+
+    content, legacy_rules = build_robots(n_rules, rng)
+    # Rutas con repetición, como en un rastreo real (menú y pie de página comunes)
+    paths = [f"/seccion{rng.randint(0, n_rules)}/sub{rng.randint(0, 99)}" for _ in range(n_urls // 10)]
+    paths = [rng.choice(paths) for _ in range(n_urls)]
+
+    print(f"robots.txt con {n_rules} reglas, {n_urls} URLs")
+    before = bench("anterior (regex por llamada)", lambda p: legacy_is_allowed(p, legacy_rules), paths)
+
+    matcher = RobotsMatcher(content, "dataexplore-crawler")
+    after_cold = bench("RobotsMatcher (sin caché)", matcher._is_allowed, paths)
+    after = bench("RobotsMatcher (con LRU)", matcher.is_allowed, paths)
+
+    print(f"Mejora: x{before / after_cold:.0f} sin caché, x{before / after:.0f} con caché")
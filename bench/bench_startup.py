@@ -0,0 +1,124 @@
+# Benchmark del arranque: cuánto tarda en importarse cada script antes de hacer nada útil.
+# En los trabajos cortos que corren desde cron, el arranque pesa tanto como el rastreo.
+#
+#   python bench/bench_startup.py                 # mediana de --repeat arranques por escenario
+#   python bench/bench_startup.py --check         # sale con error si se pasa del presupuesto
+#
+# Cada escenario corre en un intérprete nuevo; se informa la mediana del tiempo de pared
+# menos el de un intérprete vacío (`python -c pass`), es decir, lo que agrega el script.
+# Además verifica que los modos livianos no carguen dependencias pesadas (pyarrow, bs4,
+# matplotlib...) y muestra los módulos que más tardan en importarse según `-X importtime`.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+
+# Milisegundos que cada escenario puede agregar al intérprete vacío
+BUDGET_MS = {
+    "import MiniCrawlerMejorado": 300,
+    "MiniCrawlerMejorado --help": 300,
+    "import ImprimirCSV": 800,
+    "ImprimirCSV --text": 900,
+}
+
+# Módulos que un escenario no debe cargar (se importan solo en los modos que los usan)
+FORBIDDEN_MODULES = {
+    "import MiniCrawlerMejorado": ["pyarrow", "bs4", "lxml", "numpy", "pandas", "matplotlib", "broker", "rich.live"],
+    "MiniCrawlerMejorado --help": ["pyarrow", "bs4", "lxml", "numpy", "pandas", "matplotlib", "broker", "rich.live"],
+    "import ImprimirCSV": ["matplotlib"],
+    "ImprimirCSV --text": ["matplotlib"],
+}
+
+
+# Código de cada escenario (corre en el hijo con src/ como directorio actual)
+def scenarios(log_path):
+    return {
+        "import MiniCrawlerMejorado": "import MiniCrawlerMejorado",
+        "MiniCrawlerMejorado --help": ("import sys, MiniCrawlerMejorado\n"
+                                       "sys.argv = ['MiniCrawlerMejorado.py', '--help']\n"
+                                       "try:\n    MiniCrawlerMejorado.main()\nexcept SystemExit:\n    pass"),
+        "import ImprimirCSV": "import ImprimirCSV",
+        "ImprimirCSV --text": f"import ImprimirCSV\nImprimirCSV.main([{log_path!r}, '--text'])",
+    }
+
+
+# Un log pequeño con el formato de crawler_log.csv, para el modo --text
+def write_sample_log(path, rows=200):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#,url,status,elapsed_s,n_links_found\n")
+        for i in range(1, rows + 1):
+            f.write(f"{i},https://unae.edu.py/p/{i},{200 if i % 20 else 404},{0.05 + (i % 7) / 100:.2f},{i % 30}\n")
+
+
+# Segundos de pared de un intérprete nuevo que ejecuta `code`, y cuáles de `modules`
+# quedaron cargados (el hijo los imprime en JSON en la última línea)
+def run(src, code, modules=()):
+    probe = f"\nimport json as _j, sys as _s\nprint('\\n' + _j.dumps([m for m in {list(modules)!r} if m in _s.modules]))"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code + probe], cwd=src, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# Los `top` módulos con más tiempo propio de importación (µs) al importar `module`
+def slowest_imports(src, module, top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=src,
+                            capture_output=True, text=True, check=True)
+    costs = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[0].split(":")[-1].strip().isdigit():
+            costs.append((int(parts[0].split(":")[-1]), parts[2].strip()))
+    return sorted(costs, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de los scripts del crawler")
+    parser.add_argument("--repeat", type=int, default=11, help="arranques por escenario (se informa la mediana)")
+    parser.add_argument("--top", type=int, default=10, help="módulos más lentos a listar (0 = ninguno)")
+    parser.add_argument("--src", default=SRC, help="carpeta con los scripts (p. ej. la de otra versión)")
+    parser.add_argument("--check", action="store_true", help="sale con código 1 si algún escenario se pasa del presupuesto")
+    parser.add_argument("--output", metavar="RUTA", help="guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "crawler_log.csv")
+        write_sample_log(log_path)
+        baseline = statistics.median(run(args.src, "pass")[0] for _ in range(args.repeat))
+        print(f"Intérprete vacío: {baseline * 1000:.0f} ms (mediana de {args.repeat})\n")
+        print(f"{'escenario':<30} {'ms':>6} {'presupuesto':>12}  módulos pesados cargados")
+
+        results = {"python": sys.version.split()[0], "baseline_ms": round(baseline * 1000, 1), "scenarios": {}}
+        over_budget = False
+        for name, code in scenarios(log_path).items():
+            forbidden = FORBIDDEN_MODULES.get(name, [])
+            times = []
+            for _ in range(args.repeat):
+                elapsed, loaded = run(args.src, code, forbidden)
+                times.append(elapsed)
+            cost_ms = (statistics.median(times) - baseline) * 1000
+            budget = BUDGET_MS.get(name)
+            ok = (budget is None or cost_ms <= budget) and not loaded
+            over_budget |= not ok
+            results["scenarios"][name] = {"ms": round(cost_ms, 1), "budget_ms": budget, "heavy_modules": loaded, "ok": ok}
+            print(f"{name:<30} {cost_ms:>6.0f} {budget if budget else '-':>12}  "
+                  f"{', '.join(loaded) if loaded else '-'}{'' if ok else '   ✗'}")
+
+    for module in ("MiniCrawlerMejorado", "ImprimirCSV") if args.top else ():
+        print(f"\nImportaciones más lentas de {module} (tiempo propio):")
+        for micros, name in slowest_imports(args.src, module, args.top):
+            print(f"  {micros / 1000:>7.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+    if args.check and over_budget:
+        sys.exit(1)
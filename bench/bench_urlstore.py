@@ -0,0 +1,135 @@
+# Benchmark de memoria de la frontera: set de strings + deque de tuplas (lo de antes)
+# contra el almacenamiento compacto de urlstore.py.
+#
+#   python bench/bench_urlstore.py --urls 1000000
+#
+# Genera URLs sintéticas de sitios universitarios (pocos hosts, rutas largas y parecidas)
+# y mide con tracemalloc los bytes por URL del índice de vistas y de la cola pendiente,
+# el tiempo de inserción y consulta, y la tasa real de falsos positivos del Bloom.
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from dedup import dedup_key  # noqa: E402
+from urlstore import CompactQueue, FingerprintSet, ScalableBloomFilter  # noqa: E402
+
+HOSTS = ["https://unae.edu.py", "https://www.una.py", "https://www.uc.edu.py", "https://www.uni.edu.py",
+         "https://fpuna.edu.py", "https://www.unasur.edu.py", "https://posgrado.una.py", "https://biblioteca.uc.edu.py"]
+SECTIONS = ["noticias", "eventos", "carreras", "investigacion", "extension", "docentes", "convocatorias", "tv"]
+SLUG_WORDS = ("universidad facultad carrera docente estudiante investigacion extension posgrado "
+              "convocatoria beca admision calendario academico noticia evento biblioteca").split()
+
+
+def synthetic_urls(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        slug = "-".join(rng.choice(SLUG_WORDS) for _ in range(rng.randint(2, 6)))
+        url = f"{rng.choice(HOSTS)}/{rng.choice(SECTIONS)}/{rng.randint(2015, 2025)}/{rng.randint(1, 12):02d}/{slug}-{i}/"
+        if rng.random() < 0.2:
+            url += f"?page={rng.randint(1, 50)}"
+        yield url
+
+
+# Copias nuevas de los strings: como en el crawler, cada estructura es la única que los retiene
+def fresh(strings):
+    for string in strings:
+        yield string.encode("utf-8").decode("utf-8")
+
+
+# Memoria retenida (bytes, con tracemalloc) y segundos (en otra pasada, sin tracemalloc:
+# tracemalloc multiplica el costo de cada asignación) de construir la estructura con `fill`
+def measure(build, fill, items):
+    gc.collect()
+    tracemalloc.start()
+    structure = build()
+    fill(structure, fresh(items))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    gc.collect()
+    strings = list(fresh(items))
+    start = time.perf_counter()
+    structure = build()
+    fill(structure, strings)
+    return structure, memory, time.perf_counter() - start
+
+
+def lookup_seconds(structure, queries):
+    start = time.perf_counter()
+    for key in queries:
+        _ = key in structure
+    return time.perf_counter() - start
+
+
+def fill_seen(structure, keys):
+    for key in keys:
+        structure.add(key)
+
+
+def fill_queue(structure, urls):
+    for url in urls:
+        structure.append((url, 3))
+
+
+def drain_seconds(queue):
+    start = time.perf_counter()
+    while queue:
+        queue.popleft()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria de la frontera: set/deque contra urlstore")
+    parser.add_argument("--urls", type=int, default=200_000, help="URLs vistas (y en cola)")
+    parser.add_argument("--error-rate", type=float, default=0.001, help="tasa de falsos positivos del Bloom")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="RUTA", help="guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    urls = list(synthetic_urls(args.urls, args.seed))
+    keys = [dedup_key(url) for url in urls]
+    absent = [dedup_key(url) for url in synthetic_urls(min(args.urls, 100_000), args.seed + 1)]
+    queries = keys[: len(absent)] + absent
+    print(f"{args.urls} URLs, {sum(map(len, urls)) / len(urls):.0f} caracteres de promedio\n")
+
+    results = {"urls": args.urls, "seen": {}, "queue": {}}
+    seen_stores = [("set de strings", set), ("compact (huellas)", FingerprintSet),
+                   (f"bloom ({args.error_rate:g})", lambda: ScalableBloomFilter(args.error_rate))]
+    print(f"{'índice de vistas':<22} {'bytes/URL':>10} {'inserción µs':>13} {'consulta µs':>12} {'falsos +':>9}")
+    for name, build in seen_stores:
+        store, memory, elapsed = measure(build, fill_seen, keys)
+        lookup = lookup_seconds(store, queries)
+        false_positives = sum(key in store for key in absent) / len(absent)
+        results["seen"][name] = {"bytes_per_url": round(memory / args.urls, 1),
+                                 "insert_us": round(elapsed / args.urls * 1e6, 3),
+                                 "lookup_us": round(lookup / len(queries) * 1e6, 3),
+                                 "false_positive_rate": false_positives}
+        print(f"{name:<22} {memory / args.urls:>10.1f} {elapsed / args.urls * 1e6:>13.2f} "
+              f"{lookup / len(queries) * 1e6:>12.2f} {false_positives:>9.5f}")
+        del store
+
+    queues = [("deque de tuplas", deque), ("CompactQueue", CompactQueue),
+              ("CompactQueue (zlib)", lambda: CompactQueue(compress=True))]
+    print(f"\n{'cola pendiente':<22} {'bytes/URL':>10} {'encolar µs':>13} {'desencolar µs':>14}")
+    for name, build in queues:
+        queue, memory, elapsed = measure(build, fill_queue, urls)
+        drain = drain_seconds(queue)
+        results["queue"][name] = {"bytes_per_url": round(memory / args.urls, 1),
+                                  "push_us": round(elapsed / args.urls * 1e6, 3),
+                                  "pop_us": round(drain / args.urls * 1e6, 3)}
+        print(f"{name:<22} {memory / args.urls:>10.1f} {elapsed / args.urls * 1e6:>13.2f} {drain / args.urls * 1e6:>14.2f}")
+        del queue
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
@@ -0,0 +1,287 @@
+# Sitio universitario sintético para benchmarks sin red.
+#
+# Sirve un grafo de páginas determinista (misma semilla -> mismo sitio) desde uno
+# o varios servidores HTTP/1.1 locales, uno por "host". Se configuran la cantidad
+# de páginas, los enlaces por página, el tamaño de cada página, la distribución de
+# latencia, cuántas reglas tiene robots.txt y la fracción de páginas que fallan.
+# Si está instalado h2, también atiende HTTP/2 sin TLS (h2c con conocimiento previo).
+# GET /_stats devuelve las conexiones y solicitudes atendidas por ese host (en JSON).
+#
+#   python bench/fake_site.py --pages 5000 --fanout 12 --latency lognormal:0.02:0.5
+#
+# Al arrancar imprime una línea JSON con los hosts ({"hosts": ["127.0.0.1:PUERTO", ...]})
+# y sirve hasta que se lo interrumpe.
+import argparse
+import copy
+import functools
+import importlib.util
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# h2 es opcional: sin él, el sitio solo habla HTTP/1.1
+HAVE_H2 = importlib.util.find_spec("h2") is not None
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+WORDS = ("universidad facultad carrera docente estudiante investigación extensión posgrado "
+         "convocatoria beca admisión calendario académico noticia evento biblioteca campus "
+         "rectorado secretaría matrícula programa curso taller seminario proyecto revista").split()
+
+
+# "0", "const:S", "uniform:A:B", "exp:MEDIA" o "lognormal:MEDIANA:SIGMA" (segundos)
+def parse_latency(spec):
+    kind, *params = spec.split(":")
+    params = [float(p) for p in params]
+    if kind in ("0", "none"):
+        return lambda rng: 0.0
+    if kind == "const":
+        return lambda rng: params[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / params[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    raise ValueError(f"Distribución de latencia desconocida: {spec!r}")
+
+
+# robots.txt con `n_rules` reglas que no bloquean /p/ pero obligan al matcher a
+# evaluar comodines ("*" y "$") en cada consulta
+def build_robots(n_rules):
+    lines = ["User-agent: otro-bot", "Disallow: /", "", "User-agent: *"]
+    for i in range(n_rules):
+        if i % 4 == 0:
+            lines.append(f"Disallow: /privado/{i}/")
+        elif i % 4 == 1:
+            lines.append(f"Disallow: /p/*/adjunto-{i}.pdf$")
+        elif i % 4 == 2:
+            lines.append(f"Disallow: /*?sesion={i}*")
+        else:
+            lines.append(f"Allow: /privado/{i}/publico*")
+    return "\n".join(lines) + "\n"
+
+
+class FakeSite:
+    def __init__(self, pages=1000, fanout=10, page_bytes=8192, latency="0", robots_rules=10,
+                 error_rate=0.0, seed=0, link_skew=0.0):
+        self.pages = pages
+        self.fanout = fanout
+        self.link_skew = link_skew
+        self.page_bytes = page_bytes
+        self.latency = parse_latency(latency)
+        self.robots = build_robots(robots_rules).encode("utf-8")
+        self.error_rate = error_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.stats = {"connections": 0, "http2_connections": 0, "requests": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, *keys):
+        with self.stats_lock:
+            for key in keys:
+                self.stats[key] += 1
+
+    # Enlaces de la página n: siempre a n+1 (todo el sitio es alcanzable) y el resto al azar.
+    # Con link_skew > 0 los destinos se concentran en las páginas de número bajo (unas pocas
+    # muy enlazadas y una cola larga, como en un sitio real), para medir la priorización.
+    def links(self, n):
+        rng = random.Random(f"{self.seed}:links:{n}")
+        if self.link_skew:
+            draw = lambda: int(self.pages * rng.random() ** (1 + self.link_skew))
+        else:
+            draw = lambda: rng.randrange(self.pages)
+        return [(n + 1) % self.pages] + [draw() for _ in range(self.fanout - 1)]
+
+    def is_error(self, n):
+        return random.Random(f"{self.seed}:error:{n}").random() < self.error_rate
+
+    @functools.lru_cache(maxsize=4096)
+    def page(self, n):
+        rng = random.Random(f"{self.seed}:text:{n}")
+        links = "".join(f'<li><a href="/p/{t}">Página {t}</a></li>' for t in self.links(n))
+        head = f"<html><head><title>Página {n}</title></head><body><nav><ul>{links}</ul></nav><main>"
+        tail = "</main></body></html>"
+        words = []
+        size = len(head) + len(tail)
+        while size < self.page_bytes:
+            word = f"{rng.choice(WORDS)}{rng.randrange(1000)}"
+            words.append(word)
+            size += len(word) + 1
+        return (head + "<p>" + " ".join(words) + "</p>" + tail).encode("utf-8")
+
+    # (estado, cuerpo, Content-Type) de una ruta, tras la latencia simulada
+    def respond(self, path):
+        time.sleep(self.latency(self.rng))
+        if path == "/robots.txt":
+            return 200, self.robots, "text/plain"
+        parts = path.split("/")
+        if len(parts) != 3 or parts[1] != "p" or not parts[2].isdigit() or int(parts[2]) >= self.pages:
+            return 404, b"no encontrada", "text/plain"
+        if self.is_error(int(parts[2])):
+            return 500, b"error interno", "text/plain"
+        return 200, self.page(int(parts[2])), "text/html; charset=utf-8"
+
+    # Atiende una conexión HTTP/2: cada solicitud responde en su propio hilo (como las conexiones
+    # HTTP/1.1 del ThreadingHTTPServer), así la latencia de una no frena a las demás del mismo socket.
+    def serve_h2(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        lock = threading.Lock()
+        pending = {}  # stream -> bytes del cuerpo que esperan ventana de control de flujo
+
+        # Envía lo que permitan las ventanas de control de flujo (con el lock tomado)
+        def pump():
+            for stream_id, data in list(pending.items()):
+                try:
+                    while data:
+                        size = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size, len(data))
+                        if size <= 0:
+                            break
+                        conn.send_data(stream_id, data[:size])
+                        data = data[size:]
+                    if data:
+                        pending[stream_id] = data
+                    else:
+                        conn.end_stream(stream_id)
+                        del pending[stream_id]
+                except h2.exceptions.StreamClosedError:  # El cliente cortó el stream (p. ej. ya tenía sus enlaces)
+                    del pending[stream_id]
+            sock.sendall(conn.data_to_send())
+
+        def reply(stream_id, path):
+            status, body, content_type = self.respond(path)
+            with lock:
+                try:
+                    conn.send_headers(stream_id, [(":status", str(status)), ("content-type", content_type),
+                                                  ("content-length", str(len(body)))])
+                except h2.exceptions.StreamClosedError:
+                    return
+                pending[stream_id] = body
+                pump()
+
+        with lock:
+            conn.initiate_connection()
+            sock.sendall(conn.data_to_send())
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+            with lock:
+                events = conn.receive_data(data)
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        self.count("requests")
+                        path = dict(event.headers)[":path"]
+                        threading.Thread(target=reply, args=(event.stream_id, path), daemon=True).start()
+                    elif isinstance(event, h2.events.StreamReset):
+                        pending.pop(event.stream_id, None)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        sock.sendall(conn.data_to_send())
+                        return
+                pump()
+
+    def handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-Alive, como un servidor real
+            # Cabeceras y cuerpo salen en dos escrituras: con Nagle, en una conexión reutilizada la
+            # segunda espera el ACK retardado del cliente (~40 ms) y Keep-Alive parecería más lento
+            disable_nagle_algorithm = True
+            counted = False
+
+            def log_message(self, *args):
+                pass
+
+            # Las conexiones que empiezan con el prefacio de HTTP/2 se atienden con h2
+            def handle(self):
+                try:
+                    preface = self.connection.recv(len(H2_PREFACE), socket.MSG_PEEK | socket.MSG_WAITALL)
+                except OSError:
+                    return
+                if preface == H2_PREFACE and HAVE_H2:
+                    site.count("connections", "http2_connections")
+                    try:
+                        site.serve_h2(self.connection)
+                    except OSError:
+                        pass
+                    self.close_connection = True
+                    return
+                super().handle()
+
+            def do_GET(self):
+                if self.path == "/_stats":
+                    with site.stats_lock:
+                        self.reply(200, json.dumps(site.stats).encode("utf-8"), "application/json")
+                    return
+                if not self.counted:  # Una conexión se cuenta en su primera solicitud (sin /_stats)
+                    self.counted = True
+                    site.count("connections")
+                site.count("requests")
+                self.reply(*site.respond(self.path))
+
+            def reply(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    # Arranca `n_hosts` servidores (uno por puerto) en hilos; devuelve los servidores.
+    # Cada host usa su propia semilla: si no, serían copias idénticas (casi duplicados).
+    def serve(self, n_hosts=1, port=0):
+        servers = []
+        for i in range(n_hosts):
+            host_site = copy.copy(self)
+            host_site.seed = self.seed + i
+            host_site.rng = random.Random(host_site.seed)
+            host_site.stats = dict.fromkeys(self.stats, 0)
+            host_site.stats_lock = threading.Lock()
+            server = ThreadingHTTPServer(("127.0.0.1", port + i if port else 0), host_site.handler())
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+        return servers
+
+
+def add_site_arguments(parser):
+    parser.add_argument("--pages", type=int, default=1000, help="páginas por host")
+    parser.add_argument("--fanout", type=int, default=10, help="enlaces por página")
+    parser.add_argument("--page-bytes", type=int, default=8192, help="tamaño aproximado de cada página")
+    parser.add_argument("--latency", default="0", help="0 | const:S | uniform:A:B | exp:MEDIA | lognormal:MEDIANA:SIGMA")
+    parser.add_argument("--robots-rules", type=int, default=10, help="reglas de robots.txt (con comodines)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de páginas que responden 500")
+    parser.add_argument("--link-skew", type=float, default=0.0, help="0 = enlaces uniformes; más = concentrados en pocas páginas")
+    parser.add_argument("--hosts", type=int, default=1, help="servidores (hosts) independientes")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def site_from_args(args):
+    return FakeSite(pages=args.pages, fanout=args.fanout, page_bytes=args.page_bytes, latency=args.latency,
+                    robots_rules=args.robots_rules, error_rate=args.error_rate, seed=args.seed,
+                    link_skew=args.link_skew)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sitio sintético para benchmarks del crawler")
+    add_site_arguments(parser)
+    parser.add_argument("--port", type=int, default=0, help="primer puerto (0 = libres al azar)")
+    args = parser.parse_args()
+
+    servers = site_from_args(args).serve(args.hosts, args.port)
+    print(json.dumps({"hosts": [f"127.0.0.1:{s.server_address[1]}" for s in servers]}), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -1,96 +1,416 @@
+import argparse
+import math
+from datetime import datetime
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
 
-# Configuración de estilo
-plt.style.use('default')
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.facecolor'] = '#F8F9FA'
-plt.rcParams['grid.color'] = '#DEE2E6'
-plt.rcParams['grid.alpha'] = 0.7
-
-# Leer datos desde el CSV del crawler
-df = pd.read_csv("crawler_log.csv")
-
-# Asegurar que las columnas tengan los nombres esperados
-if "#" not in df.columns:
-    df.reset_index(inplace=True)
-    df.rename(columns={"index": "#"}, inplace=True)
-
-# Procesar métricas
-total_tiempo = df['elapsed_s'].sum()
-paginas_por_minuto = (len(df) / total_tiempo) * 60
-tiempo_acumulado = df['elapsed_s'].cumsum()
-paginas_por_minuto_tiempo_real = [(i+1) / (t/60) for i, t in enumerate(tiempo_acumulado)]
-
-# Crear gráficas
-fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-
-# Gráfica 1: Tiempo de respuesta
-ax1.plot(df['#'], df['elapsed_s'], 'b-', marker='o', markersize=4)
-ax1.set_title('Tiempo de Respuesta por Página', fontsize=14, fontweight='bold')
-ax1.set_xlabel('Número de Página')
-ax1.set_ylabel('Tiempo (segundos)')
-ax1.grid(True, alpha=0.3)
-promedio_tiempo = df['elapsed_s'].mean()
-ax1.axhline(y=promedio_tiempo, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_tiempo:.2f}s')
-ax1.legend()
-
-# Gráfica 2: Enlaces encontrados
-bars = ax2.bar(df['#'], df['n_links_found'], alpha=0.7, color='green')
-ax2.set_title('Enlaces Encontrados por Página', fontsize=14, fontweight='bold')
-ax2.set_xlabel('Número de Página')
-ax2.set_ylabel('Número de Enlaces')
-ax2.grid(True, alpha=0.3, axis='y')
-max_links_idx = df['n_links_found'].idxmax()
-bars[max_links_idx].set_color('red')
-promedio_enlaces = df['n_links_found'].mean()
-ax2.axhline(y=promedio_enlaces, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_enlaces:.1f}')
-ax2.legend()
-
-# Gráfica 3: Velocidad de crawling
-ax3.plot(df['#'], paginas_por_minuto_tiempo_real, 'purple', marker='s', markersize=4)
-ax3.set_title('Velocidad de Crawling (Páginas por Minuto)', fontsize=14, fontweight='bold')
-ax3.set_xlabel('Número de Página')
-ax3.set_ylabel('Páginas por Minuto')
-ax3.grid(True, alpha=0.3)
-ax3.axhline(y=paginas_por_minuto, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {paginas_por_minuto:.2f}')
-ax3.legend()
-
-# Gráfica 4: Distribución de tiempos
-bins = np.arange(1.5, 5.5, 0.5)
-n, bins, patches = ax4.hist(df['elapsed_s'], bins=bins, alpha=0.7, color='orange', edgecolor='black')
-ax4.set_title('Distribución de Tiempos de Respuesta', fontsize=14, fontweight='bold')
-ax4.set_xlabel('Tiempo (segundos)')
-ax4.set_ylabel('Frecuencia')
-ax4.grid(True, alpha=0.3, axis='y')
-ax4.axvline(x=promedio_tiempo, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_tiempo:.2f}s')
-ax4.legend()
-for i, (value, patch) in enumerate(zip(n, patches)):
-    if value > 0:
-        ax4.text(patch.get_x() + patch.get_width()/2, value + 0.1, str(int(value)), ha='center', va='bottom', fontweight='bold')
-
-# Añadir texto con métricas
-metricas_texto = f"""MÉTRICAS DEL CRAWLER UNAE
-• Páginas: {len(df)}
-• Tiempo total: {total_tiempo:.2f}s
-• Velocidad: {paginas_por_minuto:.2f} pág/min
-• Tiempo promedio: {promedio_tiempo:.2f}s
-• Enlaces promedio: {promedio_enlaces:.1f}
-• Más rápida: {df['elapsed_s'].min():.2f}s (Pág {df['elapsed_s'].idxmin()+1})
-• Más lenta: {df['elapsed_s'].max():.2f}s (Pág {df['elapsed_s'].idxmax()+1})
-• Más enlaces: {df['n_links_found'].max()} (Pág {df['n_links_found'].idxmax()+1})"""
-plt.figtext(0.5, 0.01, metricas_texto, ha="center", fontsize=11, bbox={"facecolor":"lightgray", "alpha":0.7, "pad":5})
-
-plt.tight_layout()
-plt.subplots_adjust(bottom=0.15)
-
-# Guardar y mostrar
-timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-nombre_archivo = f"metricas_crawler_unae_{timestamp}.png"
-plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
-plt.show()
-
-print(f"✅ Gráfica generada: {nombre_archivo}")
-print(f"📊 Páginas: {len(df)} | Tiempo: {total_tiempo:.2f}s | Velocidad: {paginas_por_minuto:.2f} pág/min")
\ No newline at end of file
+# Lectura por bloques: la memoria depende de CHUNK_ROWS y MAX_POINTS, no del tamaño del log
+CHUNK_ROWS = 200_000
+COLUMNS = ["#", "url", "status", "elapsed_s", "n_links_found", "fetched_at"]
+CSV_DTYPES = {"#": "int64", "url": "string", "status": "string", "elapsed_s": "float64", "n_links_found": "Int64",
+              "fetched_at": "float64"}
+
+# Histograma fino y fijo (escala logarítmica, 1 ms .. 10 min) del que salen percentiles y bins
+LATENCY_EDGES = np.concatenate(([0.0], np.geomspace(1e-3, 600, 2000), [np.inf]))
+PERCENTILES = (50, 95, 99)
+
+MAX_POINTS = 2000       # Las gráficas por página (y por tiempo) se agrupan en bloques para no pasar de esto
+ROLLING_BLOCKS = 10     # Ventana (en bloques) del throughput móvil
+TIME_BUCKET = 0.1       # Segundos del bloque de tiempo inicial del throughput (se duplica al agrupar)
+MAX_BINS = 60           # Máximo de bins del histograma de tiempos
+TIME_RESOLUTION = 0.01  # elapsed_s se registra con 2 decimales
+STATUS_CLASSES = ["2xx", "3xx", "4xx", "5xx", "ERR", "BLOCKED"]
+
+
+# Lee el log por bloques tipados; acepta CSV (crawler_log.csv) o Parquet (--parquet del crawler)
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        columns = [c for c in COLUMNS if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=lambda c: c in COLUMNS, dtype=CSV_DTYPES, chunksize=chunk_rows)
+
+
+# "200" -> "2xx"; "ERR" y "BLOCKED" se mantienen. Vectorizado sobre la columna completa.
+def status_classes(status):
+    status = status.astype("string").fillna("ERR")
+    numeric = status.str.fullmatch(r"\d{3}")
+    return status.where(~numeric, status.str[0] + "xx")
+
+
+# Percentiles a partir de un histograma (interpolando dentro del bin)
+def histogram_percentiles(counts, edges, percentiles):
+    total = counts.sum()
+    if total == 0:
+        return {p: float("nan") for p in percentiles}
+    cumulative = np.cumsum(counts)
+    result = {}
+    for p in percentiles:
+        target = total * p / 100
+        i = int(np.searchsorted(cumulative, target))
+        lo, hi = edges[i], edges[i + 1]
+        if not np.isfinite(hi):
+            result[p] = float(lo)
+            continue
+        before = cumulative[i - 1] if i else 0
+        result[p] = float(lo + (hi - lo) * (target - before) / counts[i])
+    return result
+
+
+# Agregados de un log de cualquier tamaño, acumulados bloque a bloque.
+#
+# - Las filas BLOCKED (robots.txt) no tienen descarga: cuentan en el desglose por
+#   estado pero no en tiempos, enlaces ni velocidad.
+# - Las filas ERR sí consumieron tiempo: cuentan en tiempos y velocidad como
+#   solicitudes fallidas, y en el desglose como errores.
+# - Las series por página se guardan por bloques de `block_size` páginas; cuando
+#   hay más de MAX_POINTS bloques se duplica el tamaño y se funden de a pares.
+# - El throughput sale del reloj (columna fetched_at), no de sumar elapsed_s: con
+#   descargas concurrentes esa suma es mucho mayor que la duración del rastreo. Las
+#   descargas terminadas se cuentan en bloques de `time_width` segundos, que también
+#   se funden de a pares. Los logs anteriores a fetched_at caen en la estimación secuencial.
+class LogStats:
+    def __init__(self):
+        self.rows = 0
+        self.requests = 0
+        self.total_time = 0.0
+        self.total_links = 0
+        self.min_time = (math.inf, None)   # (segundos, #página)
+        self.max_time = (-math.inf, None)
+        self.max_links = (-1, None)
+        self.latency_counts = np.zeros(len(LATENCY_EDGES) - 1, dtype=np.int64)
+
+        self.hosts = {}                                       # host -> índice de fila
+        self.host_latency = np.zeros((0, len(self.latency_counts)), dtype=np.int64)
+        self.breakdown = pd.DataFrame(dtype="int64")          # host x clase de estado
+
+        self.block_size = 1
+        self.block_count = np.zeros(0)
+        self.block_time = np.zeros(0)
+        self.block_links = np.zeros(0)
+
+        self.timed = 0                     # Descargas con fetched_at
+        self.first_start = math.inf        # Inicio de la primera descarga (fetched_at - elapsed_s)
+        self.last_end = -math.inf          # Fin de la última
+        self.time_origin = None
+        self.time_width = TIME_BUCKET
+        self.time_count = np.zeros(0)
+
+    def add_chunk(self, df):
+        n = len(df)
+        page = df["#"].to_numpy(dtype=np.int64) if "#" in df else np.arange(self.rows + 1, self.rows + n + 1)
+        row = np.arange(self.rows, self.rows + n)
+        self.rows += n
+
+        classes = status_classes(df["status"])
+        hosts = df["url"].str.extract(r"^\w+://([^/?#]+)", expand=False).fillna("?")
+        self.breakdown = self.breakdown.add(pd.crosstab(hosts, classes), fill_value=0)
+
+        fetched = (classes != "BLOCKED").to_numpy() & df["elapsed_s"].notna().to_numpy()
+        if not fetched.any():
+            return
+        elapsed = df["elapsed_s"].to_numpy(dtype=np.float64)[fetched]
+        links = df["n_links_found"].fillna(0).to_numpy(dtype=np.int64)[fetched]
+        page, row, hosts = page[fetched], row[fetched], hosts[fetched]
+
+        self.requests += len(elapsed)
+        self.total_time += float(elapsed.sum())
+        self.total_links += int(links.sum())
+        self.min_time = min(self.min_time, (float(elapsed.min()), int(page[elapsed.argmin()])), key=lambda t: t[0])
+        self.max_time = max(self.max_time, (float(elapsed.max()), int(page[elapsed.argmax()])), key=lambda t: t[0])
+        self.max_links = max(self.max_links, (int(links.max()), int(page[links.argmax()])), key=lambda t: t[0])
+
+        # Histogramas global y por host (índice plano host * n_bins + bin)
+        bins = np.clip(np.searchsorted(LATENCY_EDGES, elapsed, side="right") - 1, 0, len(self.latency_counts) - 1)
+        self.latency_counts += np.bincount(bins, minlength=len(self.latency_counts))
+        for host in hosts.unique():
+            if host not in self.hosts:
+                self.hosts[host] = len(self.hosts)
+        n_hosts, n_bins = len(self.hosts), len(self.latency_counts)
+        if self.host_latency.shape[0] < n_hosts:
+            grown = np.zeros((n_hosts, n_bins), dtype=np.int64)
+            grown[:self.host_latency.shape[0]] = self.host_latency
+            self.host_latency = grown
+        host_idx = hosts.map(self.hosts).to_numpy(dtype=np.int64)
+        self.host_latency += np.bincount(host_idx * n_bins + bins, minlength=n_hosts * n_bins).reshape(n_hosts, n_bins)
+
+        # Series por bloques de páginas
+        block = row // self.block_size
+        size = int(block.max()) + 1
+        self._grow_blocks(size)
+        self.block_count[:size] += np.bincount(block, minlength=size)
+        self.block_time[:size] += np.bincount(block, weights=elapsed, minlength=size)
+        self.block_links[:size] += np.bincount(block, weights=links, minlength=size)
+        while len(self.block_count) > MAX_POINTS:
+            self._coarsen()
+
+        if "fetched_at" in df:
+            done = df["fetched_at"].to_numpy(dtype=np.float64, na_value=np.nan)[fetched]
+            timed = ~np.isnan(done)
+            if timed.any():
+                self._add_times(done[timed], elapsed[timed])
+
+    # Cuenta las descargas terminadas en cada bloque de tiempo (el origen retrocede si llegan
+    # filas anteriores, p. ej. resultados de shards escritos fuera de orden)
+    def _add_times(self, done, elapsed):
+        self.timed += len(done)
+        self.first_start = min(self.first_start, float((done - elapsed).min()))
+        self.last_end = max(self.last_end, float(done.max()))
+        if self.time_origin is None:
+            self.time_origin = math.floor(done.min())
+        if done.min() < self.time_origin:
+            shift = math.ceil((self.time_origin - done.min()) / self.time_width)
+            self.time_count = np.pad(self.time_count, (shift, 0))
+            self.time_origin -= shift * self.time_width
+        bucket = ((done - self.time_origin) // self.time_width).astype(np.int64)
+        size = int(bucket.max()) + 1
+        if size > len(self.time_count):
+            self.time_count = np.pad(self.time_count, (0, size - len(self.time_count)))
+        self.time_count[:size] += np.bincount(bucket, minlength=size)
+        while len(self.time_count) > MAX_POINTS:
+            self.time_width *= 2
+            self.time_count = np.pad(self.time_count, (0, len(self.time_count) % 2)).reshape(-1, 2).sum(axis=1)
+
+    def _grow_blocks(self, size):
+        if size > len(self.block_count):
+            pad = size - len(self.block_count)
+            self.block_count = np.pad(self.block_count, (0, pad))
+            self.block_time = np.pad(self.block_time, (0, pad))
+            self.block_links = np.pad(self.block_links, (0, pad))
+
+    def _coarsen(self):
+        self.block_size *= 2
+        self._grow_blocks(len(self.block_count) + len(self.block_count) % 2)
+        self.block_count = self.block_count.reshape(-1, 2).sum(axis=1)
+        self.block_time = self.block_time.reshape(-1, 2).sum(axis=1)
+        self.block_links = self.block_links.reshape(-1, 2).sum(axis=1)
+
+    # Duración real del rastreo (del inicio de la primera descarga al fin de la última); None sin fetched_at
+    def wall_time(self):
+        return self.last_end - self.first_start if self.last_end > self.first_start else None
+
+    # Páginas por minuto sobre el reloj; sin fetched_at, estimación secuencial (como si fueran de a una)
+    def pages_per_minute(self):
+        wall = self.wall_time()
+        if wall:
+            return self.timed / wall * 60
+        return self.requests / self.total_time * 60 if self.total_time else float("nan")
+
+    def percentiles(self, counts=None):
+        return histogram_percentiles(self.latency_counts if counts is None else counts, LATENCY_EDGES, PERCENTILES)
+
+    # Tabla por host: páginas por clase de estado y percentiles de latencia
+    def host_table(self):
+        table = self.breakdown.reindex(columns=[c for c in STATUS_CLASSES if c in self.breakdown.columns]
+                                       + sorted(set(self.breakdown.columns) - set(STATUS_CLASSES)), fill_value=0)
+        table = table.astype("int64").rename_axis(index="host", columns=None)
+        table.insert(0, "total", table.sum(axis=1))
+        for p in PERCENTILES:
+            table[f"p{p}_s"] = np.nan
+        for host, i in self.hosts.items():
+            for p, value in self.percentiles(self.host_latency[i]).items():
+                table.loc[host, f"p{p}_s"] = round(value, 3)
+        return table.sort_values("total", ascending=False)
+
+    # Bins del histograma derivados de los datos (Freedman–Diaconis), de la mínima al p99
+    def histogram_bins(self):
+        pct = histogram_percentiles(self.latency_counts, LATENCY_EDGES, (1, 25, 75, 99))
+        lo = self.min_time[0] - TIME_RESOLUTION / 2
+        hi = max(pct[99], self.min_time[0]) + TIME_RESOLUTION / 2
+        width = 2 * (pct[75] - pct[25]) / max(self.requests, 1) ** (1 / 3)
+        width = max(width, (hi - lo) / MAX_BINS)
+        # Ancho múltiplo de la resolución del log para que ningún bin reciba más valores posibles que otro
+        width = math.ceil(width / TIME_RESOLUTION - 1e-9) * TIME_RESOLUTION
+        n_bins = max(1, math.ceil((hi - lo) / width - 1e-9))
+        return lo + width * np.arange(n_bins + 1)
+
+    # Reagrupa el histograma fino en `edges` (los tiempos por encima del p99 van al último bin)
+    def rebinned(self, edges):
+        fine_edges = LATENCY_EDGES.copy()
+        fine_edges[-1] = fine_edges[-2]
+        centers = np.clip((fine_edges[:-1] + fine_edges[1:]) / 2, edges[0], edges[-1])
+        counts, _ = np.histogram(centers, bins=edges, weights=self.latency_counts)
+        return counts
+
+
+def load_stats(path, chunk_rows=CHUNK_ROWS):
+    stats = LogStats()
+    for chunk in read_chunks(path, chunk_rows):
+        stats.add_chunk(chunk)
+    return stats
+
+
+# matplotlib es lo que más tarda en importarse: solo se carga (y se configura el estilo)
+# al graficar. Sin ventana se usa el backend Agg, que no necesita pantalla (cron, servidores).
+def load_pyplot(headless=False):
+    import matplotlib
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    # Configuración de estilo
+    plt.style.use('default')
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.rcParams['axes.facecolor'] = '#F8F9FA'
+    plt.rcParams['grid.color'] = '#DEE2E6'
+    plt.rcParams['grid.alpha'] = 0.7
+    return plt
+
+
+def plot(stats, nombre_archivo, show=True):
+    plt = load_pyplot(headless=not show)
+    pages = (np.arange(len(stats.block_count)) + 0.5) * stats.block_size
+    with np.errstate(divide="ignore", invalid="ignore"):
+        block_mean_time = stats.block_time / stats.block_count
+        block_mean_links = stats.block_links / stats.block_count
+    promedio_tiempo = stats.total_time / stats.requests
+    promedio_enlaces = stats.total_links / stats.requests
+    paginas_por_minuto = stats.pages_per_minute()
+    pct = stats.percentiles()
+    bloque = "Página" if stats.block_size == 1 else f"Bloque de {stats.block_size} páginas"
+
+    # Velocidad acumulada y móvil (ventana de ROLLING_BLOCKS bloques) sobre el reloj. Sin fetched_at
+    # (logs anteriores) se estima por página dividiendo por la suma de elapsed_s.
+    if stats.wall_time():
+        # Los bloques de los extremos se recortan a la duración del rastreo para no subestimar el ritmo
+        counts = pd.Series(stats.time_count)
+        starts = stats.time_origin + np.arange(len(counts)) * stats.time_width
+        ends = np.minimum(starts + stats.time_width, stats.last_end)
+        starts = np.maximum(starts, stats.first_start)
+        spans = pd.Series(np.maximum(ends - starts, 1e-3))
+        minutes = ((starts + ends) / 2 - stats.first_start) / 60
+        acumulada = (counts.cumsum() / np.maximum(ends - stats.first_start, 1e-3) * 60).to_numpy()
+        movil = (counts.rolling(ROLLING_BLOCKS, min_periods=1).sum()
+                 / spans.rolling(ROLLING_BLOCKS, min_periods=1).sum() * 60).to_numpy()
+        eje_velocidad = 'Minutos desde el inicio'
+        ventana = f'Móvil ({ROLLING_BLOCKS * stats.time_width:g} s)'
+    else:
+        counts, times = pd.Series(stats.block_count), pd.Series(stats.block_time)
+        minutes = pages
+        acumulada = (counts.cumsum() / times.cumsum() * 60).to_numpy()
+        movil = (counts.rolling(ROLLING_BLOCKS, min_periods=1).sum()
+                 / times.rolling(ROLLING_BLOCKS, min_periods=1).sum() * 60).to_numpy()
+        eje_velocidad = 'Número de Página (estimación secuencial: el log no tiene fetched_at)'
+        ventana = f'Móvil ({ROLLING_BLOCKS * stats.block_size} págs.)'
+
+    # Crear gráficas
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
+
+    # Gráfica 1: Tiempo de respuesta
+    ax1.plot(pages, block_mean_time, 'b-', marker='o' if len(pages) <= 200 else None, markersize=4)
+    ax1.set_title('Tiempo de Respuesta por Página', fontsize=14, fontweight='bold')
+    ax1.set_xlabel(f'Número de Página ({bloque.lower()})' if stats.block_size > 1 else 'Número de Página')
+    ax1.set_ylabel('Tiempo (segundos)')
+    ax1.grid(True, alpha=0.3)
+    ax1.axhline(y=promedio_tiempo, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_tiempo:.2f}s')
+    ax1.axhline(y=pct[95], color='orange', linestyle=':', alpha=0.9, label=f'p95: {pct[95]:.2f}s')
+    ax1.legend()
+
+    # Gráfica 2: Enlaces encontrados
+    bars = ax2.bar(pages, block_mean_links, width=stats.block_size, alpha=0.7, color='green')
+    ax2.set_title('Enlaces Encontrados por Página', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Número de Página')
+    ax2.set_ylabel('Número de Enlaces' if stats.block_size == 1 else 'Enlaces (promedio del bloque)')
+    ax2.grid(True, alpha=0.3, axis='y')
+    if len(bars):
+        bars[int(np.nanargmax(block_mean_links))].set_color('red')
+    ax2.axhline(y=promedio_enlaces, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_enlaces:.1f}')
+    ax2.legend()
+
+    # Gráfica 3: Velocidad de crawling
+    ax3.plot(minutes, acumulada, 'purple', marker='s' if len(minutes) <= 200 else None, markersize=4, label='Acumulada')
+    ax3.plot(minutes, movil, color='teal', alpha=0.7, label=ventana)
+    ax3.set_title('Velocidad de Crawling (Páginas por Minuto)', fontsize=14, fontweight='bold')
+    ax3.set_xlabel(eje_velocidad)
+    ax3.set_ylabel('Páginas por Minuto')
+    ax3.grid(True, alpha=0.3)
+    ax3.axhline(y=paginas_por_minuto, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {paginas_por_minuto:.2f}')
+    ax3.legend()
+
+    # Gráfica 4: Distribución de tiempos (bins derivados de los datos)
+    edges = stats.histogram_bins()
+    n = stats.rebinned(edges)
+    patches = ax4.bar(edges[:-1], n, width=np.diff(edges), align='edge', alpha=0.7, color='orange', edgecolor='black')
+    ax4.set_title('Distribución de Tiempos de Respuesta', fontsize=14, fontweight='bold')
+    ax4.set_xlabel('Tiempo (segundos, hasta p99)')
+    ax4.set_ylabel('Frecuencia')
+    ax4.grid(True, alpha=0.3, axis='y')
+    ax4.axvline(x=promedio_tiempo, color='r', linestyle='--', alpha=0.7, label=f'Promedio: {promedio_tiempo:.2f}s')
+    for p, style in zip(PERCENTILES, ('-', ':', '-.')):
+        ax4.axvline(x=pct[p], color='black', linestyle=style, alpha=0.6, label=f'p{p}: {pct[p]:.2f}s')
+    ax4.legend()
+    if len(n) <= 20:
+        for value, patch in zip(n, patches):
+            if value > 0:
+                ax4.text(patch.get_x() + patch.get_width()/2, value, str(int(value)), ha='center', va='bottom', fontweight='bold')
+
+    # Añadir texto con métricas
+    plt.figtext(0.5, 0.01, metrics_text(stats), ha="center", fontsize=11, bbox={"facecolor":"lightgray", "alpha":0.7, "pad":5})
+
+    plt.tight_layout()
+    plt.subplots_adjust(bottom=0.17)
+
+    # Guardar y mostrar
+    plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def metrics_text(stats):
+    pct = stats.percentiles()
+    estados = stats.breakdown.sum()
+    errores = int(estados.get("ERR", 0))
+    bloqueadas = int(estados.get("BLOCKED", 0))
+    wall = stats.wall_time()
+    duracion = f"{wall:.2f}s" if wall else "desconocida (log sin fetched_at)"
+    velocidad = "" if wall else " (estimación secuencial)"
+    return f"""MÉTRICAS DEL CRAWLER UNAE
+• Páginas: {stats.rows} ({stats.requests} descargadas, {errores} con error, {bloqueadas} bloqueadas por robots.txt)
+• Duración: {duracion} | suma de tiempos de respuesta: {stats.total_time:.2f}s
+• Velocidad: {stats.pages_per_minute():.2f} pág/min{velocidad}
+• Tiempo promedio: {stats.total_time / stats.requests:.2f}s | p50 {pct[50]:.2f}s | p95 {pct[95]:.2f}s | p99 {pct[99]:.2f}s
+• Enlaces promedio: {stats.total_links / stats.requests:.1f}
+• Más rápida: {stats.min_time[0]:.2f}s (Pág {stats.min_time[1]})
+• Más lenta: {stats.max_time[0]:.2f}s (Pág {stats.max_time[1]})
+• Más enlaces: {stats.max_links[0]} (Pág {stats.max_links[1]})"""
+
+
+# Con --text solo imprime las métricas y la tabla por host, sin importar matplotlib
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gráficas y métricas del log del crawler")
+    parser.add_argument("log", nargs="?", default="crawler_log.csv", help="log del crawler (.csv o .parquet)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="filas leídas por bloque")
+    parser.add_argument("--no-show", action="store_true", help="solo guarda la imagen, sin abrir la ventana")
+    parser.add_argument("--text", action="store_true", help="solo métricas en texto, sin gráficas (para cron)")
+    args = parser.parse_args(argv)
+
+    # Leer datos desde el log del crawler
+    stats = load_stats(args.log, args.chunk_rows)
+    if stats.requests == 0:
+        raise SystemExit(f"{args.log}: no hay páginas descargadas para {'resumir' if args.text else 'graficar'}")
+
+    if args.text:
+        print(metrics_text(stats))
+        print()
+        print(stats.host_table().to_string())
+        return 0
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    nombre_archivo = f"metricas_crawler_unae_{timestamp}.png"
+    plot(stats, nombre_archivo, show=not args.no_show)
+
+    print(f"✅ Gráfica generada: {nombre_archivo}")
+    wall = stats.wall_time()
+    print(f"📊 Páginas: {stats.rows} | Tiempo: {wall if wall else stats.total_time:.2f}s | "
+          f"Velocidad: {stats.pages_per_minute():.2f} pág/min")
+    print(stats.host_table().to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
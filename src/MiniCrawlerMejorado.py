@@ -1,229 +1,1194 @@
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import queue
 import requests
+import socket
+import sys
+import threading
 import time
-import csv
-from bs4 import BeautifulSoup
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
-from rich.table import Table
-from urllib.parse import urljoin, urlparse
-import re
-from requests.adapters import HTTPAdapter
+from liveview import LiveView
+from urllib.parse import urlparse
+from checkpoint import CrawlCheckpoint
+from dedup import SimHashIndex, canonicalize_url, dedup_key, simhash
+from extract import CORPUS_COLUMNS, CORPUS_PARQUET_TYPES, ExtractionPipeline
+from fetchers import FETCHER_BACKENDS, open_session
+from frontier import Frontier
+from httpcache import ResponseCache
+from linkgraph import LinkGraph, pagerank, priority_levels
+from links import CHUNK_SIZE, extract_links_soup, extract_links_streaming
+from metrics import TIMING_COLUMNS, CrawlMetrics, start_request_timings
+from ratelimit import THROTTLE_STATUSES, AdaptiveHostLimiter, parse_retry_after
+from robots import RobotsMatcher
+from sinks import CsvSink, JsonlSink, MultiSink, ParquetSink
+from sitemaps import RecrawlIndex, iter_sitemap_file
 
 console = Console()
-VISITED = set()     
-QUEUE = ["https://unae.edu.py/tv/"]
+SEED_URLS = ["https://unae.edu.py/tv/"]
 MAX_PAGES = 50  
-DELAY_BETWEEN_REQUESTS = 1 
+DELAY_BETWEEN_REQUESTS = 1  # Por host: empieza en 1 solicitud/s y luego lo ajusta el control adaptativo
+ADAPTIVE_RATE = True        # False: ritmo fijo de 1/DELAY_BETWEEN_REQUESTS por host
+MAX_HOST_RATE = 10          # Solicitudes/s máximas por host (hosts rápidos y sin errores)
+MAX_HOST_CONCURRENCY = 4    # Solicitudes simultáneas máximas por host
+TARGET_LATENCY = 1.0        # Con más latencia promedio que esto el host se considera lento y se frena
+MAX_RETRIES = 2             # Reintentos de una URL que respondió 429/503
 DOMAIN_TARGET = "unae.edu.py"
+# Dominios permitidos; agregar aquí otras universidades (y sus semillas en SEED_URLS) para rastrearlas en paralelo
+DOMAINS_TARGET = [DOMAIN_TARGET]
 
-ROBOTS_RULES = {}
+CONCURRENCY = 10        # Nº de fetchers concurrentes (por proceso)
+EXTRA_THREADS = 4       # Hilos además de los fetchers (lectura del inbox o del broker en shards y workers)
+PROCESSES = 1           # >1 reparte los hosts entre varios procesos (usa todos los núcleos)
+# Backend de descarga (fetchers.py): "pooled" (Keep-Alive), "nopool" (una conexión por solicitud),
+# "async" (httpx en un event loop) o "http2" (httpx con HTTP/2); se cambia también con --fetcher
+FETCHER_BACKEND = "pooled"
 
-# Configurar session con pooling simple
-def create_session():
-    """Crea una session con pooling de conexiones HTTP Keep-Alive"""
-    session = requests.Session()
-    
-    # Pooling básico sin estrategia compleja de reintentos
-    adapter = HTTPAdapter(
-        pool_connections=10,      # Conexiones para el mismo host
-        pool_maxsize=10,          # Máximo en el pool
-        max_retries=1             # 1 reintento simple
-    )
-    
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    
-    # Headers para keep-alive
-    session.headers.update({
-        'User-Agent': 'DataExplore-Crawler/1.0',
-        'Connection': 'keep-alive',
-    })
-    
+# Modo distribuido (--broker): un coordinador con la frontera y workers en otras máquinas
+DISTRIBUTED_BATCH_SIZE = 20   # URLs por lote; cada lote es de un solo host
+MAX_PUBLISHED_BATCHES = 100   # Lotes publicados a la vez (en cola o en curso)
+WORKER_MAX_BATCHES = 10       # Lotes que un worker procesa a la vez
+LEASE_SECONDS = 120           # Un lote sin terminar ni renovar en este tiempo vuelve a la cola
+BROKER_POLL_INTERVAL = 0.05
+BROKER_AUTHKEY = os.environ.get("CRAWLER_BROKER_KEY", "").encode()  # Clave secreta de tcp:// (obligatoria)
+
+CHECKPOINT_PATH = "crawler_checkpoint.db"  # Estado para reanudar con --resume
+CHECKPOINT_INTERVAL = 30                   # Segundos entre checkpoints incrementales
+
+# Caché HTTP en disco para recrawls (GET condicional con ETag/Last-Modified); None la desactiva
+RESPONSE_CACHE_DIR = "crawler_cache"
+RESPONSE_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Columnas de crawler_log.csv; las extra se completan con lo que devuelve fetch_page
+# (fetched_at: timestamp Unix del fin de la descarga, para medir el throughput real con concurrencia)
+LOG_COLUMNS = ["#", "url", "status", "elapsed_s", "n_links_found", "is_allowed_by_robots"]
+LOG_EXTRA_COLUMNS = ["fetched_at", "cache", "bytes_saved", "dup_links", "near_dup_of",
+                     *TIMING_COLUMNS, "conn_reused", "bytes", "host_rate", "backoff_s",
+                     "content_encoding", "aborted"]
+LOG_PARQUET_TYPES = {"#": "int64", "elapsed_s": "float64", "n_links_found": "int64", "fetched_at": "float64",
+                     "is_allowed_by_robots": "bool_", "bytes_saved": "int64", "dup_links": "int64",
+                     **dict.fromkeys(TIMING_COLUMNS, "float64"), "conn_reused": "bool_", "bytes": "int64",
+                     "host_rate": "float64", "backoff_s": "float64"}
+METRICS_SNAPSHOT_INTERVAL = 10  # Segundos entre instantáneas JSON (--metrics-json)
+LOG_BATCH_SIZE = 500     # Filas por escritura
+LOG_FLUSH_INTERVAL = 5   # Segundos máximos que una fila espera en memoria
+LIVE_WINDOW = 20         # Últimas URLs visibles en la vista en vivo
+READY_SCAN_WINDOW = 200 # Cuántas URLs de la cola se revisan buscando un host listo
+
+# Frontera: cola + índice de URLs vistas. "fifo" = BFS puro, "depth" = prioriza enlaces menos profundos,
+# "priority" = prioriza las URLs con más PageRank en el grafo de enlaces (así MAX_PAGES se gasta
+# primero en las páginas más enlazadas; solo en un proceso o con --broker)
+FRONTIER_MODE = "fifo"
+FRONTIER_MAX_IN_MEMORY = 1_000_000  # URLs pendientes en RAM (~20 bytes c/u comprimidas); el resto se desborda a disco
+FRONTIER_COMPRESS = True           # Bloques de la cola pendiente comprimidos con zlib
+# Índice de URLs vistas: "set" (strings, exacto), "compact" (huellas de 64 bits, ~10x menos memoria)
+# o "bloom" (Bloom escalable: aún menos memoria, pero una fracción FRONTIER_BLOOM_ERROR_RATE
+# de URLs nuevas se da por vista y no se rastrea)
+FRONTIER_SEEN = "compact"
+FRONTIER_BLOOM_ERROR_RATE = 0.001
+
+# Grafo de enlaces (--graph, linkgraph.py): páginas rastreadas y sus enlaces, en disco.
+# FRONTIER_MODE = "priority" lo necesita (si no se indica carpeta, usa "crawler_graph").
+LINK_GRAPH_PATH = None
+GRAPH = None                       # LinkGraph abierto en main()
+PRIORITY_REFRESH_MIN_PAGES = 50    # PageRank se recalcula cuando el grafo crece este número de páginas
+PRIORITY_REFRESH_GROWTH = 1.25     # ... y un 25%: el costo total de recalcular queda acotado
+PRIORITY_LEVELS = None             # Nivel de frontera por id de nodo (priority_levels)
+NEXT_PRIORITY_REFRESH = 0
+
+# Nivel de la URL en la frontera "priority": el de su PageRank en el último cálculo
+# (0 = promedio, para URLs que el grafo aún no conocía)
+def page_priority(url, depth):
+    if GRAPH is None or PRIORITY_LEVELS is None:
+        return 0
+    node_id = GRAPH.node_id(url)
+    return int(PRIORITY_LEVELS[node_id]) if node_id is not None and node_id < len(PRIORITY_LEVELS) else 0
+
+def new_frontier(seeds=()):
+    return Frontier(seeds, mode=FRONTIER_MODE, max_in_memory=FRONTIER_MAX_IN_MEMORY, key=dedup_key,
+                    seen=FRONTIER_SEEN, error_rate=FRONTIER_BLOOM_ERROR_RATE, compress=FRONTIER_COMPRESS,
+                    priority=page_priority)
+
+FRONTIER = new_frontier(SEED_URLS)
+
+# Páginas casi duplicadas (SimHash del texto visible): se registran pero sus enlaces no se expanden.
+# La huella se toma de los primeros NEAR_DUP_MAX_CHARS caracteres: pasado ese tope (y el de enlaces)
+# la extracción vuelve a cortar antes de leer el resto. Su costo queda en la columna simhash_s.
+NEAR_DUP_DETECTION = True
+NEAR_DUP_MAX_DISTANCE = 3  # Bits de diferencia (de 64) para considerar dos páginas casi iguales
+NEAR_DUP_MIN_WORDS = 50    # Páginas con menos texto no se comparan
+NEAR_DUP_MAX_CHARS = 8000  # Texto que entra en la huella
+CONTENT_INDEX = SimHashIndex(NEAR_DUP_MAX_DISTANCE)
+
+# Extracción de enlaces: "stream" lee el cuerpo por bloques y corta al llegar a MAX_LINKS_PER_PAGE
+# (n_links_found queda acotado a ese tope); "soup" arma el árbol completo con BeautifulSoup.
+LINK_EXTRACTION = "stream"
+LINK_PARSER_BACKEND = "html.parser"  # "lxml" si está instalado
+MAX_LINKS_PER_PAGE = 100
+STREAM_DRAIN_MAX_BYTES = 1024 * 1024  # Tras cortar antes, se descarta hasta esto para reutilizar la conexión
+MAX_PAGE_BYTES = 5 * 1024 * 1024      # Tope por página (ya descomprimida); el resto no se descarga
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")  # Lo demás (PDF, video...) no se descarga
+
+# Corpus (--corpus): título, descripción, canónica, idioma y texto principal de cada página
+# (y de los PDF, si está instalado pypdf), extraídos en un pool de procesos aparte
+CORPUS_PATH = None                                  # .jsonl.gz o .parquet
+CORPUS_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+CORPUS_MAX_PENDING = 64  # Documentos esperando extracción; con más, la descarga espera a que se libere lugar
+PIPELINE = None          # ExtractionPipeline abierto en __main__ (o en cada shard/worker)
+
+ROBOTS_RULES = {}  # dominio -> RobotsMatcher
+ROBOTS_USER_AGENT = "dataexplore-crawler"
+ROBOTS_RETRY_TTL = 300  # Segundos antes de reintentar un robots.txt que falló
+
+# Sitemaps: las líneas "Sitemap:" de robots.txt siembran la frontera con URLs profundas.
+# Cada archivo es una solicitud más del motor: espera su turno en el límite de su host
+# (Crawl-delay incluido) y se lee en un hilo del motor, como una página.
+SITEMAP_SEEDING = True
+SITEMAP_MAX_URLS = 50_000   # URLs tomadas de los sitemaps de cada dominio
+SITEMAP_MAX_FILES = 100     # Archivos de sitemap leídos por dominio (índices incluidos)
+SITEMAP_FILES = deque()     # (dominio, url) de sitemaps por descargar
+SITEMAP_READING = 0         # Sitemaps descargándose (solo lo toca el hilo del motor)
+SITEMAP_STATE = {}          # dominio -> {"files": sitemaps ya encolados, "urls": URLs halladas}
+SITEMAP_LOCK = threading.Lock()
+SITEMAP_SEEDS = deque()     # (url, lastmod) halladas en hilos; el motor las pasa a la frontera
+# Recrawl incremental: de las URLs del sitemap solo se descargan las que tienen un <lastmod>
+# posterior a su último rastreo (guardado en RECRAWL_INDEX_PATH entre ejecuciones)
+RECRAWL_ONLY_CHANGED = True
+RECRAWL_INDEX_PATH = "crawler_recrawl.db"
+RECRAWL_INDEX = None        # RecrawlIndex abierto en __main__
+
+# Configurar session con el backend de descarga elegido (ver fetchers.py)
+def create_session(pool_connections=10, pool_maxsize=10, cache_dir=None, backend=None):
+    """Crea la session del backend `backend` (por defecto FETCHER_BACKEND).
+
+    En el motor asíncrono `pool_connections` es el nº de hosts con pool propio
+    y `pool_maxsize` el nº de conexiones por host; se dimensionan según
+    DOMAINS_TARGET y CONCURRENCY para que ningún fetcher espere una conexión libre.
+    Con `cache_dir` se adjunta una ResponseCache (`session.response_cache`) que
+    fetch_page usa para revalidar con GET condicional.
+    """
+    session = open_session(backend or FETCHER_BACKEND, pool_connections, pool_maxsize)
+    session.response_cache = ResponseCache(cache_dir, RESPONSE_CACHE_MAX_BYTES) if cache_dir else None
     return session
 
-# Descarga y parsea el archivo robots.txt para un dominio dado.
-def fetch_robots_txt(domain, session):
-    robots_url = f"https://{domain}/robots.txt"
+# Descarga y parsea el archivo robots.txt para un dominio dado (y encola sus sitemaps).
+def fetch_robots_txt(domain, session, scheme="https"):
+    robots_url = f"{scheme}://{domain}/robots.txt"
     console.log(f"Intentando descargar robots.txt de: {robots_url}")
     try:
         r = session.get(robots_url, timeout=5)
         if r.status_code == 200:
             parse_robots_txt(r.text, domain)
             console.log(f"robots.txt para {domain} descargado y parseado.")
+            if SITEMAP_SEEDING and ROBOTS_RULES[domain].sitemaps:
+                queue_sitemaps(domain, ROBOTS_RULES[domain].sitemaps)
         elif r.status_code == 404:
             console.log(f"robots.txt no encontrado (404) para {domain}. Asumiendo todo permitido.")
-            ROBOTS_RULES[domain] = {"allow": [], "disallow": []}
+            ROBOTS_RULES[domain] = RobotsMatcher.allow_all(ROBOTS_USER_AGENT)
         else:
+            # Se asume permitido, pero se reintenta antes que un robots.txt válido
             console.log(f"Error {r.status_code} al obtener robots.txt para {domain}.")
+            ROBOTS_RULES[domain] = RobotsMatcher.allow_all(ROBOTS_USER_AGENT, ttl=ROBOTS_RETRY_TTL)
     except requests.exceptions.RequestException as e:
         console.log(f"[bold red]Error al descargar robots.txt para {domain}: {e}[/bold red]")
-        ROBOTS_RULES[domain] = {"allow": [], "disallow": []}
+        ROBOTS_RULES[domain] = RobotsMatcher.allow_all(ROBOTS_USER_AGENT, ttl=ROBOTS_RETRY_TTL)
 
-# Parsea el contenido de robots.txt y almacena las reglas de 'Disallow' y 'Allow'.
+# Parsea el contenido de robots.txt y compila una sola vez sus reglas 'Allow'/'Disallow'.
 def parse_robots_txt(content, domain):
-    rules = {"allow": [], "disallow": []}
-    current_user_agent = None
-    processing_rules = False
-
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-
-        if line.lower().startswith("user-agent:"):
-            ua = line.split(":", 1)[1].strip()
-            if ua == "*" or ua.lower() == "dataexplore-crawler":
-                current_user_agent = ua
-                processing_rules = True
-            else:
-                processing_rules = False
-        elif processing_rules:
-            if line.lower().startswith("disallow:"):
-                path = line.split(":", 1)[1].strip()
-                if path:
-                    rules["disallow"].append(path)
-            elif line.lower().startswith("allow:"):
-                path = line.split(":", 1)[1].strip()
-                if path:
-                    rules["allow"].append(path)
+    rules = RobotsMatcher(content, ROBOTS_USER_AGENT)
     ROBOTS_RULES[domain] = rules
     console.log(f"Reglas de robots.txt para {domain}: {rules}")
 
-# Verifica si una URL está permitida según las reglas de robots.txt
+# Encola sitemaps del dominio para que los descargue el motor (sin repetir y hasta SITEMAP_MAX_FILES)
+def queue_sitemaps(domain, sitemap_urls):
+    with SITEMAP_LOCK:
+        state = SITEMAP_STATE.setdefault(domain, {"files": set(), "urls": 0})
+        for sitemap_url in sitemap_urls:
+            if sitemap_url not in state["files"] and len(state["files"]) < SITEMAP_MAX_FILES:
+                state["files"].add(sitemap_url)
+                SITEMAP_FILES.append((domain, sitemap_url))
+
+# Hay sitemaps por descargar o descargándose (sus URLs todavía no están en SITEMAP_SEEDS)
+def sitemaps_pending():
+    return bool(SITEMAP_FILES) or SITEMAP_READING > 0
+
+# Saca el primer sitemap pendiente cuyo host tenga un turno disponible (como take_ready_url).
+# Devuelve (dominio, url) o (None, None).
+def take_ready_sitemap():
+    for _ in range(len(SITEMAP_FILES)):
+        domain, sitemap_url = SITEMAP_FILES.popleft()
+        if get_host_limiter(urlparse(sitemap_url).netloc).try_acquire() == 0:
+            return domain, sitemap_url
+        SITEMAP_FILES.append((domain, sitemap_url))
+    return None, None
+
+# Lee un sitemap en streaming (bloqueante: corre en un hilo del motor). Sus URLs (con su <lastmod>)
+# quedan en SITEMAP_SEEDS y los sitemaps de un índice vuelven a la cola. Devuelve (status, tiempo).
+def read_sitemap(domain, sitemap_url, session):
+    start = time.time()
+    result = {}
+    found = 0
+    children = []
+    entries = iter_sitemap_file(session, sitemap_url, result, log=console.log)
+    with contextlib.closing(entries):
+        for kind, loc, lastmod in entries:
+            if kind == "sitemap":
+                children.append(loc)
+                continue
+            url = canonicalize_url(loc)
+            if urlparse(url).netloc != domain:
+                continue  # El protocolo solo admite URLs del mismo host que el sitemap
+            with SITEMAP_LOCK:
+                state = SITEMAP_STATE[domain]
+                if state["urls"] >= SITEMAP_MAX_URLS:
+                    break
+                state["urls"] += 1
+            SITEMAP_SEEDS.append((url, lastmod))
+            found += 1
+    queue_sitemaps(domain, children)
+    console.log(f"Sitemap {sitemap_url}: {found} URLs, {len(children)} sitemaps")
+    return result["status"], round(time.time() - start, 2)
+
+# Encola una URL de sitemap. Con RECRAWL_ONLY_CHANGED, si no cambió desde el último rastreo
+# se marca como vista, para que tampoco se descargue al encontrarla por enlaces.
+def queue_sitemap_url(url, lastmod, on_queued=None):
+    if RECRAWL_INDEX is not None and RECRAWL_ONLY_CHANGED and not RECRAWL_INDEX.is_changed(url, lastmod):
+        FRONTIER.mark_visited(url)
+    elif FRONTIER.add(url, 1) and on_queued is not None:
+        on_queued(url, 1)
+
+# Pasa a la frontera las URLs halladas en sitemaps (solo desde el hilo del motor: la frontera no es thread-safe)
+def add_sitemap_seeds(on_queued=None):
+    while SITEMAP_SEEDS:
+        queue_sitemap_url(*SITEMAP_SEEDS.popleft(), on_queued)
+
+# Verifica si una URL está permitida según las reglas de robots.txt (gana la regla más larga)
 def is_allowed_by_robots(url, session):
     parsed_url = urlparse(url)
     domain = parsed_url.netloc
-    path = parsed_url.path
+    path = parsed_url.path or "/"
+    if parsed_url.query:
+        path += "?" + parsed_url.query
 
-    if domain not in ROBOTS_RULES:
-        fetch_robots_txt(domain, session)
+    rules = ROBOTS_RULES.get(domain)
+    if rules is None or rules.is_expired():
+        fetch_robots_txt(domain, session, parsed_url.scheme)
+        rules = ROBOTS_RULES[domain]
+        if domain in HOST_LIMITERS:
+            HOST_LIMITERS[domain].set_crawl_delay(rules.crawl_delay)
 
-    rules = ROBOTS_RULES.get(domain, {"allow": [], "disallow": []})
+    return rules.is_allowed(path)
 
-    allow_patterns = [re.compile(re.escape(p).replace("\\*", ".*")) for p in rules.get("allow", [])]
-    disallow_patterns = [re.compile(re.escape(p).replace("\\*", ".*")) for p in rules.get("disallow", [])]
+# Verifica si la URL pertenece a alguno de los dominios objetivo
+def is_same_domain(url):
+    return urlparse(url).netloc.endswith(tuple(DOMAINS_TARGET))
 
-    for pattern in sorted(allow_patterns, key=lambda p: len(p.pattern), reverse=True):
-        if pattern.match(path):
-            return True
+# Control de ritmo por host: cada dominio tiene su propio límite adaptativo (ver ratelimit.py),
+# con el Crawl-delay de su robots.txt como piso del intervalo
+HOST_LIMITERS = {}
+RETRIES = {}  # url -> reintentos hechos tras un 429/503
 
-    for pattern in sorted(disallow_patterns, key=lambda p: len(p.pattern), reverse=True):
-        if pattern.match(path):
-            return False
+def get_host_limiter(host):
+    if host not in HOST_LIMITERS:
+        robots = ROBOTS_RULES.get(host)
+        HOST_LIMITERS[host] = AdaptiveHostLimiter(
+            1 / DELAY_BETWEEN_REQUESTS, max_rate=MAX_HOST_RATE, max_concurrency=MAX_HOST_CONCURRENCY,
+            target_latency=TARGET_LATENCY, adaptive=ADAPTIVE_RATE,
+            crawl_delay=robots.crawl_delay if robots is not None else None,
+        )
+    return HOST_LIMITERS[host]
 
-    return True
+# Saca de la frontera la primera URL cuyo host tenga un turno disponible.
+# Devuelve (url, profundidad, 0) o (None, None, espera mínima) si ningún host de la ventana está listo.
+def take_ready_url():
+    waits = [DELAY_BETWEEN_REQUESTS]
 
-# Verifica si la URL pertenece al dominio objetivo
-def is_same_domain(url):
-    return urlparse(url).netloc.endswith(DOMAIN_TARGET)
+    def is_ready(url):
+        wait = get_host_limiter(urlparse(url).netloc).try_acquire()
+        waits.append(wait)
+        return wait == 0
 
-# Bucle Principal del Crawler
-if __name__ == "__main__":
-    console.print(f"[bold cyan]Iniciando DataExplore Crawler con HTTP Keep-Alive para {DOMAIN_TARGET}[/bold cyan]")
-
-    # Crear session con pooling
-    session = create_session()
-    console.print(f"[green]✓ Session creada con HTTP Keep-Alive Pooling[/green]")
-
-    # Asegurarse de pre-cargar el robots.txt para el dominio inicial
-    initial_domain = urlparse(QUEUE[0]).netloc
-    if initial_domain not in ROBOTS_RULES:
-        fetch_robots_txt(initial_domain, session)
-
-    with open("crawler_log.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["#", "url", "status", "elapsed_s", "n_links_found", "is_allowed_by_robots"])
-
-        table = Table(title=f"Tráfico HTTP - {DOMAIN_TARGET.upper()}", show_lines=True)
-        table.add_column("#", style="cyan")
-        table.add_column("URL solicitada", style="magenta")
-        table.add_column("Código HTTP", style="green")
-        table.add_column("Tiempo (s)", style="yellow")
-        table.add_column("Enlaces", style="blue")
-        table.add_column("Permitido", style="white")
-
-        count = 0
-        
-        while QUEUE and count < MAX_PAGES:
-            url_to_crawl = QUEUE.pop(0)
-
-            if url_to_crawl in VISITED:
-                continue
+    found = FRONTIER.pop_ready(is_ready, READY_SCAN_WINDOW)
+    if found is None:
+        return None, None, min(waits)
+    return found[0], found[1], 0
+
+# Si la extracción cortó antes del final, descarta el resto del cuerpo (si es chico)
+# para que urllib3 devuelva la conexión al pool en vez de cerrarla
+def release_response(r):
+    content_length = r.headers.get("Content-Length")
+    if content_length is None or not content_length.isdigit():
+        return
+    if int(content_length) - r.raw.tell() <= STREAM_DRAIN_MAX_BYTES:
+        r.raw.drain_conn()
+
+def is_html(content_type):
+    return content_type.split(";", 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+# Corta el cuerpo tras `max_bytes` (ya descomprimidos: también frena bombas de compresión)
+def limit_bytes(chunks, max_bytes, state):
+    for chunk in chunks:
+        if state["bytes"] + len(chunk) > max_bytes:
+            keep = max_bytes - state["bytes"]
+            state["bytes"] = max_bytes
+            state["truncated"] = True
+            if keep:
+                yield chunk[:keep]
+            return
+        state["bytes"] += len(chunk)
+        yield chunk
+
+# Abre el pipeline de extracción que escribe el corpus en `path` (Parquet o JSONL, .gz comprimido)
+def open_corpus(path, workers=None):
+    batching = {"batch_size": LOG_BATCH_SIZE, "flush_interval": LOG_FLUSH_INTERVAL}
+    if path.endswith(".parquet"):
+        sink = ParquetSink(path, CORPUS_COLUMNS, CORPUS_PARQUET_TYPES, **batching)
+    else:
+        sink = JsonlSink(path, CORPUS_COLUMNS, **batching)
+    return ExtractionPipeline(sink, workers=CORPUS_WORKERS if workers is None else workers,
+                              max_pending=CORPUS_MAX_PENDING)
+
+# "corpus.jsonl.gz" -> "corpus.shard1.jsonl.gz" (un archivo por proceso)
+def corpus_path_for(path, tag):
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition(".")
+    return os.path.join(directory, f"{stem}.{tag}{dot}{extension}")
+
+# Charset declarado en Content-Type (requests supone ISO-8859-1 si falta: mejor que decida el <meta>)
+def declared_charset(content_type):
+    if "charset=" not in (content_type or "").lower():
+        return None
+    return requests.utils.get_encoding_from_headers({"content-type": content_type})
+
+# Lee el cuerpo (hasta MAX_PAGE_BYTES) extrayendo los enlaces internos y, si se puede, los guarda en el caché.
+# Solo con el pipeline activo se lee entero: va a la extracción de contenido y al caché (para reusarlo ante
+# un 304); si no, el caché guarda validadores y enlaces y la lectura puede cortar en MAX_LINKS_PER_PAGE.
+def read_page(r, url_to_crawl, cache, extra, timings):
+    cacheable = (cache is not None and r.status_code == 200
+                 and ("ETag" in r.headers or "Last-Modified" in r.headers))
+    extracting = PIPELINE is not None and r.status_code == 200
+    sink = [] if extracting else None
+    text = [] if NEAR_DUP_DETECTION else None
+    body = {"bytes": 0, "truncated": False}
+    chunks = limit_bytes(r.iter_content(CHUNK_SIZE), MAX_PAGE_BYTES, body)
+
+    # Extraer enlaces y filtrar por el mismo dominio
+    if LINK_EXTRACTION == "stream":
+        found_links, _ = extract_links_streaming(
+            r, url_to_crawl, keep=is_same_domain, limit=MAX_LINKS_PER_PAGE,
+            backend=LINK_PARSER_BACKEND, sink=sink, chunks=chunks, text=text,
+            text_limit=NEAR_DUP_MAX_CHARS, timings=timings
+        )
+        if sink is not None:
+            sink.extend(chunks)  # Resto del cuerpo, para el corpus
+    else:
+        content = b"".join(chunks)
+        parse_start = time.perf_counter()
+        html = content.decode(r.encoding or "utf-8", errors="replace")
+        found_links = extract_links_soup(html, url_to_crawl, keep=is_same_domain, text=text,
+                                          text_limit=NEAR_DUP_MAX_CHARS)
+        timings["parse"] = time.perf_counter() - parse_start
+        if sink is not None:
+            sink.append(content)
+    release_response(r)
+
+    if body["truncated"]:
+        # Página cortada en MAX_PAGE_BYTES: se usan los enlaces leídos, pero no se cachea incompleta
+        extra["aborted"] = "max-bytes"
+        cacheable = False
+        content_length = r.headers.get("Content-Length", "")
+        if content_length.isdigit():
+            extra["bytes_saved"] = max(0, int(content_length) - r.raw.tell())
+
+    # Canonicalizar antes de que la frontera compare (fragmentos, utm_*, puertos por defecto...)
+    postprocess_start = time.perf_counter()
+    found_links = [canonicalize_url(link) for link in found_links]
+    timings["postprocess"] = time.perf_counter() - postprocess_start
+    if text:
+        simhash_start = time.perf_counter()
+        extra["simhash"] = simhash(" ".join(text), min_words=NEAR_DUP_MIN_WORDS)
+        timings["simhash"] = time.perf_counter() - simhash_start
+
+    if cacheable or extracting:
+        postprocess_start = time.perf_counter()
+        content = b"".join(sink) if extracting else None
+        if cacheable:
+            content_length = r.headers.get("Content-Length", "")
+            size = int(content_length) if content_length.isdigit() else body["bytes"]
+            cache.store(url_to_crawl, r.headers, content, found_links, size=size)
+        if extracting:
+            content_type = r.headers.get("Content-Type", "")
+            PIPELINE.submit(url_to_crawl, content_type, content, declared_charset(content_type),
+                            truncated=body["truncated"])
+        timings["postprocess"] += time.perf_counter() - postprocess_start
+    return found_links
+
+# Documento sin enlaces que solo interesa al corpus (p. ej. un PDF): se lee hasta MAX_PAGE_BYTES y se encola
+def read_document(r, url_to_crawl, extra, timings):
+    body = {"bytes": 0, "truncated": False}
+    content = b"".join(limit_bytes(r.iter_content(CHUNK_SIZE), MAX_PAGE_BYTES, body))
+    if body["truncated"]:
+        extra["aborted"] = "max-bytes"
+        release_response(r)
+    if r.status_code == 200:
+        postprocess_start = time.perf_counter()
+        PIPELINE.submit(url_to_crawl, r.headers.get("Content-Type", ""), content, truncated=body["truncated"])
+        timings["postprocess"] = time.perf_counter() - postprocess_start
+    return []
+
+# Descarga una página y extrae sus enlaces internos (bloqueante: corre en un hilo del motor).
+# Devuelve (status, tiempo, enlaces, extra) donde `extra` trae las columnas de LOG_EXTRA_COLUMNS.
+def fetch_page(url_to_crawl, session):
+    extra = {}
+    cache = getattr(session, "response_cache", None)
+    start_request_time = time.time()
+    try:
+        cached = cache.lookup(url_to_crawl) if cache is not None else None
+        if cached is not None and PIPELINE is not None and cached.body_hash is None:
+            cached = None  # Guardada sin cuerpo (rastreo sin corpus): se descarga entera para el corpus
+
+        # Usar la misma session para todas las solicitudes (Keep-Alive, salvo el backend "nopool")
+        timings = start_request_timings()
+        start = time.perf_counter()
+        r = session.get(url_to_crawl, timeout=10, stream=True, headers=ResponseCache.conditional_headers(cached))
+        headers_received = time.perf_counter()
+        try:
+            status_code = r.status_code
+            if status_code in THROTTLE_STATUSES:
+                extra["retry_after"] = r.headers.get("Retry-After")
+
+            if status_code == 304 and cached is not None:
+                # Sin cambios desde el último rastreo: se reutilizan los enlaces ya extraídos
+                # y, con el corpus activo, el cuerpo guardado
+                found_links = cached.links
+                cache.touch(url_to_crawl)
+                extra.update(cache="HIT", bytes_saved=cached.size)
+                if PIPELINE is not None:
+                    postprocess_start = time.perf_counter()
+                    content = cache.body(cached)
+                    if content is not None:
+                        content_type = cached.content_type or "text/html"
+                        PIPELINE.submit(url_to_crawl, content_type, content, declared_charset(content_type))
+                    timings["postprocess"] = time.perf_counter() - postprocess_start
+            else:
+                # Antes de leer el cuerpo: lo que no es HTML o excede el tope no se descarga
+                content_type = r.headers.get("Content-Type", "")
+                content_length = r.headers.get("Content-Length", "")
+                content_length = int(content_length) if content_length.isdigit() else None
+                extra["content_encoding"] = r.headers.get("Content-Encoding", "")
+                document = bool(content_type) and not is_html(content_type)
+                if document and (PIPELINE is None or not PIPELINE.accepts(content_type)):
+                    extra["aborted"] = "content-type"
+                elif content_length is not None and content_length > MAX_PAGE_BYTES:
+                    extra["aborted"] = "too-large"
+
+                if "aborted" in extra:
+                    found_links = []
+                    release_response(r)
+                    # Un cuerpo chico se descarta leyéndolo (para reutilizar la conexión): no es un ahorro
+                    extra["bytes_saved"] = max(0, content_length - r.raw.tell()) if content_length is not None else ""
+                elif document:
+                    found_links = read_document(r, url_to_crawl, extra, timings)
+                    extra.setdefault("bytes_saved", 0)
+                else:
+                    found_links = read_page(r, url_to_crawl, cache, extra, timings)
+                    if cache is not None:
+                        extra.update(cache="MISS")
+                    extra.setdefault("bytes_saved", 0)
+            bytes_transferred = r.raw.tell()  # Bytes del cuerpo recibidos (comprimidos, si aplica)
+        finally:
+            r.close()
+
+        # Con streaming la descarga y el parseo se solapan: el tiempo incluye ambos
+        end_request_time = time.time()
+        response_time = round(end_request_time - start_request_time, 2)
+
+        # Desglose por fase: el parseo, la huella SimHash y el posproceso (canonicalizar enlaces, caché
+        # y pipeline de contenido) se miden aparte; lo que resta del cuerpo es descarga
+        body_time = time.perf_counter() - headers_received
+        connection_time = timings["dns"] + timings["connect"] + timings["tls"]
+        parse_time = timings.get("parse", 0.0)
+        simhash_time = timings.get("simhash", 0.0)
+        postprocess_time = timings.get("postprocess", 0.0)
+        extra.update(
+            dns_s=round(timings["dns"], 4),
+            connect_s=round(timings["connect"], 4),
+            tls_s=round(timings["tls"], 4),
+            ttfb_s=round(max(0.0, headers_received - start - connection_time), 4),
+            download_s=round(max(0.0, body_time - parse_time - simhash_time - postprocess_time), 4),
+            parse_s=round(parse_time, 4),
+            simhash_s=round(simhash_time, 4),
+            postprocess_s=round(postprocess_time, 4),
+            conn_reused=timings["new_connections"] == 0,
+            bytes=bytes_transferred,
+        )
+
+    except requests.exceptions.RequestException as e:
+        status_code, response_time, found_links = "ERR", round(time.time() - start_request_time, 2), []
+        console.log(f"[bold red]Error al acceder {url_to_crawl}: {e}[/bold red]")
+    except Exception as e:
+        status_code, response_time, found_links = "ERR", round(time.time() - start_request_time, 2), []
+        console.log(f"[bold red]Error inesperado con {url_to_crawl}: {e}[/bold red]")
+
+    extra["fetched_at"] = round(time.time(), 3)
+    return status_code, response_time, found_links, extra
+
+# Registra cada URL procesada en los sinks (CSV y opcionales) y en la vista en vivo (numera las filas con "#")
+class LogReporter:
+    def __init__(self, sink, view, metrics=None, snapshot_path=None):
+        self.sink = sink
+        self.view = view
+        self.metrics = metrics if metrics is not None else CrawlMetrics()
+        self.snapshot_path = snapshot_path
+        self.last_snapshot = time.monotonic()
+        self.count = 0
+        self.dup_links = 0   # Enlaces descartados por ya vistos (tras canonicalizar)
+        self.near_dups = 0   # Páginas casi duplicadas cuyos enlaces no se expandieron
+
+    def record(self, url_to_crawl, status_code, response_time, n_links_detected, extra=None):
+        extra_values = [(extra or {}).get(column, "") for column in LOG_EXTRA_COLUMNS]
+        self.metrics.observe(url_to_crawl, status_code, response_time, extra or {})
+        if self.snapshot_path and time.monotonic() - self.last_snapshot >= METRICS_SNAPSHOT_INTERVAL:
+            self.metrics.write_snapshot(self.snapshot_path)
+            self.last_snapshot = time.monotonic()
+
+        if status_code == "BLOCKED":
+            self.sink.write([self.count + 1, url_to_crawl, "BLOCKED", 0, 0, False] + extra_values)
+            self.view.add(self.count + 1, url_to_crawl, status_code, 0, 0)
+            return
+
+        self.count += 1
+        count = self.count
+        self.dup_links += (extra or {}).get("dup_links", 0)
+        self.near_dups += 1 if (extra or {}).get("near_dup_of") else 0
+
+        self.sink.write([count, url_to_crawl, status_code, response_time, n_links_detected, True] + extra_values)
+        self.view.add(count, url_to_crawl, status_code, response_time, n_links_detected)
+
+    def flush(self):
+        self.sink.flush()
+        if self.snapshot_path:
+            self.metrics.write_snapshot(self.snapshot_path)
+
+# Motor asíncrono: CONCURRENCY fetchers comparten la frontera y respetan el límite por host.
+# on_page(url, depth, status, elapsed, found_links, extra) recibe cada resultado ("BLOCKED" si robots.txt lo impide).
+# wait_for_work(), si se pasa, se llama con la frontera vacía y sin descargas en curso:
+# devuelve True para seguir esperando URLs (modo multiproceso) o False para terminar.
+# Con sitemap_seeds=False las URLs de sitemaps quedan en SITEMAP_SEEDS (las reparte el coordinador).
+async def crawl(session, on_page, wait_for_work=None, should_stop=lambda: False, max_pages=None, on_queued=None,
+                sitemap_seeds=True):
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    state = {"started": 0, "in_flight": 0}
+    # Un hilo por fetcher: el pool por defecto de asyncio.to_thread es de min(32, núcleos + 4)
+    # hilos y limitaría CONCURRENCY según la máquina. asyncio.run lo cierra al terminar.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(CONCURRENCY + EXTRA_THREADS, thread_name_prefix="fetcher"))
+
+    async def read_next_sitemap():
+        global SITEMAP_READING
+        domain, sitemap_url = take_ready_sitemap()
+        if sitemap_url is None:
+            return False
+        limiter = get_host_limiter(urlparse(sitemap_url).netloc)
+        status_code = None
+        SITEMAP_READING += 1
+        try:
+            status_code, response_time = await asyncio.to_thread(read_sitemap, domain, sitemap_url, session)
+        finally:
+            SITEMAP_READING -= 1
+            if status_code is None:
+                limiter.release()
+        limiter.release(status_code, response_time)
+        return True
 
-            # Respetar robots.txt
-            if not is_allowed_by_robots(url_to_crawl, session):
-                console.log(f"[bold red]🚫 URL no permitida por robots.txt: {url_to_crawl}[/bold red]")
-                VISITED.add(url_to_crawl)
-                writer.writerow([count + 1, url_to_crawl, "BLOCKED", 0, 0, False])
+    async def worker():
+        while state["started"] < max_pages and not should_stop():
+            if sitemap_seeds:
+                add_sitemap_seeds(on_queued)
+            if SITEMAP_FILES and await read_next_sitemap():
+                continue
+            url_to_crawl, depth, wait = take_ready_url()
+            if url_to_crawl is None:
+                if not FRONTIER and not sitemaps_pending() and state["in_flight"] == 0:
+                    if wait_for_work is None or not await wait_for_work():
+                        return
+                    continue
+                await asyncio.sleep(wait if FRONTIER and not SITEMAP_FILES else 0.05)
                 continue
 
-            # Respetar el límite de 1 solicitud/s
-            start_request_time = time.time()
+            limiter = get_host_limiter(urlparse(url_to_crawl).netloc)
+            status_code = None
+            state["in_flight"] += 1
             try:
-                # Usar la misma session para todas las solicitudes (HTTP Keep-Alive)
-                r = session.get(url_to_crawl, timeout=10)
-                end_request_time = time.time()
-
-                status_code = r.status_code
-                response_time = round(end_request_time - start_request_time, 2)
-
-                soup = BeautifulSoup(r.text, "html.parser")
-
-                # Extraer enlaces y filtrar por el mismo dominio
-                found_links = []
-                for a_tag in soup.select("a[href]"):
-                    href = a_tag.get("href")
-                    if href:
-                        full_url = urljoin(url_to_crawl, href)
-                        if is_same_domain(full_url):
-                            found_links.append(full_url)
-
-                # Añadir enlaces a la cola
-                for link in found_links[:100]:
-                    if link not in VISITED and link not in QUEUE:
-                        QUEUE.append(link)
-
-                n_links_detected = len(found_links)
-
-            except requests.exceptions.RequestException as e:
-                status_code, response_time, n_links_detected = "ERR", round(time.time() - start_request_time, 2), 0
-                console.log(f"[bold red]Error al acceder {url_to_crawl}: {e}[/bold red]")
-            except Exception as e:
-                status_code, response_time, n_links_detected = "ERR", round(time.time() - start_request_time, 2), 0
-                console.log(f"[bold red]Error inesperado con {url_to_crawl}: {e}[/bold red]")
-
-            VISITED.add(url_to_crawl)
-            count += 1
-
-            # Imprimir en consola los detalles solicitados
-            console.log(f"\n[bold green]URL solicitada:[/bold green] {url_to_crawl}")
-            console.log(f"[bold green]Código HTTP:[/bold green] {status_code}")
-            console.log(f"[bold green]Tiempo de respuesta:[/bold green] {response_time}s")
-            console.log(f"[bold green]Nº enlaces detectados:[/bold green] {n_links_detected}")
-            console.log("-" * 60)
-
-            # Actualizar tabla de Rich
-            table.add_row(
-                str(count),
-                url_to_crawl[:70] + "..." if len(url_to_crawl) > 70 else url_to_crawl,
-                str(status_code),
-                str(response_time),
-                str(n_links_detected),
-                "[green]Sí[/green]" if is_allowed_by_robots(url_to_crawl, session) else "[red]No[/red]"
-            )
-            console.clear()
-            console.print(table)
-
-            # Escribir en el log CSV
-            writer.writerow([count, url_to_crawl, status_code, response_time, n_links_detected, True])
-
-            # Control de tiempo para asegurar 1 solicitud/s
-            time_elapsed_since_start = time.time() - start_request_time
-            sleep_duration = max(0, DELAY_BETWEEN_REQUESTS - time_elapsed_since_start)
-            if sleep_duration > 0:
-                time.sleep(sleep_duration)
-
-    # Cerrar la session al finalizar
-    session.close()
+                # Respetar robots.txt (puede descargar robots.txt de un host nuevo)
+                robots_start = time.perf_counter()
+                allowed = await asyncio.to_thread(is_allowed_by_robots, url_to_crawl, session)
+                robots_time = round(time.perf_counter() - robots_start, 4)
+                if not allowed:
+                    on_page(url_to_crawl, depth, "BLOCKED", 0, [], {"robots_s": robots_time})
+                    continue
+
+                if state["started"] >= max_pages:
+                    return
+                state["started"] += 1
+                status_code, response_time, found_links, extra = await asyncio.to_thread(fetch_page, url_to_crawl, session)
+                extra["robots_s"] = robots_time
+            finally:
+                state["in_flight"] -= 1
+                if status_code is None:
+                    limiter.release()  # Sin descarga: bloqueada por robots.txt o cancelada
+
+            # Ajustar el ritmo del host; ante 429/503 la URL vuelve a la cola tras la pausa
+            backoff = limiter.release(status_code, response_time, parse_retry_after(extra.pop("retry_after", None)))
+            extra["host_rate"] = round(limiter.rate, 3)
+            if backoff:
+                extra["backoff_s"] = round(backoff, 2)
+            if status_code in THROTTLE_STATUSES and RETRIES.get(url_to_crawl, 0) < MAX_RETRIES:
+                # No es el resultado final de la URL: no va a on_page (log, checkpoint, grafo, coordinador)
+                # ni cuenta para max_pages; solo vuelve a la frontera
+                RETRIES[url_to_crawl] = RETRIES.get(url_to_crawl, 0) + 1
+                FRONTIER.requeue(url_to_crawl, depth)
+                state["started"] -= 1
+                continue
+
+            on_page(url_to_crawl, depth, status_code, response_time, found_links, extra)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return state["started"]
+
+# Anota la página y sus enlaces en el grafo (--graph) y, en modo "priority", recalcula el
+# PageRank de lo pendiente cuando el grafo creció lo suficiente desde el último cálculo
+def record_links(url_to_crawl, depth, status_code, found_links, extra):
+    global PRIORITY_LEVELS, NEXT_PRIORITY_REFRESH
+    if GRAPH is None or status_code == "BLOCKED":
+        return
+    GRAPH.add_page(url_to_crawl, depth, found_links)
+    if FRONTIER.mode == "priority" and GRAPH.n_pages >= NEXT_PRIORITY_REFRESH:
+        PRIORITY_LEVELS = priority_levels(pagerank(GRAPH.graph()))
+        FRONTIER.reprioritize()
+        NEXT_PRIORITY_REFRESH = max(GRAPH.n_pages + PRIORITY_REFRESH_MIN_PAGES,
+                                    int(GRAPH.n_pages * PRIORITY_REFRESH_GROWTH))
+
+# Enlaces de la página que hay que expandir: ninguno si su contenido es casi igual al de una
+# página ya vista (anota "near_dup_of" en `extra`). La huella no va al log.
+def links_to_expand(url_to_crawl, found_links, extra):
+    fingerprint = extra.pop("simhash", None)
+    if fingerprint is not None:
+        original = CONTENT_INDEX.match_or_add(fingerprint, url_to_crawl)
+        if original is not None:
+            extra["near_dup_of"] = original
+            return []
+    return found_links[:MAX_LINKS_PER_PAGE]
+
+# Rastreo en un solo proceso: los enlaces encontrados vuelven a la frontera local.
+# Con `checkpoint`, cada cambio de la frontera se anota y se guarda cada CHECKPOINT_INTERVAL segundos.
+def crawl_single(session, reporter, checkpoint=None):
+    def on_page(url_to_crawl, depth, status_code, response_time, found_links, extra):
+        # Añadir enlaces a la frontera (ignora los ya visitados o en cola)
+        enqueue_start = time.perf_counter()
+        record_links(url_to_crawl, depth, status_code, found_links, extra)
+        dup_links = 0
+        for link in links_to_expand(url_to_crawl, found_links, extra):
+            if FRONTIER.add(link, depth + 1):
+                if checkpoint is not None:
+                    checkpoint.queued(link, depth + 1)
+            else:
+                dup_links += 1
+        extra["dup_links"] = dup_links
+        extra["enqueue_s"] = round(time.perf_counter() - enqueue_start, 4)
+        reporter.record(url_to_crawl, status_code, response_time, len(found_links), extra)
+
+        if RECRAWL_INDEX is not None and status_code in (200, 304):
+            RECRAWL_INDEX.record(url_to_crawl)
+
+        if checkpoint is not None:
+            checkpoint.visited(url_to_crawl)
+            if checkpoint.due():
+                reporter.flush()  # El log nunca queda atrás del checkpoint
+                checkpoint.flush(ROBOTS_RULES, count=reporter.count)
+                if RECRAWL_INDEX is not None:
+                    RECRAWL_INDEX.flush()
+
+    on_queued = checkpoint.queued if checkpoint is not None else None
+    asyncio.run(crawl(session, on_page, max_pages=MAX_PAGES - reporter.count, on_queued=on_queued))
+    reporter.flush()
+    if checkpoint is not None:
+        checkpoint.flush(ROBOTS_RULES, count=reporter.count)
+    if RECRAWL_INDEX is not None:
+        RECRAWL_INDEX.flush()
+    return reporter.count
+
+# --- Modo multiproceso: hosts repartidos entre procesos por hash ---
+
+# Proceso dueño de una URL (o host): hash estable, igual en todos los procesos
+def shard_of(url, n_shards):
+    host = urlparse(url).netloc if "://" in url else url
+    return zlib.crc32(host.encode("utf-8")) % n_shards
+
+# Proceso worker: frontera, robots.txt y token buckets propios para sus hosts.
+# Mensajes al coordinador: ("page", shard, fila, {shard_dueño: [(url, depth), ...]}, (depth, enlaces) o None),
+# ("idle", shard, lotes_recibidos) y ("done", shard). Del coordinador recibe lotes de URLs o None (fin).
+# Los enlaces de cada página solo se envían con --graph: el grafo lo escribe el coordinador.
+def shard_worker(shard, n_shards, domains, inbox, results):
+    global FRONTIER, RECRAWL_INDEX, PIPELINE, GRAPH
+    DOMAINS_TARGET[:] = domains
+    send_links = GRAPH is not None
+    GRAPH = None  # Heredado por fork: es del coordinador
+    if RECRAWL_INDEX is not None:
+        # Conexión SQLite propia (solo lectura aquí: el coordinador registra los rastreos)
+        RECRAWL_INDEX = RecrawlIndex(RECRAWL_INDEX.path)
+    if CORPUS_PATH:
+        PIPELINE = open_corpus(corpus_path_for(CORPUS_PATH, f"shard{shard}"), workers=0)
+    console.quiet = True  # Solo el coordinador escribe en la consola
+    FRONTIER = new_frontier()
+    session = create_session(pool_connections=max(10, len(domains)), pool_maxsize=CONCURRENCY,
+                             cache_dir=RESPONSE_CACHE_DIR)
+    try:
+        asyncio.run(_shard_main(shard, n_shards, session, inbox, results, send_links))
+    finally:
+        session.close()
+        if session.response_cache is not None:
+            session.response_cache.close()
+        FRONTIER.close()
+        if PIPELINE is not None:
+            PIPELINE.close()
+
+async def _shard_main(shard, n_shards, session, inbox, results, send_links=False):
+    state = {"received": 0, "idle_sent": False, "stop": False}
+
+    async def read_inbox():
+        while True:
+            batch = await asyncio.to_thread(inbox.get)
+            if batch is None:
+                state["stop"] = True
+                return
+            for url, depth in batch:
+                FRONTIER.add(url, depth)
+            state["received"] += 1
+            state["idle_sent"] = False
+
+    def on_page(url_to_crawl, depth, status_code, response_time, found_links, extra):
+        # Los enlaces propios van a la frontera local; los ajenos, al coordinador para su dueño
+        # (dup_links solo cuenta los propios: los ajenos los deduplica su shard)
+        enqueue_start = time.perf_counter()
+        foreign = {}
+        dup_links = 0
+        for link in links_to_expand(url_to_crawl, found_links, extra):
+            owner = shard_of(link, n_shards)
+            if owner != shard:
+                foreign.setdefault(owner, []).append((link, depth + 1))
+            elif not FRONTIER.add(link, depth + 1):
+                dup_links += 1
+        extra["dup_links"] = dup_links
+        extra["enqueue_s"] = round(time.perf_counter() - enqueue_start, 4)
+        links = (depth, found_links) if send_links else None
+        results.put(("page", shard, (url_to_crawl, status_code, response_time, len(found_links), extra), foreign, links))
+
+    async def wait_for_work():
+        if not state["idle_sent"] and not state["stop"]:
+            results.put(("idle", shard, state["received"]))
+            state["idle_sent"] = True
+        await asyncio.sleep(0.05)
+        return not state["stop"]
+
+    reader = asyncio.create_task(read_inbox())
+    await crawl(session, on_page, wait_for_work, should_stop=lambda: state["stop"])
+    results.put(("done", shard))
+    await reader
+
+# Arranca los procesos shard. Heredan por fork el estado del módulo tal como lo dejó main() o el
+# script que lo importó (constantes, FETCHER_BACKEND, CORPUS_PATH, GRAPH, RECRAWL_INDEX, SEED_URLS...):
+# con "spawn" o "forkserver" (Windows, macOS y Linux desde Python 3.14) volverían a los valores por
+# defecto. Por eso se fuerza "fork" y el modo solo corre en POSIX; en otras plataformas, --broker.
+# Un fork solo copia el hilo que lo llama: hay que llamarla antes de abrir hilos (vista en vivo,
+# servidor de métricas), o un lock tomado por uno de ellos queda tomado para siempre en los hijos.
+def start_shards(n_shards):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError("El modo multiproceso (PROCESSES > 1) requiere fork (POSIX): usar --broker en esta plataforma")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    inboxes = [ctx.Queue() for _ in range(n_shards)]
+    processes = [
+        ctx.Process(target=shard_worker, args=(i, n_shards, list(DOMAINS_TARGET), inboxes[i], results), daemon=True)
+        for i in range(n_shards)
+    ]
+    for p in processes:
+        p.start()
+    return processes, inboxes, results
+
+# Coordinador: reparte las semillas, reenvía enlaces entre shards y une los resultados en un solo log.
+# `shards` son los procesos ya arrancados con start_shards(); si no se pasan, los arranca aquí.
+def crawl_sharded(n_shards, reporter, shards=None):
+    processes, inboxes, results = shards or start_shards(n_shards)
+
+    forwarded = [0] * n_shards  # Lotes enviados a cada shard
+    idle = {}                   # shard -> lotes recibidos cuando avisó que estaba ocioso
+    done = set()
+
+    def forward(owner, batch):
+        inboxes[owner].put(batch)
+        forwarded[owner] += 1
+
+    seeds = {}
+    for seed in SEED_URLS:
+        seeds.setdefault(shard_of(seed, n_shards), []).append((seed, 0))
+    for owner, batch in seeds.items():
+        forward(owner, batch)
+
+    while reporter.count < MAX_PAGES:
+        try:
+            message = results.get(timeout=1)
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes):
+                break
+            continue
+
+        kind, shard = message[0], message[1]
+        if kind == "page":
+            if message[4] is not None:
+                record_links(message[2][0], message[4][0], message[2][1], message[4][1], message[2][4])
+            reporter.record(*message[2])
+            if RECRAWL_INDEX is not None and message[2][1] in (200, 304):
+                RECRAWL_INDEX.record(message[2][0])
+            for owner, batch in message[3].items():
+                forward(owner, batch)
+        elif kind == "idle":
+            idle[shard] = message[2]
+        elif kind == "done":
+            done.add(shard)
+
+        # Fin: todos los shards ociosos y sin lotes pendientes de procesar
+        if all(i in done or idle.get(i) == forwarded[i] for i in range(n_shards)):
+            break
+
+    for inbox in inboxes:
+        inbox.put(None)
+    for p in processes:
+        p.join(timeout=30)
+        if p.is_alive():
+            p.terminate()
+    return reporter.count
+
+# --- Modo distribuido: coordinador y workers conectados por un broker (broker.py) ---
+
+# Saca de la frontera hasta `size` URLs de un mismo host, elegido entre los que no tienen un lote en curso
+def take_host_batch(busy_hosts, size):
+    batch = []
+    host = None
+
+    def is_ready(url):
+        nonlocal host
+        url_host = urlparse(url).netloc
+        if host is None and url_host not in busy_hosts:
+            host = url_host
+        return url_host == host
+
+    while len(batch) < size:
+        found = FRONTIER.pop_ready(is_ready, READY_SCAN_WINDOW)
+        if found is None:
+            break
+        batch.append(found)
+    return batch
+
+# Coordinador: dueño de la frontera y de la deduplicación (URLs y casi duplicados). Publica lotes
+# de un solo host, a lo sumo uno por host a la vez (así el ritmo de cada host lo lleva un solo
+# worker), y une los resultados en un solo log. Los lotes de un worker caído vuelven a la cola
+# cuando vence su lease. Resultados: {"pages": [[url, depth, status, elapsed, n_links, links, extra], ...],
+# "sitemap": [[url, lastmod], ...]}.
+def crawl_distributed(broker, reporter):
+    broker.reset()
+    published = {}  # batch_id -> (host, nº de URLs)
+    while reporter.count < MAX_PAGES:
+        expired = broker.expire()
+        if expired:
+            console.log(f"[yellow]{expired} lotes con el lease vencido vuelven a la cola[/yellow]")
+
+        results = broker.results()
+        for batch_id, result in results:
+            published.pop(batch_id, None)
+            for url, lastmod in result["sitemap"]:
+                queue_sitemap_url(url, lastmod)
+            for url_to_crawl, depth, status_code, response_time, n_links, links, extra in result["pages"]:
+                enqueue_start = time.perf_counter()
+                record_links(url_to_crawl, depth, status_code, links, extra)
+                dup_links = 0
+                for link in links_to_expand(url_to_crawl, links, extra):
+                    if not FRONTIER.add(link, depth + 1):
+                        dup_links += 1
+                extra["dup_links"] = dup_links
+                extra["enqueue_s"] = round(time.perf_counter() - enqueue_start, 4)
+                reporter.record(url_to_crawl, status_code, response_time, n_links, extra)
+                if RECRAWL_INDEX is not None and status_code in (200, 304):
+                    RECRAWL_INDEX.record(url_to_crawl)
+
+        busy_hosts = {host for host, _ in published.values()}
+        budget = MAX_PAGES - reporter.count - sum(n for _, n in published.values())
+        while len(published) < MAX_PUBLISHED_BATCHES and budget > 0:
+            batch = take_host_batch(busy_hosts, min(DISTRIBUTED_BATCH_SIZE, budget))
+            if not batch:
+                break
+            host = urlparse(batch[0][0]).netloc
+            published[broker.submit({"urls": batch})] = (host, len(batch))
+            busy_hosts.add(host)
+            budget -= len(batch)
+
+        if not published and not FRONTIER:
+            break
+        if not results:
+            time.sleep(BROKER_POLL_INTERVAL)
+
+    broker.stop()  # Con tcp:// el broker muere con el coordinador: los workers toman el cierre como el fin
+    reporter.flush()
+    if RECRAWL_INDEX is not None:
+        RECRAWL_INDEX.flush()
+    return reporter.count
+
+# Worker: toma lotes del broker y los rastrea con el motor asíncrono (robots.txt y ritmo por
+# host propios). Cada lote terminado vuelve en un solo mensaje con sus filas, sus enlaces y las
+# URLs de sitemaps halladas; la deduplicación la hace el coordinador.
+def distributed_worker(broker, worker_id, session):
+    global FRONTIER
+    FRONTIER = new_frontier()
+    try:
+        return asyncio.run(_worker_main(broker, worker_id, session))
+    finally:
+        FRONTIER.close()
+
+async def _worker_main(broker, worker_id, session):
+    state = {"stop": False}
+    open_batches = {}  # batch_id -> {"left": URLs sin resultado final, "pages": filas}
+    url_batch = {}     # url -> batch_id
+    finished = []
+
+    def on_page(url_to_crawl, depth, status_code, response_time, found_links, extra):
+        batch_id = url_batch.get(url_to_crawl)
+        if batch_id not in open_batches:
+            return
+        batch = open_batches[batch_id]
+        batch["pages"].append([url_to_crawl, depth, status_code, response_time, len(found_links),
+                               found_links[:MAX_LINKS_PER_PAGE], extra])
+        del url_batch[url_to_crawl]
+        batch["left"] -= 1
+        if batch["left"] == 0:
+            finished.append(batch_id)
+
+    async def sync_broker():
+        last_renew = time.monotonic()
+        try:
+            while True:
+                # Un lote se entrega con las URLs de los sitemaps que encoló su robots.txt
+                while finished and not sitemaps_pending():
+                    batch_id = finished.pop()
+                    sitemap = [list(SITEMAP_SEEDS.popleft()) for _ in range(len(SITEMAP_SEEDS))]
+                    result = {"pages": open_batches.pop(batch_id)["pages"], "sitemap": sitemap}
+                    if not await asyncio.to_thread(broker.complete, worker_id, batch_id, result):
+                        console.log(f"[yellow]Lote {batch_id} descartado: su lease venció y lo tomó otro worker[/yellow]")
+                if open_batches and time.monotonic() - last_renew >= LEASE_SECONDS / 3:
+                    await asyncio.to_thread(broker.renew, worker_id, list(open_batches), LEASE_SECONDS)
+                    last_renew = time.monotonic()
+
+                if len(open_batches) < WORKER_MAX_BATCHES:
+                    leased = await asyncio.to_thread(broker.lease, worker_id, LEASE_SECONDS)
+                    if leased is not None:
+                        batch_id, batch = leased
+                        open_batches[batch_id] = {"left": len(batch["urls"]), "pages": []}
+                        for url, depth in batch["urls"]:
+                            url_batch[url] = batch_id
+                            FRONTIER.requeue(url, depth)
+                        continue
+                    if await asyncio.to_thread(broker.stopped):
+                        return
+                await asyncio.sleep(BROKER_POLL_INTERVAL)
+        except (EOFError, ConnectionError):
+            # Un broker tcp:// se cierra cuando el coordinador termina: es el fin del rastreo
+            console.log("[yellow]El broker cerró la conexión: fin del rastreo[/yellow]")
+        except OSError as e:
+            console.log(f"[bold red]Se perdió la conexión con el broker: {e}[/bold red]")
+        finally:
+            state["stop"] = True
+
+    async def wait_for_work():
+        await asyncio.sleep(0.05)
+        return not state["stop"]
+
+    syncer = asyncio.create_task(sync_broker())
+    pages = await crawl(session, on_page, wait_for_work, should_stop=lambda: state["stop"],
+                        max_pages=float("inf"), sitemap_seeds=False)
+    await syncer
+    return pages
+
+# Punto de entrada de la línea de comandos. Las dependencias que solo usan algunos modos
+# (broker, pyarrow, parsers de corpus) se importan al elegir ese modo, así un rastreo corto
+# desde cron no paga su carga. `argv` permite llamarlo desde otro script.
+def main(argv=None):
+    global CORPUS_PATH, PIPELINE, FRONTIER, RECRAWL_INDEX, GRAPH, NEXT_PRIORITY_REFRESH, FETCHER_BACKEND, PROCESSES
+    parser = argparse.ArgumentParser(description="DataExplore Crawler")
+    parser.add_argument("--resume", action="store_true", help="reanuda el rastreo desde el último checkpoint")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help=f"archivo de checkpoint (por defecto {CHECKPOINT_PATH})")
+    parser.add_argument("--quiet", action="store_true", help="sin vista en vivo (para cron/producción)")
+    parser.add_argument("--jsonl", metavar="RUTA", help="además escribe los resultados en JSONL (.gz para comprimir)")
+    parser.add_argument("--parquet", metavar="RUTA", help="además escribe los resultados en Parquet (requiere pyarrow)")
+    parser.add_argument("--metrics-port", type=int, metavar="PUERTO", help="expone /metrics (formato Prometheus) en este puerto")
+    parser.add_argument("--metrics-json", metavar="RUTA", help=f"guarda una instantánea JSON de métricas cada {METRICS_SNAPSHOT_INTERVAL} s")
+    parser.add_argument("--broker", metavar="URL", help="modo distribuido: tcp://HOST:PUERTO (con CRAWLER_BROKER_KEY), sqlite:///RUTA o redis://HOST:PUERTO/DB")
+    parser.add_argument("--role", choices=["coordinator", "worker"], default="coordinator", help="papel en el modo distribuido")
+    parser.add_argument("--worker-id", help="nombre del worker (por defecto HOST-PID)")
+    parser.add_argument("--corpus", metavar="RUTA", help="guarda el contenido extraído de cada página (.jsonl.gz o .parquet)")
+    parser.add_argument("--graph", metavar="CARPETA", help="guarda el grafo de enlaces (analizarlo con linkgraph.py)")
+    parser.add_argument("--fetcher", choices=FETCHER_BACKENDS, default=FETCHER_BACKEND,
+                        help=f"backend de descarga (por defecto {FETCHER_BACKEND})")
+    parser.add_argument("--processes", type=int, default=PROCESSES, metavar="N",
+                        help=f"procesos entre los que se reparten los hosts (por defecto {PROCESSES}; >1 requiere fork)")
+    args = parser.parse_args(argv)
+    CORPUS_PATH = args.corpus
+    FETCHER_BACKEND = args.fetcher
+    if args.processes < 1:
+        parser.error("--processes debe ser 1 o más")
+    PROCESSES = args.processes
+    if PROCESSES > 1 and not args.broker and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("--processes > 1 requiere fork (Linux/macOS); en esta plataforma usar --broker con workers locales")
+    if args.broker and args.broker.startswith("tcp://") and not BROKER_AUTHKEY:
+        parser.error("--broker tcp:// requiere una clave secreta en CRAWLER_BROKER_KEY "
+                     "(la misma en el coordinador y en los workers)")
+
+    if args.role == "worker":
+        if not args.broker:
+            parser.error("--role worker requiere --broker")
+        from broker import open_broker
+        worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        broker = open_broker(args.broker, BROKER_AUTHKEY)
+        session = create_session(pool_connections=max(10, len(DOMAINS_TARGET)), pool_maxsize=CONCURRENCY,
+                                 cache_dir=RESPONSE_CACHE_DIR)
+        console.print(f"[bold cyan]Worker {worker_id} conectado a {args.broker} ({CONCURRENCY} fetchers, "
+                      f"backend {FETCHER_BACKEND})[/bold cyan]")
+        if CORPUS_PATH:
+            PIPELINE = open_corpus(CORPUS_PATH)
+        pages = distributed_worker(broker, worker_id, session)
+        session.close()
+        if session.response_cache is not None:
+            session.response_cache.close()
+        if PIPELINE is not None:
+            PIPELINE.close()
+        console.print(f"[bold green]Worker {worker_id} terminado: {pages} páginas descargadas.[/bold green]")
+        return 0
+
+    console.print(f"[bold cyan]Iniciando DataExplore Crawler (backend {FETCHER_BACKEND}) para {', '.join(DOMAINS_TARGET)}[/bold cyan]")
+
+    checkpoint = None
+    if PROCESSES == 1 and not args.broker:
+        if args.resume:
+            checkpoint = CrawlCheckpoint(args.checkpoint, CHECKPOINT_INTERVAL)
+            FRONTIER = new_frontier()
+            checkpoint.restore(FRONTIER, ROBOTS_RULES, ROBOTS_USER_AGENT)
+            console.print(f"[green]✓ Reanudando desde {args.checkpoint}: {len(FRONTIER)} URLs pendientes, "
+                          f"{len(ROBOTS_RULES)} robots.txt vigentes[/green]")
+        else:
+            checkpoint = CrawlCheckpoint.fresh(args.checkpoint, CHECKPOINT_INTERVAL)
+            for seed in SEED_URLS:
+                checkpoint.queued(seed, 0)
+    elif args.resume:
+        console.print("[bold red]--resume solo está disponible en modo de un proceso (--processes 1, sin --broker)[/bold red]")
+
+    resuming = checkpoint is not None and args.resume
+    graph_path = args.graph or LINK_GRAPH_PATH or ("crawler_graph" if FRONTIER_MODE == "priority" else None)
+    if graph_path:
+        GRAPH = LinkGraph(graph_path, key=dedup_key, append=resuming)
+        if FRONTIER_MODE == "priority" and PROCESSES > 1 and not args.broker:
+            NEXT_PRIORITY_REFRESH = float("inf")  # Cada shard tiene su frontera: no hay una central que priorizar
+            console.print("[yellow]FRONTIER_MODE = \"priority\" no aplica con varios procesos (se usa FIFO)[/yellow]")
+    columns = LOG_COLUMNS + LOG_EXTRA_COLUMNS
+    batching = {"batch_size": LOG_BATCH_SIZE, "flush_interval": LOG_FLUSH_INTERVAL}
+    sinks = [CsvSink("crawler_log.csv", columns, append=resuming, **batching)]
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl, columns, append=resuming, **batching))
+    if args.parquet:
+        try:
+            sinks.append(ParquetSink(args.parquet, columns, LOG_PARQUET_TYPES, append=resuming, **batching))
+        except ValueError as e:  # --resume sobre un Parquet de otra versión del log
+            parser.error(str(e))
+    sink = MultiSink(sinks)
+
+    if SITEMAP_SEEDING:
+        RECRAWL_INDEX = RecrawlIndex(RECRAWL_INDEX_PATH)
+    shards = None
+    if PROCESSES > 1 and not args.broker:
+        shards = start_shards(PROCESSES)  # Antes de abrir hilos: métricas y vista en vivo
+
+    view = LiveView(console, f"Tráfico HTTP - {DOMAIN_TARGET.upper()}", window=LIVE_WINDOW, quiet=args.quiet)
+    metrics = CrawlMetrics()
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+        console.print(f"[green]✓ Métricas en http://127.0.0.1:{args.metrics_port}/metrics[/green]")
+    reporter = LogReporter(sink, view, metrics, snapshot_path=args.metrics_json)
+    if resuming:
+        reporter.count = int(checkpoint.get_meta("count", 0))
+
+    if args.broker:
+        from broker import open_broker
+        broker = open_broker(args.broker, BROKER_AUTHKEY, serve=True)
+        console.print(f"[green]✓ Coordinador en {args.broker}: lotes de {DISTRIBUTED_BATCH_SIZE} URLs por host, "
+                      f"lease de {LEASE_SECONDS} s[/green]")
+        with view:
+            count = crawl_distributed(broker, reporter)
+        broker.close()
+    elif PROCESSES > 1:
+        console.print(f"[green]✓ Modo multiproceso: {PROCESSES} procesos x {CONCURRENCY} fetchers, hosts repartidos por hash[/green]")
+        with view:
+            count = crawl_sharded(PROCESSES, reporter, shards)
+    else:
+        if CORPUS_PATH:
+            PIPELINE = open_corpus(CORPUS_PATH)
+            console.print(f"[green]✓ Extracción de contenido en {CORPUS_WORKERS} procesos → {CORPUS_PATH}[/green]")
+
+        # Crear session con pooling: un pool por dominio y una conexión por fetcher
+        session = create_session(pool_connections=max(10, len(DOMAINS_TARGET)), pool_maxsize=CONCURRENCY,
+                                 cache_dir=RESPONSE_CACHE_DIR)
+        console.print(f"[green]✓ Session creada con el backend {FETCHER_BACKEND} ({CONCURRENCY} fetchers concurrentes)[/green]")
+
+        # Asegurarse de pre-cargar el robots.txt de los dominios iniciales (si no vino vigente del checkpoint)
+        for seed in SEED_URLS:
+            initial_domain = urlparse(seed).netloc
+            if initial_domain not in ROBOTS_RULES:
+                fetch_robots_txt(initial_domain, session, urlparse(seed).scheme)
+
+        with view:
+            count = crawl_single(session, reporter, checkpoint)
+        checkpoint.close()
+
+        # Cerrar la session (y su caché) al finalizar
+        session.close()
+        if session.response_cache is not None:
+            session.response_cache.close()
+        if PIPELINE is not None:
+            PIPELINE.close()
+            console.print(f"Corpus: {PIPELINE.stats['written']} documentos en {CORPUS_PATH} "
+                          f"({PIPELINE.stats['waited']} esperaron lugar en la cola, {PIPELINE.stats['failed']} con errores)")
+
+    sink.close()
+    FRONTIER.close()
+    if RECRAWL_INDEX is not None:
+        RECRAWL_INDEX.close()
+    if GRAPH is not None:
+        GRAPH.close()
+        console.print(f"Grafo de enlaces: {GRAPH.n_nodes} URLs y {GRAPH.n_edges} enlaces de {GRAPH.n_pages} páginas "
+                      f"en {graph_path} (análisis: python linkgraph.py {graph_path})")
+    if CORPUS_PATH and PROCESSES > 1 and not args.broker:
+        console.print(f"Corpus: un archivo por proceso ({corpus_path_for(CORPUS_PATH, 'shard0')}, ...)")
+    elif CORPUS_PATH and args.broker:
+        console.print("Corpus: lo escribe cada worker (--corpus en los workers)")
     
     console.print(f"\n[bold green]Rastreo completado para {DOMAIN_TARGET}. Se visitaron {count} páginas.[/bold green]")
-    console.print("Los resultados se han guardado en [bold cyan]crawler_log.csv[/bold cyan]")
\ No newline at end of file
+    console.print(f"Duplicados evitados: {reporter.dup_links} enlaces ya vistos tras canonicalizar, "
+                  f"{reporter.near_dups} páginas casi duplicadas sin expandir")
+    console.print("Los resultados se han guardado en [bold cyan]crawler_log.csv[/bold cyan]"
+                  + "".join(f", [bold cyan]{path}[/bold cyan]" for path in (args.jsonl, args.parquet) if path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlparse
+
+try:
+    import redis
+except ImportError:  # redis es opcional: solo se necesita para RedisBroker
+    redis = None
+
+
+# Brokers del modo distribuido. El coordinador publica lotes de URLs y los workers los
+# toman con un lease; al terminar un lote devuelven sus resultados en un solo mensaje.
+# Si un lease vence (worker caído o colgado) el lote vuelve a la cola para otro worker.
+#
+# Todos exponen la misma interfaz (lotes y resultados son dicts serializables a JSON):
+#   reset()                                   coordinador, al empezar: vacía el broker
+#   submit(batch) -> batch_id                 coordinador
+#   lease(worker, lease_s) -> (id, batch) | None
+#   renew(worker, batch_ids, lease_s)         worker, para que no venzan sus lotes en curso
+#   complete(worker, batch_id, result) -> bool   False si el lease ya no era suyo (se descarta)
+#   results() -> [(batch_id, result), ...]    coordinador; los retira del broker
+#   expire() -> lotes con lease vencido que volvieron a la cola
+#   stop() / stopped()                        fin del rastreo: se descartan los lotes en cola
+#
+# Los plazos usan time.time(): con workers en varias máquinas, los relojes deben estar sincronizados (NTP).
+
+
+# Broker en memoria (thread-safe). Lo usa el coordinador y lo sirve por TCP con serve_broker().
+class MemoryBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._next_id = 0
+        self._queue = deque()
+        self._batches = {}
+        self._leases = {}  # batch_id -> (worker, vencimiento)
+        self._results = []
+        self._stopped = False
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def submit(self, batch):
+        with self._lock:
+            self._next_id += 1
+            self._batches[self._next_id] = batch
+            self._queue.append(self._next_id)
+            return self._next_id
+
+    def lease(self, worker, lease_s):
+        with self._lock:
+            if not self._queue:
+                return None
+            batch_id = self._queue.popleft()
+            self._leases[batch_id] = (worker, time.time() + lease_s)
+            return batch_id, self._batches[batch_id]
+
+    def renew(self, worker, batch_ids, lease_s):
+        with self._lock:
+            for batch_id in batch_ids:
+                if self._leases.get(batch_id, (None,))[0] == worker:
+                    self._leases[batch_id] = (worker, time.time() + lease_s)
+
+    def complete(self, worker, batch_id, result):
+        with self._lock:
+            if self._leases.get(batch_id, (None,))[0] != worker:
+                return False
+            del self._leases[batch_id]
+            del self._batches[batch_id]
+            self._results.append((batch_id, result))
+            return True
+
+    def results(self):
+        with self._lock:
+            results, self._results = self._results, []
+            return results
+
+    def expire(self):
+        now = time.time()
+        with self._lock:
+            expired = [batch_id for batch_id, (_, deadline) in self._leases.items() if deadline < now]
+            for batch_id in expired:
+                del self._leases[batch_id]
+                self._queue.appendleft(batch_id)  # Al frente: ya esperó demasiado
+            return len(expired)
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            for batch_id in self._queue:
+                del self._batches[batch_id]
+            self._queue.clear()
+
+    def stopped(self):
+        return self._stopped
+
+    def close(self):
+        pass
+
+
+class _BrokerManager(BaseManager):
+    pass
+
+
+# Sirve `broker` por TCP en un hilo (multiprocessing.managers, autenticado con `authkey`)
+def serve_broker(broker, host, port, authkey):
+    _BrokerManager.register("broker", callable=lambda: broker)
+    server = _BrokerManager(address=(host, port), authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Proxy de un broker servido con serve_broker(); cada método es una llamada remota
+def connect_broker(host, port, authkey):
+    _BrokerManager.register("broker")
+    manager = _BrokerManager(address=(host, port), authkey=authkey)
+    manager.connect()
+    return manager.broker()
+
+
+# Broker sobre un archivo SQLite compartido: coordinador y workers en la misma máquina
+# (o en un disco compartido con bloqueos confiables). Cada operación es una transacción.
+class SqliteBroker:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS batches (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                        "payload TEXT, worker TEXT, lease_until REAL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (batch_id INTEGER, payload TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # Ejecuta fn(db) dentro de una transacción con bloqueo de escritura
+    def _transaction(self, fn):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(self.db)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return value
+
+    def reset(self):
+        def run(db):
+            db.execute("DELETE FROM batches")
+            db.execute("DELETE FROM results")
+            db.execute("DELETE FROM meta")
+        self._transaction(run)
+
+    def submit(self, batch):
+        return self._transaction(
+            lambda db: db.execute("INSERT INTO batches (payload) VALUES (?)", (json.dumps(batch),)).lastrowid)
+
+    def lease(self, worker, lease_s):
+        def run(db):
+            row = db.execute("SELECT id, payload FROM batches WHERE worker IS NULL ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE batches SET worker = ?, lease_until = ? WHERE id = ?",
+                       (worker, time.time() + lease_s, row[0]))
+            return row[0], json.loads(row[1])
+        return self._transaction(run)
+
+    def renew(self, worker, batch_ids, lease_s):
+        deadline = time.time() + lease_s
+        self._transaction(lambda db: db.executemany(
+            "UPDATE batches SET lease_until = ? WHERE id = ? AND worker = ?",
+            [(deadline, batch_id, worker) for batch_id in batch_ids]))
+
+    def complete(self, worker, batch_id, result):
+        def run(db):
+            if db.execute("DELETE FROM batches WHERE id = ? AND worker = ?", (batch_id, worker)).rowcount == 0:
+                return False
+            db.execute("INSERT INTO results VALUES (?, ?)", (batch_id, json.dumps(result)))
+            return True
+        return self._transaction(run)
+
+    def results(self):
+        def run(db):
+            rows = db.execute("SELECT batch_id, payload FROM results").fetchall()
+            db.execute("DELETE FROM results")
+            return [(batch_id, json.loads(payload)) for batch_id, payload in rows]
+        return self._transaction(run)
+
+    def expire(self):
+        return self._transaction(lambda db: db.execute(
+            "UPDATE batches SET worker = NULL, lease_until = NULL WHERE worker IS NOT NULL AND lease_until < ?",
+            (time.time(),)).rowcount)
+
+    def stop(self):
+        def run(db):
+            db.execute("DELETE FROM batches WHERE worker IS NULL")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('stopped', '1')")
+        self._transaction(run)
+
+    def stopped(self):
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM meta WHERE key = 'stopped'").fetchone() is not None
+
+    def close(self):
+        self.db.close()
+
+
+# Broker sobre Redis, para workers en varias máquinas. Las operaciones que tocan varias
+# claves son scripts Lua (atómicos en el servidor).
+class RedisBroker:
+    LEASE = """
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then return nil end
+    redis.call('ZADD', KEYS[2], ARGV[1], id)
+    redis.call('HSET', KEYS[3], id, ARGV[2])
+    return {id, redis.call('HGET', KEYS[4], id)}
+    """
+    RENEW = """
+    for i = 3, #ARGV do
+        if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then redis.call('ZADD', KEYS[1], ARGV[2], ARGV[i]) end
+    end
+    """
+    COMPLETE = """
+    if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    redis.call('RPUSH', KEYS[4], ARGV[3])
+    return 1
+    """
+    EXPIRE = """
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    for _, id in ipairs(ids) do
+        redis.call('ZREM', KEYS[1], id)
+        redis.call('HDEL', KEYS[2], id)
+        redis.call('LPUSH', KEYS[3], id)
+    end
+    return #ids
+    """
+    STOP = """
+    for _, id in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do redis.call('HDEL', KEYS[2], id) end
+    redis.call('DEL', KEYS[1])
+    redis.call('SET', KEYS[3], '1')
+    """
+
+    def __init__(self, url, prefix="crawler"):
+        if redis is None:
+            raise ImportError("RedisBroker requiere redis (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        keys = ("queue", "batches", "leases", "owners", "results", "next_id", "stopped")
+        self.keys = {name: f"{prefix}:{name}" for name in keys}
+        self._lease = self.client.register_script(self.LEASE)
+        self._renew = self.client.register_script(self.RENEW)
+        self._complete = self.client.register_script(self.COMPLETE)
+        self._expire = self.client.register_script(self.EXPIRE)
+        self._stop = self.client.register_script(self.STOP)
+
+    def reset(self):
+        self.client.delete(*self.keys.values())
+
+    def submit(self, batch):
+        k = self.keys
+        batch_id = self.client.incr(k["next_id"])
+        pipe = self.client.pipeline()
+        pipe.hset(k["batches"], batch_id, json.dumps(batch))
+        pipe.rpush(k["queue"], batch_id)
+        pipe.execute()
+        return batch_id
+
+    def lease(self, worker, lease_s):
+        k = self.keys
+        leased = self._lease(keys=[k["queue"], k["leases"], k["owners"], k["batches"]],
+                             args=[time.time() + lease_s, worker])
+        if not leased:
+            return None
+        return int(leased[0]), json.loads(leased[1])
+
+    def renew(self, worker, batch_ids, lease_s):
+        if batch_ids:
+            self._renew(keys=[self.keys["leases"], self.keys["owners"]],
+                        args=[worker, time.time() + lease_s, *batch_ids])
+
+    def complete(self, worker, batch_id, result):
+        k = self.keys
+        return bool(self._complete(keys=[k["leases"], k["owners"], k["batches"], k["results"]],
+                                   args=[batch_id, worker, json.dumps([batch_id, result])]))
+
+    def results(self):
+        pipe = self.client.pipeline()  # MULTI/EXEC: nada se pierde entre leer y borrar
+        pipe.lrange(self.keys["results"], 0, -1)
+        pipe.delete(self.keys["results"])
+        raw, _ = pipe.execute()
+        return [tuple(json.loads(item)) for item in raw]
+
+    def expire(self):
+        k = self.keys
+        return self._expire(keys=[k["leases"], k["owners"], k["queue"]], args=[time.time()])
+
+    def stop(self):
+        self._stop(keys=[self.keys["queue"], self.keys["batches"], self.keys["stopped"]])
+
+    def stopped(self):
+        return bool(self.client.exists(self.keys["stopped"]))
+
+    def close(self):
+        self.client.close()
+
+
+# Abre un broker según su URL:
+#   tcp://HOST:PUERTO   el coordinador (serve=True) sirve un MemoryBroker; los workers se conectan
+#                       (con la misma `authkey`, obligatoria)
+#   sqlite:///RUTA      archivo SQLite compartido (ruta relativa; sqlite:////ruta/absoluta)
+#   redis://HOST:PUERTO/DB
+def open_broker(url, authkey, serve=False):
+    parsed = urlparse(url)
+    if parsed.scheme == "tcp":
+        # multiprocessing.managers deserializa con pickle: sin una clave secreta, cualquiera
+        # que llegue al puerto podría ejecutar código en el coordinador o en los workers
+        if not authkey:
+            raise ValueError("El broker tcp:// requiere una clave secreta compartida (authkey)")
+        if serve:
+            broker = MemoryBroker()
+            serve_broker(broker, parsed.hostname, parsed.port, authkey)
+            return broker
+        return connect_broker(parsed.hostname, parsed.port, authkey)
+    if parsed.scheme == "sqlite":
+        return SqliteBroker(url[len("sqlite:///"):])
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisBroker(url)
+    raise ValueError(f"Broker desconocido: {url!r} (tcp://, sqlite:/// o redis://)")
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import time
+
+from robots import RobotsMatcher
+
+
+QUEUED, VISITED = 0, 1
+
+
+# Checkpoint incremental del rastreo en SQLite: frontera, URLs visitadas y caché de robots.txt.
+#
+# Los cambios se acumulan en memoria y `flush()` escribe solo el delta desde el
+# último checkpoint en una única transacción (WAL), así que un corte a mitad de
+# escritura deja intacto el checkpoint anterior. Las URLs que estaban en curso
+# siguen como pendientes y se vuelven a descargar al reanudar.
+class CrawlCheckpoint:
+    def __init__(self, path, interval=30):
+        self.path = path
+        self.interval = interval
+        self.last_flush = time.monotonic()
+        self._queued = []
+        self._visited = []
+        self._robots_saved = {}  # dominio -> fetched_at ya escrito
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, depth INTEGER, state INTEGER);
+            CREATE TABLE IF NOT EXISTS robots (domain TEXT PRIMARY KEY, content TEXT, fetched_at REAL, ttl REAL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    # Borra el checkpoint existente para empezar un rastreo desde cero
+    @classmethod
+    def fresh(cls, path, interval=30):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return cls(path, interval)
+
+    def queued(self, url, depth):
+        self._queued.append((url, depth, QUEUED))
+
+    def visited(self, url):
+        self._visited.append((url,))
+
+    def set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    # True si pasó `interval` desde el último checkpoint
+    def due(self):
+        return time.monotonic() - self.last_flush >= self.interval
+
+    def flush(self, robots_rules, **meta):
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO urls VALUES (?, ?, ?)", self._queued)
+            self.db.executemany(f"UPDATE urls SET state = {VISITED} WHERE url = ?", self._visited)
+            # Visitadas que nunca pasaron por la cola (p. ej. semillas de otro checkpoint)
+            self.db.executemany(f"INSERT OR IGNORE INTO urls VALUES (?, 0, {VISITED})", self._visited)
+            for domain, matcher in list(robots_rules.items()):
+                if self._robots_saved.get(domain) != matcher.fetched_at:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO robots VALUES (?, ?, ?, ?)",
+                        (domain, matcher.content, matcher.fetched_at, matcher.ttl),
+                    )
+                    self._robots_saved[domain] = matcher.fetched_at
+            for key, value in meta.items():
+                self.set_meta(key, value)
+        self._queued.clear()
+        self._visited.clear()
+        self.last_flush = time.monotonic()
+
+    # Reconstruye la frontera (vacía) y la caché de robots.txt; descarta los robots.txt vencidos
+    def restore(self, frontier, robots_rules, user_agent):
+        for url, depth, state in self.db.execute("SELECT url, depth, state FROM urls ORDER BY rowid"):
+            if state == VISITED:
+                frontier.mark_visited(url)
+            else:
+                frontier.add(url, depth)
+
+        now = time.time()
+        for domain, content, fetched_at, ttl in self.db.execute("SELECT * FROM robots"):
+            matcher = RobotsMatcher(content, user_agent, fetched_at=fetched_at, ttl=ttl)
+            if not matcher.is_expired(now):
+                robots_rules[domain] = matcher
+                self._robots_saved[domain] = fetched_at
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,128 @@
+import functools
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Parámetros de seguimiento que no cambian el contenido de la página
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid", "ref", "replytocom"}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def _is_tracking(param):
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+# URL canónica que se descarga: esquema y host en minúsculas, sin puerto por
+# defecto, sin #fragmento, sin parámetros de seguimiento y con la query ordenada
+def canonicalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6
+    try:
+        port = parts.port
+    except ValueError:
+        port = None  # Puerto inválido: se descarta
+    if port is not None and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# Clave de deduplicación de la frontera: además trata como iguales a los gemelos
+# http/https y a "/ruta" y "/ruta/" (se sigue descargando la primera forma vista)
+def dedup_key(url):
+    parts = urlsplit(canonicalize_url(url))
+    path = parts.path.rstrip("/") or "/"
+    return f"{parts.netloc}{path}?{parts.query}" if parts.query else f"{parts.netloc}{path}"
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+MASK64 = (1 << 64) - 1
+WORD_HASH_CACHE_SIZE = 1 << 16  # Palabras con el hash en memoria (el vocabulario de un sitio se repite mucho)
+
+
+@functools.lru_cache(maxsize=WORD_HASH_CACHE_SIZE)
+def _word_hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# Rotación del hash de la palabra `offset` dentro del shingle (nunca 0 ni 64)
+def _rotation(offset):
+    return 21 * offset % 64 or 1
+
+
+def _rotl64(value, bits):
+    return ((value << bits) | (value >> (64 - bits))) & MASK64
+
+
+# SimHash de 64 bits sobre shingles de 3 palabras del texto visible (solo las primeras
+# `max_words`). Cada palabra se hashea con blake2b (estable entre procesos, con un caché
+# LRU compartido entre páginas) y el hash de un shingle combina los de sus palabras rotados; el voto por bit se hace con
+# numpy si está instalado (mismo resultado en Python puro, ~50 veces más lento).
+# Devuelve None con menos de `min_words` palabras: en páginas casi vacías la huella
+# la domina la plantilla del sitio y daría falsos casi duplicados.
+def simhash(text, shingle_size=3, min_words=1, max_words=None):
+    words = _WORD.findall(text.lower())[:max_words]
+    if len(words) < max(1, min_words):
+        return None
+    word_hashes = list(map(_word_hash, words))
+    n_shingles = max(1, len(words) - shingle_size + 1)
+    try:
+        import numpy as np
+    except ImportError:
+        return _simhash_python(word_hashes, shingle_size, n_shingles)
+
+    values = np.array(word_hashes, dtype=np.uint64)
+    shingles = values[:n_shingles].copy()
+    for offset in range(1, min(shingle_size, len(words))):
+        part, bits = values[offset:offset + n_shingles], _rotation(offset)
+        shingles ^= (part << np.uint64(bits)) | (part >> np.uint64(64 - bits))
+    ones = np.unpackbits(shingles.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little").sum(axis=0)
+    return sum(1 << bit for bit in np.flatnonzero(ones * 2 > n_shingles).tolist())
+
+
+def _simhash_python(word_hashes, shingle_size, n_shingles):
+    counts = [0] * 64
+    for i in range(n_shingles):
+        h = word_hashes[i]
+        for offset, value in enumerate(word_hashes[i + 1:i + shingle_size], 1):
+            h ^= _rotl64(value, _rotation(offset))
+        for bit in range(64):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if counts[bit] > 0)
+
+
+# Índice de huellas SimHash para detectar páginas casi duplicadas.
+#
+# Con distancia de Hamming máxima k, la huella se parte en k+1 bandas de bits:
+# dos huellas a distancia <= k coinciden en al menos una banda (palomar), así
+# que solo se comparan las candidatas que comparten alguna banda.
+class SimHashIndex:
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self.n_bands = max_distance + 1
+        self.band_bits = 64 // self.n_bands
+        self.bands = [{} for _ in range(self.n_bands)]
+
+    def _band_values(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.n_bands)]
+
+    # Devuelve la URL de una página casi idéntica ya indexada; si no hay, indexa esta y devuelve None
+    def match_or_add(self, fingerprint, url):
+        values = self._band_values(fingerprint)
+        for band, value in zip(self.bands, values):
+            for other, other_url in band.get(value, ()):
+                if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                    return other_url
+        for band, value in zip(self.bands, values):
+            band.setdefault(value, []).append((fingerprint, url))
+        return None
@@ -0,0 +1,178 @@
+import importlib.util
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin
+
+# Los parsers se importan recién al extraer, dentro de los procesos del pool: el crawler
+# no paga su carga si no escribe corpus. lxml es opcional (sin él se usa BeautifulSoup con
+# html.parser), y pypdf también (sin él los PDF no se descargan).
+HAVE_LXML = importlib.util.find_spec("lxml") is not None
+HAVE_PYPDF = importlib.util.find_spec("pypdf") is not None
+
+
+# Columnas del corpus (una fila por documento extraído)
+CORPUS_COLUMNS = ["url", "fetched_at", "content_type", "title", "description", "canonical", "lang",
+                  "text", "n_words", "truncated"]
+CORPUS_PARQUET_TYPES = {"fetched_at": "float64", "n_words": "int64", "truncated": "bool_"}
+
+# Elementos que no son contenido: se quitan antes de extraer el texto principal
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "form",
+                    "nav", "header", "footer", "aside")
+
+
+def _record(title, description, canonical, lang, text):
+    text = " ".join(text.split())
+    return {"title": " ".join((title or "").split()), "description": " ".join((description or "").split()),
+            "canonical": canonical or "", "lang": (lang or "").strip().lower(), "text": text,
+            "n_words": len(text.split())}
+
+
+# Título, meta description, enlace canónico, idioma y texto principal de una página HTML.
+# El texto sale de <main>/<article> si existen (si no, de <body>) sin menús, pies ni scripts.
+def extract_html(body, url, charset=None):
+    if HAVE_LXML:
+        return _extract_html_lxml(body, url, charset)
+    return _extract_html_soup(body, url, charset)
+
+
+def _extract_html_lxml(body, url, charset):
+    import lxml.html
+    if charset is None and b"charset" not in body[:2048].lower():
+        charset = "utf-8"  # Sin charset en cabecera ni <meta>, lxml asumiría latin-1
+    doc = lxml.html.document_fromstring(body, parser=lxml.html.HTMLParser(encoding=charset, remove_comments=True))
+    title = doc.findtext(".//title")
+    description = canonical = ""
+    lang = doc.get("lang") or ""
+    for meta in doc.iter("meta"):
+        name = (meta.get("name") or meta.get("property") or "").lower()
+        if name in ("description", "og:description") and not description:
+            description = meta.get("content") or ""
+        elif not lang and (meta.get("http-equiv") or "").lower() == "content-language":
+            lang = meta.get("content") or ""
+    for link in doc.iter("link"):
+        if "canonical" in (link.get("rel") or "").lower().split() and link.get("href"):
+            canonical = urljoin(url, link.get("href").strip())
+            break
+
+    for element in doc.xpath("|".join(f"//{tag}" for tag in BOILERPLATE_TAGS)):
+        element.drop_tree()
+    main = doc.xpath("//main|//article|//*[@role='main']")
+    root = main[0] if main else (doc.find(".//body") if doc.find(".//body") is not None else doc)
+    return _record(title, description, canonical, lang, " ".join(root.itertext()))
+
+
+def _extract_html_soup(body, url, charset):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(body, "html.parser", from_encoding=charset)
+    title = soup.title.get_text() if soup.title else ""
+    description = canonical = ""
+    lang = soup.html.get("lang", "") if soup.html else ""
+    for meta in soup.find_all("meta"):
+        name = (meta.get("name") or meta.get("property") or "").lower()
+        if name in ("description", "og:description") and not description:
+            description = meta.get("content") or ""
+        elif not lang and (meta.get("http-equiv") or "").lower() == "content-language":
+            lang = meta.get("content") or ""
+    for link in soup.find_all("link", href=True):
+        if "canonical" in [rel.lower() for rel in link.get("rel") or []]:
+            canonical = urljoin(url, link["href"].strip())
+            break
+
+    for element in soup.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+    root = soup.find(["main", "article"]) or soup.find(attrs={"role": "main"}) or soup.body or soup
+    return _record(title, description, canonical, lang, root.get_text(" "))
+
+
+# Texto y metadatos de un PDF (p. ej. calendarios académicos); requiere pypdf
+def extract_pdf(body, url, charset=None):
+    import pypdf
+    reader = pypdf.PdfReader(io.BytesIO(body))
+    info = reader.metadata or {}
+    text = " ".join(page.extract_text() or "" for page in reader.pages)
+    return _record(info.get("/Title", ""), info.get("/Subject", ""), "", "", text)
+
+
+# Extractor por tipo de contenido (sin parámetros: "text/html; charset=..." -> "text/html")
+EXTRACTORS = {"text/html": extract_html, "application/xhtml+xml": extract_html}
+if HAVE_PYPDF:
+    EXTRACTORS["application/pdf"] = extract_pdf
+
+
+# Etapa posterior a la descarga: extrae el contenido en un pool de procesos y lo escribe
+# en `sink` (JsonlSink o ParquetSink con CORPUS_COLUMNS).
+#
+# La cola hacia el pool está acotada a `max_pending` documentos: si el parseo no da abasto,
+# submit() bloquea al hilo de descarga hasta que se libere un lugar (contrapresión: ningún
+# documento se pierde y se cuenta en stats["waited"]). Los resultados se escriben desde el hilo del pool.
+#
+# Con workers=0 se extrae en un hilo del mismo proceso: para los shards, que ya son un
+# proceso por núcleo (y, como procesos daemon, no pueden crear procesos hijos).
+class ExtractionPipeline:
+    def __init__(self, sink, extractors=None, workers=2, max_pending=64):
+        self.sink = sink
+        self.extractors = dict(EXTRACTORS if extractors is None else extractors)
+        if workers:
+            # spawn: el crawler ya tiene hilos corriendo, y fork con hilos no es seguro
+            self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self.pool = ThreadPoolExecutor(1)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "waited": 0, "failed": 0}
+
+    def extractor_for(self, content_type):
+        return self.extractors.get((content_type or "text/html").split(";")[0].strip().lower())
+
+    def accepts(self, content_type):
+        return self.extractor_for(content_type) is not None
+
+    # Encola el documento (con la cola llena, espera a que haya lugar); devuelve False si no hay
+    # extractor para su tipo o el pool está cerrado
+    def submit(self, url, content_type, body, charset=None, truncated=False):
+        extractor = self.extractor_for(content_type)
+        if extractor is None:
+            return False
+        if not self.slots.acquire(blocking=False):
+            self._count("waited")
+            self.slots.acquire()
+        meta = (url, time.time(), content_type, truncated)
+        try:
+            future = self.pool.submit(extractor, body, url, charset)
+        except RuntimeError:  # Pool roto o cerrado
+            self.slots.release()
+            self._count("failed")
+            return False
+        self._count("queued")
+        future.add_done_callback(lambda f: self._write(f, meta))
+        return True
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _write(self, future, meta):
+        self.slots.release()
+        try:
+            record = future.result()
+        except Exception:  # Documento malformado: no frena al resto
+            self._count("failed")
+            return
+        url, fetched_at, content_type, truncated = meta
+        with self.lock:
+            self.sink.write([url, round(fetched_at, 3), content_type, record["title"], record["description"],
+                             record["canonical"], record["lang"], record["text"], record["n_words"], truncated])
+            self.stats["written"] += 1
+
+    def flush(self):
+        with self.lock:
+            self.sink.flush()
+
+    # Espera a los documentos pendientes y cierra el corpus
+    def close(self):
+        self.pool.shutdown(wait=True)
+        with self.lock:
+            self.sink.close()
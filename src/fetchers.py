@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+import importlib.util
+import threading
+
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from metrics import InstrumentedHTTPAdapter, httpx_trace
+
+# Backends de descarga intercambiables. El núcleo del crawler (fetch_page, robots.txt,
+# sitemaps) solo usa una "session" al estilo requests: get(url, timeout, stream, headers)
+# devuelve una respuesta con status_code, headers, encoding, text, iter_content(),
+# raw.tell() (bytes recibidos), raw.drain_conn() y close(). Cada backend la arma distinto:
+#
+# - "nopool": una conexión nueva por solicitud (Connection: close), como un requests.get suelto.
+# - "pooled": requests.Session con un pool de conexiones Keep-Alive por host (por defecto).
+# - "async": httpx.AsyncClient en un event loop propio: todas las conexiones en un solo hilo,
+#   sin un socket bloqueado por fetcher. El parseo sigue en los hilos del motor.
+# - "http2": httpx con HTTP/2, que multiplexa las solicitudes a un host en una sola conexión
+#   (en https lo negocia por ALPN; en http usa HTTP/1.1, salvo con HTTP2_PRIOR_KNOWLEDGE).
+#
+# httpx (y h2 para "http2") son opcionales y se importan al abrir esos backends.
+HAVE_HTTPX = importlib.util.find_spec("httpx") is not None
+HAVE_H2 = importlib.util.find_spec("h2") is not None
+
+FETCHER_BACKENDS = ("nopool", "pooled", "async", "http2")
+USER_AGENT = "DataExplore-Crawler/1.0"
+HTTP2_PRIOR_KNOWLEDGE = False  # True: HTTP/2 sin TLS ni negociación (h2c), p. ej. contra fake_site.py
+RESPONSE_CHUNK_SIZE = 16 * 1024
+
+
+def _load_httpx(backend):
+    if not HAVE_HTTPX or (backend == "http2" and not HAVE_H2):
+        extra = "httpx[http2]" if backend == "http2" else "httpx"
+        raise ImportError(f"El backend {backend!r} requiere {extra} (pip install {extra})")
+    import httpx
+    return httpx
+
+
+# Session de requests instrumentada (DNS/connect/TLS y conexiones nuevas, ver metrics.py)
+def _requests_session(pool_connections, pool_maxsize, keep_alive=True):
+    session = requests.Session()
+
+    # Pooling básico sin estrategia compleja de reintentos
+    adapter = InstrumentedHTTPAdapter(
+        pool_connections=pool_connections,  # Hosts con pool propio
+        pool_maxsize=pool_maxsize,          # Máximo de conexiones por host
+        # 1 reintento simple; los 429/503 con Retry-After vuelven al crawler (ratelimit.py),
+        # en vez de que urllib3 duerma el hilo del fetcher esperando
+        max_retries=Retry(total=1, respect_retry_after_header=False)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # Headers para keep-alive y compresión (gzip/deflate, más br y zstd si están brotli/zstandard).
+    # Con "Connection: close" el servidor corta tras cada respuesta y urllib3 no reutiliza nada.
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        'Accept-Encoding': ACCEPT_ENCODING,
+    })
+    return session
+
+
+# Los errores de httpx se reportan como los de requests: el núcleo maneja un solo tipo
+@contextlib.contextmanager
+def _as_requests_errors():
+    import httpx
+    try:
+        yield
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e) or type(e).__name__) from e
+    except httpx.HTTPError as e:
+        raise requests.exceptions.ConnectionError(str(e) or type(e).__name__) from e
+
+
+# Respuesta de httpx (siempre en streaming) con la parte de la interfaz de requests que usa el crawler.
+# `open_chunks(tamaño)` devuelve el iterador de bloques decodificados; se abre una sola vez, así
+# drain_conn() y las lecturas siguientes continúan donde quedó la anterior.
+class HttpxResponse:
+    def __init__(self, response, open_chunks, close):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.encoding = response.charset_encoding
+        self.raw = self  # tell() y drain_conn(), como en urllib3
+        self._response = response
+        self._open_chunks = open_chunks
+        self._close = close
+        self._chunks = None
+
+    def iter_content(self, chunk_size=RESPONSE_CHUNK_SIZE):
+        if self._chunks is None:
+            self._chunks = self._open_chunks(chunk_size or RESPONSE_CHUNK_SIZE)
+        return self._chunks
+
+    @property
+    def text(self):
+        return b"".join(self.iter_content()).decode(self.encoding or "utf-8", errors="replace")
+
+    # Bytes del cuerpo recibidos hasta ahora (comprimidos, si aplica)
+    def tell(self):
+        return self._response.num_bytes_downloaded
+
+    def drain_conn(self):
+        for _ in self.iter_content():
+            pass
+
+    def close(self):
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _httpx_limits(httpx, pool_connections, pool_maxsize):
+    connections = pool_connections * pool_maxsize
+    return httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+
+# Backend "http2" (httpx.Client es thread-safe: los fetchers comparten sus conexiones)
+class Http2Session:
+    def __init__(self, pool_connections, pool_maxsize):
+        httpx = _load_httpx("http2")
+        self.client = httpx.Client(http1=not HTTP2_PRIOR_KNOWLEDGE, http2=True,
+                                   limits=_httpx_limits(httpx, pool_connections, pool_maxsize),
+                                   headers={"User-Agent": USER_AGENT})
+        self.headers = self.client.headers
+
+    def get(self, url, timeout=None, stream=False, headers=None):
+        request = self.client.build_request("GET", url, headers=headers, timeout=timeout,
+                                            extensions={"trace": httpx_trace()})
+        with _as_requests_errors():
+            response = self.client.send(request, stream=True)
+
+        def open_chunks(chunk_size):
+            with _as_requests_errors():
+                yield from response.iter_bytes(chunk_size)
+
+        r = HttpxResponse(response, open_chunks, response.close)
+        if not stream:
+            r.drain_conn()  # Cuerpo completo antes de devolver, como requests
+        return r
+
+    def close(self):
+        self.client.close()
+
+
+async def _next_chunk(chunks):
+    return await chunks.__anext__()
+
+
+# Backend "async": httpx.AsyncClient corriendo en un event loop en su propio hilo. Los hilos
+# de los fetchers le entregan cada solicitud y esperan el resultado; los sockets los atiende
+# solo el loop. Es independiente del loop del motor (y de los asyncio.run de shards y workers).
+class AsyncHttpxSession:
+    def __init__(self, pool_connections, pool_maxsize):
+        httpx = _load_httpx("async")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fetcher-loop", daemon=True)
+        self.thread.start()
+        self.client = httpx.AsyncClient(limits=_httpx_limits(httpx, pool_connections, pool_maxsize),
+                                        headers={"User-Agent": USER_AGENT})
+        self.headers = self.client.headers
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get(self, url, timeout=None, stream=False, headers=None):
+        request = self.client.build_request("GET", url, headers=headers, timeout=timeout,
+                                            extensions={"trace": httpx_trace(asynchronous=True)})
+        with _as_requests_errors():
+            response = self._run(self.client.send(request, stream=True))
+        state = {"chunks": None}
+
+        def open_chunks(chunk_size):
+            state["chunks"] = chunks = response.aiter_bytes(chunk_size)
+            with _as_requests_errors():
+                while True:
+                    try:
+                        yield self._run(_next_chunk(chunks))
+                    except StopAsyncIteration:
+                        return
+
+        async def close():
+            if state["chunks"] is not None:
+                await state["chunks"].aclose()
+            await response.aclose()
+
+        r = HttpxResponse(response, open_chunks, lambda: self._run(close()))
+        if not stream:
+            r.drain_conn()
+        return r
+
+    def close(self):
+        self._run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# Abre la session del backend. `pool_connections` es el nº de hosts con pool propio y
+# `pool_maxsize` el nº de conexiones por host (en "nopool" no se reutilizan).
+def open_session(backend="pooled", pool_connections=10, pool_maxsize=10):
+    if backend == "pooled":
+        return _requests_session(pool_connections, pool_maxsize)
+    if backend == "nopool":
+        return _requests_session(pool_connections, pool_maxsize, keep_alive=False)
+    if backend == "async":
+        return AsyncHttpxSession(pool_connections, pool_maxsize)
+    if backend == "http2":
+        return Http2Session(pool_connections, pool_maxsize)
+    raise ValueError(f"Backend de descarga desconocido: {backend!r} (opciones: {FETCHER_BACKENDS})")
@@ -0,0 +1,169 @@
+import os
+import tempfile
+
+from urlstore import CompactQueue, HostTable, make_seen_store
+
+
+# Frontera de URLs del crawler: reemplaza a QUEUE (lista) y VISITED (set).
+#
+# - Las URLs pendientes se guardan compactas (CompactQueue: host internado + ruta en bytes).
+#   Encolar y desencolar son O(1): en modo "depth" hay una cola por profundidad y se
+#   desencola de la menor (FIFO entre URLs de igual profundidad). El modo "priority" es
+#   igual pero con el nivel que da `priority(url, depth)` (entero; menor = antes), p. ej.
+#   según el PageRank del grafo de enlaces; reprioritize() reubica lo pendiente si cambia.
+# - `seen` es el índice de pertenencia O(1) "visitada o ya en cola"; guarda `key(url)`
+#   (p. ej. la URL canonicalizada) para que variantes de la misma página cuenten una vez.
+#   Con seen="compact" o "bloom" guarda huellas en vez de strings (ver urlstore.py).
+# - Con más de `max_in_memory` URLs pendientes, el excedente se escribe en un
+#   archivo de desborde y se recarga por bloques cuando la memoria se vacía.
+class Frontier:
+    MODES = ("fifo", "depth", "priority")
+
+    def __init__(self, seeds=(), mode="fifo", max_in_memory=100_000, spill_path=None, key=None,
+                 seen="set", error_rate=0.001, compress=False, priority=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de frontera desconocido: {mode!r} (opciones: {self.MODES})")
+        if mode == "priority" and priority is None:
+            raise ValueError("El modo 'priority' requiere la función `priority`")
+        self.mode = mode
+        self.priority = priority
+        self.max_in_memory = max_in_memory
+        self.key = key or (lambda url: url)
+        self.seen = make_seen_store(seen, error_rate)
+        self.hosts = HostTable()
+        self.compress = compress
+        self._queue = self._new_queue() if mode == "fifo" else {}  # nivel (profundidad o prioridad) -> cola
+        self._queued = 0  # URLs pendientes en memoria
+
+        self._spill_path = spill_path
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spilled = 0
+
+        for url in seeds:
+            self.add(url, 0)
+
+    def __len__(self):
+        return self._queued + self._spilled
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, url):
+        return self.key(url) in self.seen
+
+    # Encola la URL si nunca fue vista; devuelve False si ya estaba visitada o en cola
+    def add(self, url, depth=0):
+        key = self.key(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self._enqueue(url, depth)
+        return True
+
+    # Vuelve a encolar una URL ya vista (p. ej. para reintentarla tras un 429)
+    def requeue(self, url, depth=0):
+        self.seen.add(self.key(url))
+        self._enqueue(url, depth)
+
+    # Marca una URL como visitada sin encolarla (p. ej. bloqueada por robots.txt)
+    def mark_visited(self, url):
+        self.seen.add(self.key(url))
+
+    # Desencola la siguiente URL; devuelve (url, profundidad)
+    def pop(self):
+        if not self._queued:
+            self._refill()
+        if not self._queued:
+            raise IndexError("pop de una frontera vacía")
+        self._queued -= 1
+        if self.mode == "fifo":
+            return self._queue.popleft()
+        rank = min(self._queue)
+        level = self._queue[rank]
+        item = level.popleft()
+        if not level:
+            del self._queue[rank]
+        return item
+
+    # Desencola la primera URL (entre las `window` siguientes) que cumpla `is_ready`.
+    # Las URLs descartadas vuelven a la frontera en su orden original.
+    def pop_ready(self, is_ready, window):
+        skipped = []
+        found = None
+        while self and len(skipped) < window:
+            url, depth = self.pop()
+            if is_ready(url):
+                found = (url, depth)
+                break
+            skipped.append((url, depth))
+        for url, depth in reversed(skipped):
+            self._level(url, depth).appendleft((url, depth))
+            self._queued += 1
+        return found
+
+    # Recalcula el nivel de las URLs pendientes en memoria (modo "priority", tras cambiar los
+    # puntajes); las desbordadas a disco lo toman al recargarse
+    def reprioritize(self):
+        if self.mode != "priority":
+            return
+        levels, self._queue, self._queued = self._queue, {}, 0
+        for level in levels.values():
+            while level:
+                self._push(*level.popleft())
+
+    def _new_queue(self):
+        return CompactQueue(self.hosts, compress=self.compress)
+
+    # Cola en memoria para la URL según el modo (una sola, por profundidad o por prioridad)
+    def _level(self, url, depth):
+        if self.mode == "fifo":
+            return self._queue
+        rank = depth if self.mode == "depth" else self.priority(url, depth)
+        if rank not in self._queue:
+            self._queue[rank] = self._new_queue()
+        return self._queue[rank]
+
+    def _enqueue(self, url, depth):
+        # Con URLs ya desbordadas, lo nuevo va al disco para no adelantarse a ellas
+        if self._spilled or self._queued >= self.max_in_memory:
+            self._spill(url, depth)
+        else:
+            self._push(url, depth)
+
+    def _push(self, url, depth):
+        self._level(url, depth).append((url, depth))
+        self._queued += 1
+
+    def _spill(self, url, depth):
+        if self._spill_writer is None:
+            if self._spill_path is None:
+                fd, self._spill_path = tempfile.mkstemp(prefix="frontier_", suffix=".spill")
+                os.close(fd)
+            self._spill_writer = open(self._spill_path, "a", encoding="utf-8")
+            self._spill_reader = open(self._spill_path, "r", encoding="utf-8")
+        self._spill_writer.write(f"{depth}\t{url}\n")
+        self._spilled += 1
+
+    # Recarga hasta `max_in_memory` URLs desde el archivo de desborde
+    def _refill(self):
+        if not self._spilled:
+            return
+        self._spill_writer.flush()
+        for _ in range(min(self._spilled, self.max_in_memory)):
+            depth, url = self._spill_reader.readline().rstrip("\n").split("\t", 1)
+            self._push(url, int(depth))
+            self._spilled -= 1
+        if not self._spilled:
+            # Desborde consumido: se trunca el archivo para no crecer sin límite
+            self._spill_reader.seek(0)
+            self._spill_writer.seek(0)
+            self._spill_writer.truncate()
+
+    def close(self):
+        for handle in (self._spill_writer, self._spill_reader):
+            if handle is not None:
+                handle.close()
+        self._spill_writer = self._spill_reader = None
+        if self._spill_path is not None and os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
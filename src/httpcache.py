@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+
+CacheEntry = namedtuple("CacheEntry", "url etag last_modified body_hash size links content_type")
+
+
+# Caché HTTP en disco para recrawls con GET condicional.
+#
+# El índice SQLite guarda por URL los validadores (ETag/Last-Modified) y los
+# enlaces ya extraídos, para no volver a parsear ante un 304. El cuerpo solo se
+# guarda si se pasa (quien lo vaya a releer, p. ej. el corpus): comprimido (zlib)
+# y direccionado por contenido (sha256), así páginas idénticas comparten un archivo.
+# Al superar `max_bytes` se desalojan las entradas usadas hace más tiempo.
+class ResponseCache:
+    def __init__(self, directory, max_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()  # fetch_page corre en varios hilos
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+                body_hash TEXT, size INTEGER, links TEXT, last_used REAL, content_type TEXT
+            )
+        """)
+        if "content_type" not in {row[1] for row in self.db.execute("PRAGMA table_info(entries)")}:
+            self.db.execute("ALTER TABLE entries ADD COLUMN content_type TEXT")  # Índice anterior a la columna
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _blob_path(self, body_hash):
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash + ".z")
+
+    def lookup(self, url):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT url, etag, last_modified, body_hash, size, links, content_type FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(*row[:5], json.loads(row[5]), row[6])
+
+    # Encabezados para revalidar la entrada (vacío si no hay entrada)
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    # Marca la entrada como usada (respuesta 304)
+    def touch(self, url):
+        with self._lock, self.db:
+            self.db.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+
+    # Cuerpo guardado de la entrada, o None si se guardó sin cuerpo
+    def body(self, entry):
+        if entry.body_hash is None:
+            return None
+        try:
+            with open(self._blob_path(entry.body_hash), "rb") as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:  # Desalojado entre lookup() y body()
+            return None
+
+    # Guarda una respuesta 200 con validadores. `body` son los bytes ya decodificados, o None para
+    # guardar solo validadores y enlaces (entonces `size` es el tamaño de la respuesta, para bytes_saved)
+    def store(self, url, headers, body, links, size=None):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        body_hash = None
+        if body is not None:
+            size = len(body)
+            body_hash = hashlib.sha256(body).hexdigest()
+            path = self._blob_path(body_hash)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(zlib.compress(body))
+                os.replace(tmp_path, path)  # Escritura atómica: nunca queda un blob a medias
+
+        with self._lock, self.db:
+            previous = self.db.execute("SELECT size, body_hash FROM entries WHERE url = ?", (url,)).fetchone()
+            self.total_bytes += (size or 0) - (previous[0] if previous else 0)
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (url, etag, last_modified, body_hash, size, links, last_used, "
+                "content_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, size or 0, json.dumps(links), time.time(),
+                 headers.get("Content-Type")),
+            )
+            if previous and previous[1] not in (None, body_hash):
+                self._remove_unused_blob(previous[1])
+            self._evict()
+        return True
+
+    # Desaloja por LRU hasta bajar al 90 % de max_bytes (tamaño sin comprimir, cota conservadora)
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        victims = []
+        for url, body_hash, size in self.db.execute("SELECT url, body_hash, size FROM entries ORDER BY last_used"):
+            if self.total_bytes <= target:
+                break
+            victims.append((url, body_hash))
+            self.total_bytes -= size
+        self.db.executemany("DELETE FROM entries WHERE url = ?", [(url,) for url, _ in victims])
+        for _, body_hash in victims:
+            if body_hash is not None:
+                self._remove_unused_blob(body_hash)
+
+    # Borra el blob si ya ninguna URL lo referencia (puede compartirlo otra con el mismo contenido)
+    def _remove_unused_blob(self, body_hash):
+        if self.db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone() is None:
+            try:
+                os.remove(self._blob_path(body_hash))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,277 @@
+import argparse
+import os
+from array import array
+from collections import namedtuple
+from urllib.parse import quote
+
+from urlstore import FingerprintMap
+
+
+NODES_FILE = "nodes.txt"
+PAGES_FILE = "pages.u32"
+EDGES_FILE = "edges.u32"
+# Todo lo que str.splitlines() toma como fin de línea se guarda percent-encoded: una URL, una línea
+LINE_BREAKS = str.maketrans({c: quote(c) for c in "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"})
+
+# Grafo en formato CSR: los enlaces del nodo i son indices[indptr[i]:indptr[i + 1]].
+# `pages` tiene una fila (id, profundidad de rastreo, nº de enlaces) por página rastreada.
+Graph = namedtuple("Graph", "indptr indices pages")
+
+
+# Grafo de enlaces del rastreo en disco: listas de adyacencia con ids de nodo enteros.
+#
+# - nodes.txt: una URL por línea (separadas solo por "\n"); el número de línea es el id del nodo.
+# - edges.u32: destinos de los enlaces (uint32), página tras página, en orden de rastreo.
+# - pages.u32: (id, profundidad, nº de enlaces) de cada página rastreada; el desplazamiento de
+#   sus enlaces en edges.u32 es la suma de los anteriores (un CSR por orden de rastreo).
+#
+# Se escribe por lotes (solo append) durante el rastreo, y read_graph() lo reordena por id
+# con numpy. Las URLs se identifican por `key(url)` (p. ej. dedup_key, como la frontera),
+# en un FingerprintMap: unos 20 bytes por nodo en memoria. Los enlaces de una página se
+# deduplican y no incluyen autoenlaces.
+class LinkGraph:
+    def __init__(self, path, key=None, append=False, batch_edges=64 * 1024):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.key = key or (lambda url: url)
+        self.batch_edges = batch_edges
+        self.ids = FingerprintMap()
+        self.n_nodes = self.n_pages = self.n_edges = 0
+        if append:
+            self._load()
+        mode = "a" if append else "w"
+        self._nodes_file = open(os.path.join(path, NODES_FILE), mode, encoding="utf-8", newline="\n")
+        self._pages_file = open(os.path.join(path, PAGES_FILE), mode + "b")
+        self._edges_file = open(os.path.join(path, EDGES_FILE), mode + "b")
+        self._new_nodes = []
+        self._pages = array("I")
+        self._edges = array("I")
+
+    # Retoma un grafo existente (--resume); descarta lo escrito a medias en un corte
+    def _load(self):
+        nodes_path = os.path.join(self.path, NODES_FILE)
+        if os.path.exists(nodes_path):
+            with open(nodes_path, encoding="utf-8", newline="\n") as f:
+                for line in f:
+                    self.ids.setdefault(self.key(line.rstrip("\n")), self.n_nodes)
+                    self.n_nodes += 1
+        pages = _read_array(os.path.join(self.path, PAGES_FILE))
+        del pages[len(pages) // 3 * 3:]
+        self.n_pages = len(pages) // 3
+        self.n_edges = sum(pages[2::3])
+        with open(os.path.join(self.path, PAGES_FILE), "ab") as f:
+            f.truncate(len(pages) * pages.itemsize)
+        with open(os.path.join(self.path, EDGES_FILE), "ab") as f:
+            f.truncate(self.n_edges * pages.itemsize)
+
+    # Id del nodo de la URL (lo crea si es nueva). La clave sale de la URL tal como queda en
+    # nodes.txt, así coincide con la que arma _load() al retomar el grafo.
+    def node(self, url):
+        url = url.translate(LINE_BREAKS)
+        node_id = self.ids.setdefault(self.key(url), self.n_nodes)
+        if node_id == self.n_nodes:
+            self._new_nodes.append(url)
+            self.n_nodes += 1
+        return node_id
+
+    # Id del nodo de la URL, o None si el grafo no la conoce
+    def node_id(self, url):
+        return self.ids.get(self.key(url.translate(LINE_BREAKS)))
+
+    def add_page(self, url, depth, links):
+        source = self.node(url)
+        targets = dict.fromkeys(self.node(link) for link in links)
+        targets.pop(source, None)
+        self._edges.extend(targets)
+        self._pages.extend((source, depth, len(targets)))
+        self.n_pages += 1
+        self.n_edges += len(targets)
+        if len(self._edges) >= self.batch_edges:
+            self.flush()
+
+    # Nodos, luego enlaces y al final páginas: una página en disco siempre tiene sus enlaces y nodos
+    def flush(self):
+        if self._new_nodes:
+            self._nodes_file.write("\n".join(self._new_nodes) + "\n")
+            self._new_nodes = []
+        self._nodes_file.flush()
+        for buffer, f in ((self._edges, self._edges_file), (self._pages, self._pages_file)):
+            buffer.tofile(f)
+            del buffer[:]
+            f.flush()
+
+    # Grafo CSR de lo rastreado hasta ahora (requiere numpy)
+    def graph(self):
+        self.flush()
+        return read_graph(self.path, self.n_nodes)
+
+    def close(self):
+        self.flush()
+        for f in (self._nodes_file, self._pages_file, self._edges_file):
+            f.close()
+
+
+def _read_array(path):
+    values = array("I")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        values.frombytes(data[: len(data) // values.itemsize * values.itemsize])
+    return values
+
+
+def read_nodes(path):
+    with open(os.path.join(path, NODES_FILE), encoding="utf-8", newline="\n") as f:
+        return f.read().split("\n")[:-1]
+
+
+# Lee el grafo de `path` y arma el CSR ordenado por id de nodo (si una página se rastreó
+# más de una vez, p. ej. al reanudar, sus enlaces se suman)
+def read_graph(path, n_nodes=None):
+    import numpy as np
+
+    if n_nodes is None:
+        n_nodes = len(read_nodes(path))
+    pages = np.fromfile(os.path.join(path, PAGES_FILE), dtype=np.uint32)
+    pages = pages[: len(pages) // 3 * 3].reshape(-1, 3)
+    counts = pages[:, 2].astype(np.int64)
+    edges = np.fromfile(os.path.join(path, EDGES_FILE), dtype=np.uint32, count=int(counts.sum()))
+    sources = np.repeat(pages[:, 0], counts)
+    indices = edges[np.argsort(sources, kind="stable")]
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=indptr[1:])
+    return Graph(indptr, indices, pages)
+
+
+def in_degree(graph):
+    import numpy as np
+    return np.bincount(graph.indices, minlength=len(graph.indptr) - 1)
+
+
+def out_degree(graph):
+    import numpy as np
+    return np.diff(graph.indptr)
+
+
+# PageRank por iteración de potencias, vectorizado sobre la lista de enlaces. Los nodos sin
+# enlaces salientes (entre ellos los aún no rastreados) reparten su puntaje entre todos.
+# Devuelve un array que suma 1.
+def pagerank(graph, damping=0.85, tol=1e-6, max_iter=100):
+    import numpy as np
+
+    n = len(graph.indptr) - 1
+    if n == 0:
+        return np.zeros(0)
+    out = np.diff(graph.indptr)
+    sources = np.repeat(np.arange(n), out)
+    weights = 1.0 / out[sources]
+    dangling = out == 0
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(graph.indices, weights=rank[sources] * weights, minlength=n)
+        new_rank = damping * (spread + rank[dangling].sum() / n) + (1 - damping) / n
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank
+
+
+# Profundidad en clics desde `sources` (BFS por niveles, un nivel entero por paso); -1 = inalcanzable
+def click_depth(graph, sources):
+    import numpy as np
+
+    depth = np.full(len(graph.indptr) - 1, -1, dtype=np.int64)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    depth[frontier] = 0
+    level = 0
+    while frontier.size:
+        starts, ends = graph.indptr[frontier], graph.indptr[frontier + 1]
+        lengths = ends - starts
+        # Posiciones de todos los enlaces de la frontera en `indices`, sin bucle de Python
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        neighbors = graph.indices[offsets]
+        level += 1
+        depth[neighbors[depth[neighbors] < 0]] = level
+        frontier = np.flatnonzero(depth == level)
+    return depth
+
+
+# Nivel de prioridad de la frontera por nodo según su PageRank: 0 = promedio y cada nivel
+# menos es un factor √2 más importante (la frontera desencola primero el nivel más bajo)
+def priority_levels(scores):
+    import numpy as np
+    relative = np.maximum(scores * len(scores), 1e-30)
+    return np.clip(-np.round(np.log2(relative) * 2), -100, 100).astype(np.int8)
+
+
+METRIC_COLUMNS = ["node", "url", "crawled", "crawl_depth", "click_depth", "in_degree", "out_degree", "pagerank"]
+METRIC_PARQUET_TYPES = {"node": "int64", "crawled": "bool_", "crawl_depth": "int64", "click_depth": "int64",
+                        "in_degree": "int64", "out_degree": "int64", "pagerank": "float64"}
+
+
+# Métricas por nodo: in/out-degree, PageRank y profundidad (de rastreo y en clics desde las
+# semillas, las únicas páginas de profundidad 0: las URLs de sitemaps se encolan con profundidad 1)
+def link_metrics(graph):
+    import numpy as np
+
+    n = len(graph.indptr) - 1
+    crawled = np.zeros(n, dtype=bool)
+    crawled[graph.pages[:, 0]] = True
+    crawl_depth = np.full(n, -1, dtype=np.int64)
+    crawl_depth[graph.pages[:, 0]] = graph.pages[:, 1]
+    return {"crawled": crawled, "crawl_depth": crawl_depth,
+            "click_depth": click_depth(graph, graph.pages[graph.pages[:, 1] == 0, 0]),
+            "in_degree": in_degree(graph), "out_degree": out_degree(graph), "pagerank": pagerank(graph)}
+
+
+def write_metrics(path, urls, metrics):
+    from sinks import CsvSink, ParquetSink
+
+    if path.endswith(".parquet"):
+        sink = ParquetSink(path, METRIC_COLUMNS, METRIC_PARQUET_TYPES, batch_size=50_000)
+    else:
+        sink = CsvSink(path, METRIC_COLUMNS, batch_size=50_000)
+    columns = [metrics[c].tolist() for c in METRIC_COLUMNS[2:]]
+    for node, url in enumerate(urls):
+        crawled, crawl_depth, depth, in_deg, out_deg, rank = (column[node] for column in columns)
+        sink.write([node, url, crawled, crawl_depth if crawled else "", depth if depth >= 0 else "",
+                    in_deg, out_deg if crawled else "", round(rank, 9)])
+    sink.close()
+
+
+# Análisis del grafo guardado por el crawler (--graph): tabla por nodo y resumen en consola
+def main(argv=None):
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Análisis de enlaces del grafo del crawler")
+    parser.add_argument("graph", nargs="?", default="crawler_graph", help="carpeta del grafo (--graph del crawler)")
+    parser.add_argument("--output", default="link_metrics.csv", metavar="RUTA", help="tabla por nodo (.csv o .parquet)")
+    parser.add_argument("--top", type=int, default=10, help="páginas a listar en cada ranking")
+    args = parser.parse_args(argv)
+
+    urls = read_nodes(args.graph)
+    graph = read_graph(args.graph, len(urls))
+    metrics = link_metrics(graph)
+    write_metrics(args.output, urls, metrics)
+
+    crawled = metrics["crawled"]
+    orphans = np.flatnonzero(crawled & (metrics["in_degree"] == 0) & (metrics["crawl_depth"] > 0))
+    print(f"{len(urls)} nodos ({int(crawled.sum())} rastreados), {len(graph.indices)} enlaces → {args.output}")
+    for title, values in (("PageRank", metrics["pagerank"]), ("Enlaces entrantes", metrics["in_degree"]),
+                          ("Enlaces salientes (hubs)", metrics["out_degree"])):
+        print(f"\n{title}:")
+        for node in np.argsort(values, kind="stable")[::-1][:args.top]:
+            print(f"  {values[node]:>10.4g}  {urls[node]}")
+    depths = metrics["click_depth"][crawled]
+    print("\nProfundidad en clics de las páginas rastreadas: "
+          + ", ".join(f"{d}: {c}" for d, c in enumerate(np.bincount(depths[depths >= 0])))
+          + (f", inalcanzables: {int((depths < 0).sum())}" if (depths < 0).any() else ""))
+    print(f"Huérfanas (rastreadas sin enlaces entrantes, fuera de las semillas): {len(orphans)}")
+    for node in orphans[:args.top]:
+        print(f"  {urls[node]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
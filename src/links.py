@@ -0,0 +1,182 @@
+import codecs
+import importlib.util
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# lxml es opcional (sin él se usa el tokenizador de html.parser); como BeautifulSoup,
+# se importa solo si se usa su backend
+HAVE_LXML = importlib.util.find_spec("lxml") is not None
+
+
+CHUNK_SIZE = 16 * 1024
+# Etiquetas cuyo texto no cuenta como contenido de la página (para huellas de contenido)
+SKIP_TEXT_TAGS = ("script", "style", "noscript", "nav", "header", "footer")
+
+
+# Extracción de referencia: arma el árbol completo con BeautifulSoup.
+# Respaldo del modo streaming y referencia para comprobar su equivalencia.
+def extract_links_soup(html, page_url, keep=None, limit=None, text=None, text_limit=None):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    base_tag = soup.find("base", href=True)
+    base_url = urljoin(page_url, base_tag["href"]) if base_tag else page_url
+
+    found_links = []
+    for a_tag in soup.select("a[href]"):
+        href = a_tag.get("href")
+        if href:
+            full_url = urljoin(base_url, href)
+            if keep is None or keep(full_url):
+                found_links.append(full_url)
+                if limit is not None and len(found_links) >= limit:
+                    break
+
+    # El texto va después: quitar <nav>, <header>... antes perdería los enlaces de los menús
+    if text is not None:
+        for tag in soup(SKIP_TEXT_TAGS):
+            tag.decompose()
+        text.append(soup.get_text(" ")[:text_limit])
+    return found_links
+
+
+# Tokenizador incremental: solo mira las etiquetas <base> y <a>
+# (y, si se pasa `text`, junta hasta `text_limit` caracteres del texto visible fuera de SKIP_TEXT_TAGS)
+class _LinkTokenizer(HTMLParser):
+    def __init__(self, page_url, keep, limit, text=None, text_limit=None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = page_url
+        self.seen_base = False
+        self.keep = keep
+        self.limit = limit
+        self.links = []
+        self.text = text
+        self.text_limit = text_limit
+        self.text_chars = 0
+        self._skip_depth = 0
+
+    @property
+    def links_done(self):
+        return self.limit is not None and len(self.links) >= self.limit
+
+    @property
+    def text_done(self):
+        return self.text is None or (self.text_limit is not None and self.text_chars >= self.text_limit)
+
+    # Se corta al llegar al tope de enlaces y, si se junta texto, al tope de texto
+    @property
+    def done(self):
+        return self.text_done and self.links_done
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "a":
+            for name, value in attrs:
+                if name == "href":
+                    if value:
+                        self.add_href(value)
+                    break
+        elif tag == "base" and not self.seen_base:
+            href = dict(attrs).get("href")
+            if href:
+                # Solo cuenta el primer <base href>, como en los navegadores
+                self.base_url = urljoin(self.base_url, href)
+                self.seen_base = True
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in SKIP_TEXT_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and not self.text_done:
+            if self.text_limit is not None:
+                data = data[:self.text_limit - self.text_chars]
+            self.text.append(data)
+            self.text_chars += len(data)
+
+    def add_href(self, href):
+        if self.links_done:
+            return
+        full_url = urljoin(self.base_url, href)
+        if self.keep is None or self.keep(full_url):
+            self.links.append(full_url)
+
+
+# Variante sobre el parser incremental de lxml (más rápido en páginas grandes). El texto sale
+# del árbol al final, así que para cortar antes se cuenta el HTML leído en vez del texto.
+class _LxmlLinkTokenizer(_LinkTokenizer):
+    def __init__(self, page_url, keep, limit, encoding=None, text=None, text_limit=None):
+        super().__init__(page_url, keep, limit, text, text_limit)
+        from lxml import etree
+        self._etree = etree
+        self._parser = etree.HTMLPullParser(events=("start",), tag=("a", "base"), encoding=encoding)
+
+    def feed(self, data):
+        self.text_chars += len(data)
+        self._parser.feed(data)
+        for _, element in self._parser.read_events():
+            self.handle_starttag(element.tag, element.attrib.items())
+            if self.done:
+                return
+
+    def close(self):
+        try:
+            root = self._parser.close()
+        except self._etree.XMLSyntaxError:
+            return  # Documento vacío o cortado: los enlaces ya leídos son válidos
+        if self.text is not None and root is not None:
+            # lxml arma el árbol completo igual: el texto se toma al final
+            self._etree.strip_elements(root, *SKIP_TEXT_TAGS, with_tail=False)
+            self.text.append(" ".join(root.itertext())[:self.text_limit])
+
+
+# Lee la respuesta (requests, stream=True) por bloques y extrae los href a medida que llegan.
+# Se detiene al alcanzar `limit` enlaces aceptados por `keep`; devuelve (enlaces, bytes_leídos).
+# Si se pasa `sink` (lista), se le agregan los bloques leídos (p. ej. para guardarlos en caché);
+# con `chunks` se usa ese iterador de bloques en vez de uno nuevo, para poder seguir leyéndolo después.
+# Con `text` (lista) se junta además el texto visible (hasta `text_limit` caracteres); mientras
+# falte texto se sigue leyendo aunque ya se tengan todos los enlaces.
+# Con `timings` (dict) se acumula en timings["parse"] el tiempo de parseo, separado de la descarga.
+def extract_links_streaming(response, page_url, keep=None, limit=None, backend="html.parser",
+                            chunk_size=CHUNK_SIZE, sink=None, chunks=None, text=None, text_limit=None, timings=None):
+    if chunks is None:
+        chunks = response.iter_content(chunk_size)
+    bytes_read = 0
+    parse_time = 0.0
+    # requests asume ISO-8859-1 si el Content-Type no declara charset; en ese caso se deja detectar al parser
+    declared = "charset" in response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if declared else None
+    if backend == "lxml" and HAVE_LXML:
+        tokenizer = _LxmlLinkTokenizer(page_url, keep, limit, encoding=encoding, text=text, text_limit=text_limit)
+        for chunk in chunks:
+            bytes_read += len(chunk)
+            if sink is not None:
+                sink.append(chunk)
+            start = time.perf_counter()
+            tokenizer.feed(chunk)
+            parse_time += time.perf_counter() - start
+            if tokenizer.done:
+                break
+    else:
+        tokenizer = _LinkTokenizer(page_url, keep, limit, text, text_limit)
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        for chunk in chunks:
+            bytes_read += len(chunk)
+            if sink is not None:
+                sink.append(chunk)
+            start = time.perf_counter()
+            tokenizer.feed(decoder.decode(chunk))
+            parse_time += time.perf_counter() - start
+            if tokenizer.done:
+                break
+    start = time.perf_counter()
+    tokenizer.close()
+    parse_time += time.perf_counter() - start
+    if timings is not None:
+        timings["parse"] = timings.get("parse", 0.0) + parse_time
+    return tokenizer.links, bytes_read
@@ -0,0 +1,66 @@
+import time
+from collections import deque
+
+
+# Vista en vivo del rastreo: contadores agregados y una ventana acotada con las
+# últimas `window` URLs. La redibuja rich.live a `refresh_per_second`, sin importar
+# cuántas páginas lleguen, en lugar de reimprimir una tabla que crece sin límite.
+# Con quiet=True (cron) solo lleva los contadores y no carga rich.live.
+class LiveView:
+    def __init__(self, console, title, window=20, refresh_per_second=4, quiet=False):
+        self.console = console
+        self.title = title
+        self.quiet = quiet
+        self.rows = deque(maxlen=window)
+        self.started = time.monotonic()
+        self.pages = self.errors = self.blocked = 0
+        self.total_elapsed = 0.0
+        self._live = None
+        if not quiet:
+            from rich.live import Live
+            self._live = Live(console=console, get_renderable=self.render,
+                              refresh_per_second=refresh_per_second, transient=False)
+
+    def __enter__(self):
+        if self._live is not None:
+            self._live.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._live is not None:
+            self._live.stop()
+
+    def add(self, count, url, status_code, response_time, n_links_detected):
+        if status_code == "BLOCKED":
+            self.blocked += 1
+            return
+        self.pages += 1
+        self.errors += status_code == "ERR" or (isinstance(status_code, int) and status_code >= 400)
+        self.total_elapsed += response_time
+        self.rows.append((count, url, status_code, response_time, n_links_detected))
+
+    def render(self):
+        from rich.console import Group
+        from rich.table import Table
+
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        avg = self.total_elapsed / self.pages if self.pages else 0
+        summary = (f"[bold]Páginas:[/bold] {self.pages}  [bold]Errores:[/bold] {self.errors}  "
+                   f"[bold]Bloqueadas:[/bold] {self.blocked}  [bold]Velocidad:[/bold] {self.pages / elapsed * 60:.1f} pág/min  "
+                   f"[bold]Tiempo promedio:[/bold] {avg:.2f}s")
+
+        table = Table(title=self.title, show_lines=False)
+        table.add_column("#", style="cyan")
+        table.add_column("URL solicitada", style="magenta")
+        table.add_column("Código HTTP", style="green")
+        table.add_column("Tiempo (s)", style="yellow")
+        table.add_column("Enlaces", style="blue")
+        for count, url, status_code, response_time, n_links_detected in list(self.rows):
+            table.add_row(
+                str(count),
+                url[:70] + "..." if len(url) > 70 else url,
+                str(status_code),
+                str(response_time),
+                str(n_links_detected),
+            )
+        return Group(summary, table)
@@ -0,0 +1,234 @@
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+
+# --- Instrumentación de conexiones (DNS / TCP / TLS) ---
+#
+# Los tiempos de cada solicitud se acumulan en un dict por hilo: fetch_page llama
+# a start_request_timings() antes de session.get y lo lee después. Como cada
+# descarga corre entera en un hilo, no se mezclan tiempos entre solicitudes.
+
+_local = threading.local()
+PHASES = ("dns", "connect", "tls")
+
+
+def start_request_timings():
+    _local.timings = dict.fromkeys(PHASES, 0.0)
+    _local.timings["new_connections"] = 0
+    return _local.timings
+
+
+def _current_timings():
+    timings = getattr(_local, "timings", None)
+    return timings if timings is not None else start_request_timings()
+
+
+class _TimedConnectionMixin:
+    # Resuelve el nombre aparte para separar DNS de la conexión TCP
+    def _new_conn(self):
+        timings = _current_timings()
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            infos = None  # urllib3 vuelve a intentar y arma su propio NameResolutionError
+        resolved = time.perf_counter()
+        timings["dns"] += resolved - start
+
+        dns_host = self._dns_host
+        try:
+            if infos:
+                self._dns_host = infos[0][4][0]
+            sock = super()._new_conn()
+        except (NewConnectionError, ConnectTimeoutError):
+            if not infos:
+                raise
+            # La primera dirección falló: urllib3 prueba todas las del nombre original
+            self._dns_host = dns_host
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        timings["connect"] += time.perf_counter() - resolved
+        timings["new_connections"] += 1
+        return sock
+
+    # connect() = _new_conn() + handshake TLS (en HTTPS): el resto es TLS
+    def connect(self):
+        timings = _current_timings()
+        before = timings["dns"] + timings["connect"]
+        start = time.perf_counter()
+        super().connect()
+        timings["tls"] += max(0.0, time.perf_counter() - start - (timings["dns"] + timings["connect"] - before))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+# HTTPAdapter cuyas conexiones registran DNS/connect/TLS y cuántas se abrieron
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+# Extensión `trace` de httpx (backends "async" y "http2"): anota las mismas fases en los
+# tiempos de la solicitud en curso. Se crea en el hilo que hace la solicitud, así el backend
+# "async" (cuyos eventos llegan desde el hilo de su event loop) escribe en el dict correcto.
+# httpcore resuelve el nombre dentro de connect_tcp: el DNS queda sumado a "connect".
+def httpx_trace(asynchronous=False):
+    timings = _current_timings()
+    started = {}
+
+    def trace(event, info):
+        name, _, stage = event.rpartition(".")
+        phase = {"connection.connect_tcp": "connect", "connection.start_tls": "tls"}.get(name)
+        if phase is None:
+            return
+        if stage == "started":
+            started[phase] = time.perf_counter()
+        elif phase in started:
+            timings[phase] += time.perf_counter() - started.pop(phase)
+            if phase == "connect" and stage == "complete":
+                timings["new_connections"] += 1
+
+    async def async_trace(event, info):
+        trace(event, info)
+
+    return async_trace if asynchronous else trace
+
+
+# --- Agregación y exportación ---
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TIMING_COLUMNS = ("dns_s", "connect_s", "tls_s", "ttfb_s", "download_s", "parse_s", "simhash_s", "postprocess_s",
+                  "robots_s", "enqueue_s")
+
+
+# Métricas agregadas del rastreo: contadores globales, segundos por fase e
+# histograma de latencia por host. Se leen desde otro hilo (endpoint HTTP).
+class CrawlMetrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.pages = {}                               # clase de estado ("2xx", "ERR"...) -> páginas
+        self.phase_seconds = dict.fromkeys(TIMING_COLUMNS, 0.0)
+        self.bytes_total = 0
+        self.connections_new = 0
+        self.connections_reused = 0
+        self.hosts = {}                               # host -> {"buckets": [...], "count": n, "sum": s}
+
+    def observe(self, url, status_code, response_time, extra):
+        status_class = f"{str(status_code)[0]}xx" if isinstance(status_code, int) else str(status_code)
+        host = urlparse(url).netloc
+        with self.lock:
+            self.pages[status_class] = self.pages.get(status_class, 0) + 1
+            for column in TIMING_COLUMNS:
+                self.phase_seconds[column] += extra.get(column) or 0.0
+            if status_code == "BLOCKED":
+                return  # Solo se consultó robots.txt: no hay latencia de descarga
+            self.bytes_total += extra.get("bytes") or 0
+            if extra.get("conn_reused") is True:
+                self.connections_reused += 1
+            elif extra.get("conn_reused") is False:
+                self.connections_new += 1
+
+            histogram = self.hosts.setdefault(host, {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0})
+            for i, bound in enumerate(self.buckets):
+                if response_time <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["count"] += 1
+            histogram["sum"] += response_time
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_s": round(time.time() - self.started, 3),
+                "pages": dict(self.pages),
+                "phase_seconds": {k: round(v, 6) for k, v in self.phase_seconds.items()},
+                "bytes_total": self.bytes_total,
+                "connections": {"new": self.connections_new, "reused": self.connections_reused},
+                "latency_buckets": list(self.buckets),
+                "hosts": {host: {"buckets": list(h["buckets"]), "count": h["count"], "sum": round(h["sum"], 6)}
+                          for host, h in self.hosts.items()},
+            }
+
+    # Formato de texto de Prometheus
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines = [
+            "# TYPE crawler_pages_total counter",
+            *(f'crawler_pages_total{{status="{status}"}} {n}' for status, n in snap["pages"].items()),
+            "# TYPE crawler_phase_seconds_total counter",
+            *(f'crawler_phase_seconds_total{{phase="{phase[:-2]}"}} {s}' for phase, s in snap["phase_seconds"].items()),
+            "# TYPE crawler_bytes_total counter",
+            f"crawler_bytes_total {snap['bytes_total']}",
+            "# TYPE crawler_connections_total counter",
+            f'crawler_connections_total{{kind="new"}} {snap["connections"]["new"]}',
+            f'crawler_connections_total{{kind="reused"}} {snap["connections"]["reused"]}',
+            "# TYPE crawler_request_seconds histogram",
+        ]
+        for host, h in snap["hosts"].items():
+            for bound, n in zip(snap["latency_buckets"], h["buckets"]):
+                lines.append(f'crawler_request_seconds_bucket{{host="{host}",le="{bound}"}} {n}')
+            lines.append(f'crawler_request_seconds_bucket{{host="{host}",le="+Inf"}} {h["count"]}')
+            lines.append(f'crawler_request_seconds_sum{{host="{host}"}} {h["sum"]}')
+            lines.append(f'crawler_request_seconds_count{{host="{host}"}} {h["count"]}')
+        return "\n".join(lines) + "\n"
+
+    # Sirve /metrics en un hilo aparte (formato Prometheus)
+    def serve(self, port, host="127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    # Escribe la instantánea JSON de forma atómica
+    def write_snapshot(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
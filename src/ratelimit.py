@@ -0,0 +1,129 @@
+import math
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+EWMA_ALPHA = 0.2          # Peso de la última respuesta en los promedios móviles
+RATE_STEP = 0.25          # Solicitudes/s que se suman tras cada respuesta rápida
+SLOW_FACTOR = 0.8         # Factor del ritmo cuando la latencia supera el objetivo
+ERROR_RATE_LIMIT = 0.1    # Con más errores que esto no se acelera
+BACKOFF_BASE = 2          # Segundos de la primera pausa tras un 429/5xx; se duplica con cada fallo seguido
+BACKOFF_MAX = 300
+RETRY_AFTER_MAX = 3600    # Tope para Retry-After absurdos
+CONCURRENCY_POLL = 0.05   # Espera sugerida cuando el host no tiene cupo de concurrencia
+
+THROTTLE_STATUSES = {429, 503}
+
+
+# Segundos de una cabecera Retry-After (entero o fecha HTTP); None si falta o es inválida
+def parse_retry_after(value, now=None):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+# Ritmo adaptativo de un host (AIMD, como el control de congestión de TCP).
+#
+# - Cada respuesta rápida y sin errores suma RATE_STEP solicitudes/s (hasta `max_rate`);
+#   la concurrencia sigue a la ley de Little: ritmo x latencia, hasta `max_concurrency`.
+# - Si la latencia promedio supera `target_latency`, el ritmo baja en SLOW_FACTOR.
+# - Un 429, 5xx o error de conexión parte el ritmo a la mitad, deja una sola conexión
+#   y pausa el host con backoff exponencial (o lo que pida Retry-After, si es mayor).
+# - Crawl-delay de robots.txt es un piso del intervalo: el ritmo nunca lo supera.
+#
+# Con adaptive=False el ritmo queda fijo (token bucket clásico) y solo se respeta Retry-After.
+class AdaptiveHostLimiter:
+    def __init__(self, rate, min_rate=1 / 60, max_rate=10, max_concurrency=4, target_latency=1.0,
+                 adaptive=True, crawl_delay=None):
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max(max_rate, rate) if not adaptive else max_rate
+        self.rate = min(rate, self.max_rate)
+        self.max_concurrency = max_concurrency
+        self.concurrency = 1 if adaptive else max_concurrency
+        self.target_latency = target_latency
+
+        self.in_flight = 0
+        self.next_start = 0.0       # time.monotonic() desde el que puede salir la próxima solicitud
+        self.paused_until = 0.0
+        self.latency = None         # Promedio móvil de segundos por respuesta
+        self.error_rate = 0.0       # Promedio móvil de respuestas fallidas
+        self.consecutive_errors = 0
+
+        self.crawl_delay = None
+        self.set_crawl_delay(crawl_delay)
+
+    def rate_cap(self):
+        cap = self.max_rate
+        if self.crawl_delay:
+            cap = min(cap, 1 / self.crawl_delay)
+        return cap
+
+    def set_crawl_delay(self, delay):
+        self.crawl_delay = delay if delay and delay > 0 else None
+        if self.crawl_delay:
+            self.rate = min(self.rate, self.rate_cap())
+            self.min_rate = min(self.min_rate, self.rate)
+            self.concurrency = 1  # Crawl-delay supone solicitudes de a una
+
+    # Reserva un turno: 0 si la solicitud puede salir ya, si no los segundos a esperar
+    def try_acquire(self, now=None):
+        now = time.monotonic() if now is None else now
+        wait = max(self.next_start, self.paused_until) - now
+        if wait > 0:
+            return wait
+        if self.in_flight >= self.concurrency:
+            return CONCURRENCY_POLL
+        self.in_flight += 1
+        self.next_start = now + 1 / self.rate
+        return 0.0
+
+    # Libera el turno y ajusta el ritmo según la respuesta. Sin `status_code` (p. ej. URL
+    # bloqueada por robots.txt) solo libera. Devuelve los segundos de pausa impuestos al host.
+    def release(self, status_code=None, response_time=None, retry_after=None, now=None):
+        self.in_flight = max(0, self.in_flight - 1)
+        if status_code is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+
+        failed = status_code == "ERR" or status_code in THROTTLE_STATUSES or (
+            isinstance(status_code, int) and status_code >= 500)
+        self.error_rate += EWMA_ALPHA * ((1.0 if failed else 0.0) - self.error_rate)
+
+        if failed:
+            self.consecutive_errors += 1
+            backoff = 0.0
+            if self.adaptive:
+                backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.consecutive_errors - 1))
+                backoff *= random.uniform(1.0, 1.2)  # Jitter: los hosts no se reactivan todos a la vez
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.concurrency = 1
+            if retry_after is not None:
+                backoff = max(backoff, min(retry_after, RETRY_AFTER_MAX))  # Se respeta aun con ritmo fijo
+            self.paused_until = max(self.paused_until, now + backoff)
+            return backoff
+
+        self.consecutive_errors = 0
+        if response_time is not None:
+            self.latency = response_time if self.latency is None else (
+                self.latency + EWMA_ALPHA * (response_time - self.latency))
+        if not self.adaptive or self.latency is None:
+            return 0.0
+
+        if self.latency > self.target_latency:
+            self.rate = max(self.min_rate, self.rate * SLOW_FACTOR)
+            self.concurrency = max(1, self.concurrency - 1)
+        elif self.error_rate < ERROR_RATE_LIMIT:
+            self.rate = min(self.rate_cap(), self.rate + RATE_STEP)
+            if not self.crawl_delay:
+                needed = math.ceil(self.rate * self.latency)
+                self.concurrency = max(1, min(self.max_concurrency, needed))
+        return 0.0
@@ -0,0 +1,106 @@
+import re
+import time
+from functools import lru_cache
+
+
+ROBOTS_TTL = 24 * 3600          # Segundos que se reutiliza un robots.txt descargado (RFC 9309: máx. 24 h)
+ROBOTS_DECISION_CACHE_SIZE = 4096  # Decisiones allow/disallow memorizadas por dominio
+
+
+# Compila una ruta de robots.txt ('*' comodín, '$' ancla final) a una regex, o None si basta startswith
+def _compile_rule(path):
+    if "*" not in path and not path.endswith("$"):
+        return None
+    anchored = path.endswith("$")
+    body = path[:-1] if anchored else path
+    pattern = ".*".join(re.escape(part) for part in body.split("*"))
+    return re.compile(pattern + ("$" if anchored else ""))
+
+
+# Divide robots.txt en grupos: ([user-agents], [(directiva, valor), ...]).
+# Las líneas Sitemap no pertenecen a ningún grupo y se devuelven aparte.
+def _parse_groups(content):
+    groups = []
+    sitemaps = []
+    agents, rules = [], []
+    for line in content.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key, value = key.strip().lower(), value.strip()
+        if key == "sitemap":
+            if value:
+                sitemaps.append(value)
+        elif key == "user-agent":
+            # Un user-agent después de reglas abre un grupo nuevo
+            if rules:
+                groups.append((agents, rules))
+                agents, rules = [], []
+            agents.append(value.lower())
+        elif key in ("allow", "disallow", "crawl-delay") and agents:
+            rules.append((key, value))
+    if agents:
+        groups.append((agents, rules))
+    return groups, sitemaps
+
+
+# Matcher de robots.txt compilado una sola vez por dominio.
+#
+# Sigue RFC 9309: se usa el grupo cuyo user-agent coincide con nuestro token
+# (o '*' si ninguno), los grupos repetidos del mismo agente se fusionan, gana
+# la regla más larga que coincida y ante empate gana Allow. `crawl_delay` es el
+# Crawl-delay del grupo (extensión no estándar; el mayor si hay varios) o None y
+# `sitemaps` las URLs de las líneas Sitemap (válidas para cualquier user-agent).
+class RobotsMatcher:
+    def __init__(self, content, user_agent, fetched_at=None, ttl=ROBOTS_TTL):
+        self.content = content
+        self.user_agent = user_agent.lower()
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.ttl = ttl
+
+        groups, self.sitemaps = _parse_groups(content)
+        own = [r for agents, r in groups if self.user_agent in agents]
+        selected = own or [r for agents, r in groups if "*" in agents]
+
+        # (longitud, es_allow, ruta, regex): ordenadas para que la primera coincidencia sea la ganadora
+        compiled = []
+        delays = []
+        for rules in selected:
+            for directive, path in rules:
+                if directive == "crawl-delay":
+                    try:
+                        delays.append(float(path))
+                    except ValueError:
+                        pass  # Valor inválido: se ignora
+                    continue
+                if not path:
+                    continue  # "Disallow:" vacío no restringe nada
+                compiled.append((len(path), directive == "allow", path, _compile_rule(path)))
+        compiled.sort(key=lambda rule: (rule[0], rule[1]), reverse=True)
+        self.rules = compiled
+        self.crawl_delay = max((d for d in delays if d > 0), default=None)
+
+        self.is_allowed = lru_cache(maxsize=ROBOTS_DECISION_CACHE_SIZE)(self._is_allowed)
+
+    @classmethod
+    def allow_all(cls, user_agent, ttl=ROBOTS_TTL):
+        return cls("", user_agent, ttl=ttl)
+
+    def is_expired(self, now=None):
+        return (time.time() if now is None else now) - self.fetched_at > self.ttl
+
+    # `path` incluye la query string ("/buscar?q=x"), como pide el estándar
+    def _is_allowed(self, path):
+        for _, allow, rule_path, regex in self.rules:
+            if regex is None:
+                if path.startswith(rule_path):
+                    return allow
+            elif regex.match(path):
+                return allow
+        return True
+
+    def __repr__(self):
+        allow = [r[2] for r in self.rules if r[1]]
+        disallow = [r[2] for r in self.rules if not r[1]]
+        return f"{{'allow': {allow}, 'disallow': {disallow}}}"
@@ -0,0 +1,146 @@
+import csv
+import gzip
+import json
+import os
+import time
+
+# pyarrow es opcional y tarda en importarse: se carga al crear el primer ParquetSink
+pa = pq = None
+
+
+def _load_pyarrow():
+    global pa, pq
+    if pq is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink requiere pyarrow (pip install pyarrow)") from None
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+# Destinos de resultados con escritura por lotes.
+#
+# Cada sink acumula filas en memoria y las escribe juntas cuando llegan a
+# `batch_size` o pasaron `flush_interval` segundos desde la última escritura,
+# en vez de hacer una escritura (y una llamada al sistema) por página.
+class BufferedSink:
+    def __init__(self, path, columns, batch_size=500, flush_interval=5):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def write(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self._write_batch(self.buffer)
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def _write_batch(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+
+class CsvSink(BufferedSink):
+    def __init__(self, path, columns, append=False, **kwargs):
+        super().__init__(path, columns, **kwargs)
+        self.file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        if not append:
+            self.writer.writerow(columns)
+
+    def _write_batch(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+# Una fila JSON por línea; comprimido con gzip si la ruta termina en .gz
+class JsonlSink(BufferedSink):
+    def __init__(self, path, columns, append=False, **kwargs):
+        super().__init__(path, columns, **kwargs)
+        mode = "at" if append else "wt"
+        self.file = gzip.open(path, mode, encoding="utf-8") if path.endswith(".gz") else open(path, mode, encoding="utf-8")
+
+    def _write_batch(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n" for row in rows))
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+# Parquet con tipos fijos: cada lote es un row group. Las celdas vacías ("") quedan como nulos.
+# `types` mapea columna -> nombre de tipo de pyarrow ("int64", "float64", "bool_"); el resto es string.
+# Un Parquet no admite agregar filas: con append=True se escribe un archivo nuevo que empieza con los
+# row groups del existente y lo reemplaza al cerrar (hasta entonces el original queda intacto).
+class ParquetSink(BufferedSink):
+    def __init__(self, path, columns, types, append=False, **kwargs):
+        _load_pyarrow()
+        super().__init__(path, columns, **kwargs)
+        self.schema = pa.schema([(column, getattr(pa, types.get(column, "string"))()) for column in columns])
+        previous = pq.ParquetFile(path) if append and os.path.exists(path) else None
+        if previous is not None and not previous.schema_arrow.equals(self.schema):
+            raise ValueError(f"{path} tiene otras columnas o tipos: no se le pueden agregar filas")
+        self.write_path = f"{path}.{os.getpid()}.tmp" if previous is not None else path
+        self.parquet_writer = pq.ParquetWriter(self.write_path, self.schema, compression="zstd")
+        if previous is not None:
+            for i in range(previous.num_row_groups):
+                self.parquet_writer.write_table(previous.read_row_group(i))
+            previous.close()
+
+    def _convert(self, value, field_type):
+        if value == "" or value is None:
+            return None
+        if pa.types.is_string(field_type):
+            return str(value)
+        if pa.types.is_integer(field_type):
+            return int(value)
+        if pa.types.is_floating(field_type):
+            return float(value)
+        return value
+
+    def _write_batch(self, rows):
+        arrays = [
+            pa.array([self._convert(row[i], field.type) for row in rows], type=field.type)
+            for i, field in enumerate(self.schema)
+        ]
+        self.parquet_writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        super().close()
+        self.parquet_writer.close()
+        if self.write_path != self.path:
+            os.replace(self.write_path, self.path)
+
+
+# Reparte cada fila entre varios sinks
+class MultiSink:
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    def write(self, row):
+        for sink in self.sinks:
+            sink.write(row)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
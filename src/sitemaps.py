@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import requests
+
+
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # Tope del protocolo por archivo (ya descomprimido)
+CHUNK_SIZE = 64 * 1024
+
+
+def _split(tag):
+    namespace, _, name = tag.rpartition("}")
+    return namespace, name
+
+
+# <lastmod> en formato W3C ("2024-05-01", "2024-05-01T10:00:00Z"...) a timestamp; None si no se entiende
+def parse_lastmod(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+# Parsea un sitemap (urlset o sitemapindex) a medida que llegan los bloques, sin
+# tenerlo entero en memoria. Los .xml.gz se descomprimen al vuelo.
+# Produce ("url" | "sitemap", loc, lastmod) por cada entrada. Solo cuentan <loc> y <lastmod>
+# hijos directos de la entrada y en su mismo namespace: las extensiones (<image:loc>,
+# <video:content_loc>...) van anidadas o en otro namespace y no pisan la URL de la página.
+def iter_sitemap_entries(chunks, max_bytes=SITEMAP_MAX_BYTES):
+    parser = XMLPullParser(events=("start", "end"))
+    decompressor = None
+    path = []  # Elementos abiertos, de la raíz al actual
+    fields = {}
+    total = 0
+    first = True
+    for chunk in chunks:
+        if first:
+            first = False
+            if chunk[:2] == b"\x1f\x8b":  # Archivo gzip (no Content-Encoding): se descomprime aquí
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk, max_bytes - total + 1)
+        total += len(chunk)
+        if total > max_bytes:
+            break
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                path.append(elem)
+                continue
+            path.pop()
+            namespace, name = _split(elem.tag)
+            if len(path) == 2 and name in ("loc", "lastmod"):
+                entry_namespace, entry = _split(path[1].tag)
+                if entry in ("url", "sitemap") and namespace == entry_namespace:
+                    fields[name] = (elem.text or "").strip()
+            elif len(path) == 1:
+                if name in ("url", "sitemap") and fields.get("loc"):
+                    yield name, fields["loc"], parse_lastmod(fields.get("lastmod"))
+                fields = {}
+                path[0].clear()  # Las entradas ya procesadas no se acumulan bajo la raíz
+
+
+# Descarga un archivo de sitemap y produce sus entradas (ver iter_sitemap_entries).
+# En `result["status"]` deja el código HTTP ("ERR" si no hubo respuesta), para el ritmo del host.
+# Un sitemap roto o inaccesible se anota con `log` y deja de producir entradas, sin lanzar error.
+def iter_sitemap_file(session, sitemap_url, result, timeout=10, log=None):
+    result["status"] = "ERR"
+    try:
+        with session.get(sitemap_url, timeout=timeout, stream=True) as r:
+            result["status"] = r.status_code
+            if r.status_code != 200:
+                if log:
+                    log(f"Sitemap {sitemap_url}: HTTP {r.status_code}")
+                return
+            yield from iter_sitemap_entries(r.iter_content(CHUNK_SIZE))
+    except (requests.exceptions.RequestException, ParseError, zlib.error) as e:
+        if log:
+            log(f"Sitemap {sitemap_url} inválido o inaccesible: {e}")
+
+
+# Cuándo se rastreó por última vez cada URL, para recrawls incrementales: una URL del
+# sitemap se vuelve a descargar solo si su <lastmod> es posterior a ese momento.
+# Persiste entre ejecuciones (a diferencia del checkpoint, que es de un rastreo).
+class RecrawlIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()  # Se consulta desde los hilos que leen sitemaps
+        self._pending = []
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS crawled (url TEXT PRIMARY KEY, crawled_at REAL)")
+
+    # True si hay que descargar la URL: nunca rastreada, sin lastmod o modificada desde entonces
+    def is_changed(self, url, lastmod):
+        if lastmod is None:
+            return True
+        with self._lock:
+            row = self.db.execute("SELECT crawled_at FROM crawled WHERE url = ?", (url,)).fetchone()
+        return row is None or lastmod > row[0]
+
+    def record(self, url, crawled_at=None):
+        self._pending.append((url, time.time() if crawled_at is None else crawled_at))
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO crawled VALUES (?, ?)", self._pending)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
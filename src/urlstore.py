@@ -0,0 +1,290 @@
+import hashlib
+import math
+import zlib
+from array import array
+from collections import deque
+
+
+# Almacenamiento compacto de URLs para la frontera. A millones de URLs, un set de strings
+# y una cola de tuplas cuestan cientos de bytes por URL, casi todo repetido ("https://unae.edu.py").
+#
+# - HostTable interna "esquema://host" como enteros.
+# - CompactQueue guarda cada URL pendiente como bytes (host como entero + ruta) en bloques
+#   de un bytearray, opcionalmente comprimidos con zlib.
+# - FingerprintSet y ScalableBloomFilter reemplazan al set de URLs vistas.
+
+
+# Separa "https://host:puerto" del resto de la URL (origen + resto == url)
+def split_origin(url):
+    start = url.find("://")
+    cut = url.find("/", start + 3) if start >= 0 else -1
+    if cut < 0:
+        return url, ""
+    return url[:cut], url[cut:]
+
+
+class HostTable:
+    def __init__(self):
+        self.ids = {}
+        self.hosts = []
+
+    def intern(self, host):
+        host_id = self.ids.get(host)
+        if host_id is None:
+            host_id = self.ids[host] = len(self.hosts)
+            self.hosts.append(host)
+        return host_id
+
+    def __getitem__(self, host_id):
+        return self.hosts[host_id]
+
+    def __len__(self):
+        return len(self.hosts)
+
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(buffer, offset):
+    value = shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# Cola FIFO de (url, profundidad). Cada entrada ocupa varint(host) + varint(profundidad) +
+# varint(largo) + la ruta en UTF-8, en bloques de `block_size` bytes. Con `compress`, los
+# bloques completos que esperan turno se guardan comprimidos y se descomprimen al llegar al frente.
+class CompactQueue:
+    def __init__(self, hosts=None, block_size=64 * 1024, compress=False):
+        self.hosts = hosts if hosts is not None else HostTable()
+        self.block_size = block_size
+        self.compress = compress
+        self._blocks = deque([bytearray()])  # El primero se lee, el último se escribe
+        self._offset = 0                     # Posición de lectura en el primer bloque
+        self._front = deque()                # Entradas devueltas al frente con appendleft (pocas)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def append(self, item):
+        url, depth = item
+        origin, rest = split_origin(url)
+        rest = rest.encode("utf-8")
+        tail = self._blocks[-1]
+        if len(tail) >= self.block_size:
+            if self.compress and len(self._blocks) > 1:
+                self._blocks[-1] = zlib.compress(tail, 1)  # Sellado: nadie lo lee hasta llegar al frente
+            tail = bytearray()
+            self._blocks.append(tail)
+        _write_varint(tail, self.hosts.intern(origin))
+        _write_varint(tail, depth)
+        _write_varint(tail, len(rest))
+        tail += rest
+        self._len += 1
+
+    def appendleft(self, item):
+        self._front.append(item)
+        self._len += 1
+
+    def popleft(self):
+        if self._front:
+            self._len -= 1
+            return self._front.pop()
+        if not self._len:
+            raise IndexError("pop de una cola vacía")
+        head = self._blocks[0]
+        if self._offset >= len(head):
+            self._blocks.popleft()
+            self._offset = 0
+            head = self._blocks[0]
+            if isinstance(head, bytes):
+                head = self._blocks[0] = zlib.decompress(head)
+        host_id, offset = _read_varint(head, self._offset)
+        depth, offset = _read_varint(head, offset)
+        length, offset = _read_varint(head, offset)
+        self._offset = offset + length
+        self._len -= 1
+        return self.hosts[host_id] + bytes(head[offset:self._offset]).decode("utf-8"), depth
+
+
+# Huella de 64 bits de la clave (blake2b): estable entre procesos, a diferencia de hash()
+def fingerprint64(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+# Set de huellas de 64 bits en una tabla hash abierta sobre array("Q"): ~8-16 bytes por URL.
+# Dos URLs distintas solo chocan con probabilidad n/2^64 (a 10 millones de URLs, ~5e-13 por consulta).
+class FingerprintSet:
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1024):
+        self._len = 0
+        self._allocate(1 << max(10, math.ceil(math.log2(capacity / self.MAX_LOAD))))
+
+    def _allocate(self, size):
+        self._slots = array("Q", bytes(8 * size))  # 0 = vacío
+        self._mask = size - 1
+        self._limit = int(size * self.MAX_LOAD)
+
+    # Índice de la huella o del hueco donde iría (sondeo lineal)
+    def _find(self, fp):
+        slots, mask = self._slots, self._mask
+        i = fp & mask
+        while True:
+            value = slots[i]
+            if value == fp or value == 0:
+                return i
+            i = (i + 1) & mask
+
+    def add(self, key):
+        fp = fingerprint64(key)
+        i = self._find(fp)
+        if self._slots[i] == 0:
+            self._slots[i] = fp
+            self._len += 1
+            if self._len > self._limit:
+                self._grow()
+
+    def _grow(self):
+        old = self._slots
+        self._allocate(len(old) * 2)
+        for fp in old:
+            if fp:
+                self._slots[self._find(fp)] = fp
+
+    def __contains__(self, key):
+        fp = fingerprint64(key)
+        return self._slots[self._find(fp)] == fp
+
+    def __len__(self):
+        return self._len
+
+
+# FingerprintSet que además asocia a cada huella un entero de 32 bits (p. ej. el id de nodo
+# del grafo de enlaces): ~12-24 bytes por clave en vez de los ~150 de un dict de strings.
+class FingerprintMap(FingerprintSet):
+    def _allocate(self, size):
+        super()._allocate(size)
+        self._values = array("I", bytes(4 * size))
+
+    def _grow(self):
+        old, old_values = self._slots, self._values
+        self._allocate(len(old) * 2)
+        for fp, value in zip(old, old_values):
+            if fp:
+                i = self._find(fp)
+                self._slots[i] = fp
+                self._values[i] = value
+
+    def get(self, key, default=None):
+        fp = fingerprint64(key)
+        i = self._find(fp)
+        return self._values[i] if self._slots[i] == fp else default
+
+    # Valor de la clave; si no estaba, la agrega con `value`
+    def setdefault(self, key, value):
+        fp = fingerprint64(key)
+        i = self._find(fp)
+        if self._slots[i] == fp:
+            return self._values[i]
+        self._slots[i] = fp
+        self._values[i] = value
+        self._len += 1
+        if self._len > self._limit:
+            self._grow()
+        return value
+
+
+# Filtro de Bloom de capacidad fija; las k posiciones salen de un digest de 128 bits (doble hashing)
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.n_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.k)]
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits, n_bits = self.bits, self.n_bits
+        for i in range(self.k):  # Corta en el primer bit apagado (lo normal para URLs nuevas)
+            position = (h1 + i * h2) % n_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+# Bloom escalable (Almeida et al., 2007): al llenarse un filtro se agrega otro el doble de
+# grande y con la mitad de tasa de error, así el total nunca supera `error_rate` sin
+# conocer de antemano cuántas URLs habrá. Un falso positivo hace que una URL nueva se
+# dé por vista (no se rastrea); nunca se rastrea dos veces la misma.
+class ScalableBloomFilter:
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, error_rate=0.001, initial_capacity=100_000):
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(initial_capacity, error_rate * (1 - self.TIGHTENING))]
+        self._len = 0
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+    def add(self, key):
+        digest = self._digest(key)
+        if any(digest in f for f in self.filters):
+            return
+        last = self.filters[-1]
+        if last.count >= last.capacity:
+            error = self.error_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** len(self.filters)
+            last = BloomFilter(last.capacity * self.GROWTH, error)
+            self.filters.append(last)
+        last.add(digest)
+        self._len += 1
+
+    def __contains__(self, key):
+        digest = self._digest(key)
+        return any(digest in f for f in self.filters)
+
+    def __len__(self):
+        return self._len
+
+
+SEEN_STORES = ("set", "compact", "bloom")
+
+
+# Índice de URLs vistas de la frontera: "set" (exacto, un string por URL), "compact"
+# (huellas de 64 bits) o "bloom" (Bloom escalable con tasa de falsos positivos `error_rate`)
+def make_seen_store(kind="set", error_rate=0.001):
+    if kind == "set":
+        return set()
+    if kind == "compact":
+        return FingerprintSet()
+    if kind == "bloom":
+        return ScalableBloomFilter(error_rate)
+    raise ValueError(f"Índice de vistas desconocido: {kind!r} (opciones: {SEEN_STORES})")